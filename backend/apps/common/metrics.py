@@ -0,0 +1,25 @@
+# apps/common/metrics.py
+from __future__ import annotations
+
+try:
+    from prometheus_client import Counter
+except Exception:  # pragma: no cover
+    Counter = None
+
+if Counter:
+    RATELIMIT_ALLOWED_TOTAL = Counter(
+        "common_ratelimit_allowed_total",
+        "Requêtes acceptées par le limiteur de débit",
+        ["scope"],
+    )
+    RATELIMIT_REJECTED_TOTAL = Counter(
+        "common_ratelimit_rejected_total",
+        "Requêtes refusées (429) par le limiteur de débit",
+        ["scope"],
+    )
+else:
+    class _Noop:
+        def inc(self, *args, **kwargs): return None
+        def labels(self, *args, **kwargs): return self
+    RATELIMIT_ALLOWED_TOTAL = _Noop()
+    RATELIMIT_REJECTED_TOTAL = _Noop()
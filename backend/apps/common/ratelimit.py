@@ -0,0 +1,228 @@
+# apps/common/ratelimit.py
+"""
+Limiteur de débit partagé (fenêtre glissante approchée), sur le cache Django
+(Redis en production, LocMem en tests).
+
+Deux compteurs par identité : fenêtre courante et fenêtre précédente.
+Estimation : `précédente × (1 − écoulé / période) + courante`, ce qui lisse la
+bascule de fenêtre sans stocker l'historique des requêtes.
+
+- chaque requête fait un `cache.incr` atomique (création par `cache.add` si
+  la clé manque) : pas de lecture-puis-écriture, pas de remise à zéro de la
+  fenêtre à chaque appel ; les requêtes refusées comptent aussi ;
+- le compteur de la fenêtre précédente ne bouge plus : il est lu une fois
+  par processus et par fenêtre, d'où un seul aller-retour Redis par requête
+  en régime établi ;
+- identités : IP, utilisateur, clé d'API (`X-API-Key`, hachée) ou
+  utilisateur sinon IP ;
+- exposition : `RateLimiter.hit`, décorateur `ratelimit` et throttles DRF
+  (`SlidingWindowThrottle` et variantes anon/user) ;
+- métriques `common_ratelimit_allowed_total` / `common_ratelimit_rejected_total`
+  par scope.
+
+Débits au format DRF (`"30/min"`, `"5/s"`, `"1000/hour"`, `"10/day"`) ; par
+défaut lus dans `REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope]`.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import RATELIMIT_ALLOWED_TOTAL, RATELIMIT_REJECTED_TOTAL
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+KEYS = ("ip", "user", "api_key", "user_or_ip")
+
+Rate = Union[str, Callable[[], Optional[str]], None]
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, int]]:
+    """"30/min" -> (30, 60) ; None -> pas de limite."""
+    if not rate:
+        return None
+    num, _, period = str(rate).partition("/")
+    try:
+        return int(num), _PERIODS[period.strip()[:1].lower()]
+    except (KeyError, ValueError):
+        raise ValueError(f"invalid rate '{rate}' (expected e.g. '30/min')")
+
+
+def scope_rate(scope: str) -> Optional[str]:
+    return (api_settings.DEFAULT_THROTTLE_RATES or {}).get(scope)
+
+
+# ---------------------------------------------------------------------------
+# Identités
+# ---------------------------------------------------------------------------
+
+def client_ip(request) -> str:
+    return request.META.get("REMOTE_ADDR") or "anon"
+
+
+def identity(request, key: str = "user_or_ip") -> str:
+    if key not in KEYS:
+        raise ValueError(f"unknown rate limit key '{key}' (expected one of {', '.join(KEYS)})")
+    if key == "api_key":
+        api_key = request.META.get("HTTP_X_API_KEY") or ""
+        if api_key:
+            return "k:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32]
+        return "ip:" + client_ip(request)
+    user = getattr(request, "user", None)
+    if key in ("user", "user_or_ip") and getattr(user, "is_authenticated", False):
+        return f"u:{user.pk}"
+    return "ip:" + client_ip(request) if key != "user" else "u:anon"
+
+
+# ---------------------------------------------------------------------------
+# Limiteur
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # secondes (0 si accepté)
+
+
+# compteurs des fenêtres précédentes, figés : {période: (fenêtre courante, {clé: compteur})}
+_frozen: Dict[int, Tuple[int, Dict[str, int]]] = {}
+_FROZEN_MAX = 100_000
+
+
+def _previous_count(key: str, period: int, window: int) -> int:
+    current_window, counts = _frozen.get(period, (None, None))
+    if current_window != window or len(counts) > _FROZEN_MAX:
+        counts = {}
+        _frozen[period] = (window, counts)
+    if key not in counts:
+        counts[key] = int(cache.get(key) or 0)
+    return counts[key]
+
+
+def reset_local_state() -> None:
+    """Oublie les compteurs figés de ce processus (tests, `cache.clear()`)."""
+    _frozen.clear()
+
+
+class RateLimiter:
+    def __init__(self, scope: str, rate: Optional[str]):
+        self.scope = scope
+        self.rate = parse_rate(rate)
+
+    def _key(self, ident: str, period: int, window: int) -> str:
+        return f"rl:{self.scope}:{ident}:{period}:{window}"
+
+    def hit(self, ident: str, now: Optional[float] = None) -> RateLimitResult:
+        if self.rate is None:
+            return RateLimitResult(True, 0, 0, 0)
+        limit, period = self.rate
+        now = time.time() if now is None else now
+        window = int(now // period)
+        elapsed = (now - window * period) / period
+
+        key = self._key(ident, period, window)
+        try:
+            current = cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, period * 2)  # un seul gagnant si plusieurs créent la clé
+            current = cache.incr(key)
+        previous = _previous_count(self._key(ident, period, window - 1), period, window)
+
+        estimate = previous * (1.0 - elapsed) + current
+        if estimate <= limit:
+            RATELIMIT_ALLOWED_TOTAL.labels(scope=self.scope).inc()
+            return RateLimitResult(True, limit, max(0, int(limit - estimate)), 0)
+        RATELIMIT_REJECTED_TOTAL.labels(scope=self.scope).inc()
+        # attente jusqu'à ce que la part de la fenêtre précédente suffise à repasser sous la limite
+        if previous and current <= limit:
+            retry = (1.0 - elapsed - (limit - current) / previous) * period
+        else:
+            retry = (1.0 - elapsed) * period
+        return RateLimitResult(False, limit, 0, max(1, math.ceil(retry)))
+
+
+def _resolve(rate: Rate, scope: str) -> Optional[str]:
+    if callable(rate):
+        return rate()
+    return rate if rate is not None else scope_rate(scope)
+
+
+# ---------------------------------------------------------------------------
+# Décorateur & throttles DRF
+# ---------------------------------------------------------------------------
+
+def ratelimit(scope: str, rate: Rate = None, key: str = "user_or_ip"):
+    """
+    Décorateur de vue (fonction ou méthode de ViewSet) : 429 + `Retry-After`
+    au-delà du débit. `rate` : chaîne, callable (lu à chaque appel) ou None
+    (débit du scope dans DEFAULT_THROTTLE_RATES).
+    """
+    if key not in KEYS:
+        raise ValueError(f"unknown rate limit key '{key}'")
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if hasattr(args[0], "META") else args[1]
+            res = RateLimiter(scope, _resolve(rate, scope)).hit(identity(request, key))
+            if not res.allowed:
+                resp = JsonResponse({"detail": "Too many requests"}, status=429)
+                resp["Retry-After"] = str(res.retry_after)
+                return resp
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle DRF sur `RateLimiter`. Scope : `ratelimit_scope` de la vue, sinon
+    `scope` de la classe ; débit dans DEFAULT_THROTTLE_RATES.
+    """
+    scope: str = "default"
+    key: str = "user_or_ip"
+
+    def get_scope(self, view) -> str:
+        return getattr(view, "ratelimit_scope", None) or self.scope
+
+    def allow_request(self, request, view) -> bool:
+        self.result = RateLimiter(self.get_scope(view), scope_rate(self.get_scope(view))).hit(
+            identity(request, self.key)
+        )
+        return self.result.allowed
+
+    def wait(self) -> Optional[float]:
+        result = getattr(self, "result", None)
+        return float(result.retry_after) if result and not result.allowed else None
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottle):
+    """Remplace `AnonRateThrottle` (scope "anon", utilisateurs anonymes seulement)."""
+    scope = "anon"
+    key = "ip"
+
+    def get_scope(self, view) -> str:
+        return self.scope
+
+    def allow_request(self, request, view) -> bool:
+        if getattr(request.user, "is_authenticated", False):
+            return True
+        return super().allow_request(request, view)
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Remplace `UserRateThrottle` (scope "user", utilisateur sinon IP)."""
+    scope = "user"
+
+    def get_scope(self, view) -> str:
+        return self.scope
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.common import ratelimit
+from apps.common.ratelimit import RateLimiter, SlidingWindowThrottle, identity, parse_rate
+
+
+def _request(ip="10.0.0.1", user=None, api_key=None):
+    meta = {"REMOTE_ADDR": ip}
+    if api_key:
+        meta["HTTP_X_API_KEY"] = api_key
+    return SimpleNamespace(META=meta, user=user or SimpleNamespace(is_authenticated=False))
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.reset_local_state()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/min"), (30, 60))
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+        self.assertEqual(parse_rate("10/day"), (10, 86400))
+        self.assertIsNone(parse_rate(None))
+        with self.assertRaises(ValueError):
+            parse_rate("often")
+
+    def test_fixed_budget_within_window_and_no_reset_on_hit(self):
+        limiter = RateLimiter("t-budget", "3/min")
+        t0 = 6000.0  # début de fenêtre
+        results = [limiter.hit("a", now=t0 + i).allowed for i in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertTrue(limiter.hit("b", now=t0).allowed)  # identités indépendantes
+        self.assertFalse(limiter.hit("a", now=t0 + 59).allowed)
+
+    def test_sliding_window_weights_previous_window(self):
+        limiter = RateLimiter("t-slide", "10/min")
+        for _ in range(10):
+            self.assertTrue(limiter.hit("a", now=6000.0).allowed)
+        # 1 s dans la fenêtre suivante : 10 × 59/60 + 1 > 10 -> refusé, sous la limite ~5 s plus tard
+        res = limiter.hit("a", now=6061.0)
+        self.assertFalse(res.allowed)
+        self.assertEqual(res.retry_after, 5)
+        # à mi-fenêtre : 10 × 0.5 + 1 (refus compris) + 1 <= 10
+        self.assertTrue(limiter.hit("a", now=6090.0).allowed)
+
+    def test_zero_rate_and_no_rate(self):
+        self.assertFalse(RateLimiter("t-zero", "0/min").hit("a").allowed)
+        self.assertTrue(RateLimiter("t-none", None).hit("a").allowed)
+
+    def test_identities(self):
+        user = SimpleNamespace(is_authenticated=True, pk=7)
+        self.assertEqual(identity(_request(user=user)), "u:7")
+        self.assertEqual(identity(_request(user=user), "ip"), "ip:10.0.0.1")
+        self.assertEqual(identity(_request()), "ip:10.0.0.1")
+        key_id = identity(_request(api_key="secret"), "api_key")
+        self.assertTrue(key_id.startswith("k:"))
+        self.assertNotIn("secret", key_id)
+        with self.assertRaises(ValueError):
+            identity(_request(), "cookie")
+
+    def test_decorator(self):
+        @ratelimit.ratelimit("t-deco", rate="2/min", key="ip")
+        def view(request):
+            return "ok"
+
+        self.assertEqual([view(_request()), view(_request())], ["ok", "ok"])
+        resp = view(_request())
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("Retry-After", resp)
+        self.assertEqual(view(_request(ip="10.0.0.2")), "ok")
+
+
+class Limited(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [SlidingWindowThrottle]
+    ratelimit_scope = "t-drf"
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+@override_settings(REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"t-drf": "2/min"}})
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.reset_local_state()
+
+    def test_throttle(self):
+        factory = APIRequestFactory()
+        codes = [Limited.as_view()(factory.get("/")).status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+        resp = Limited.as_view()(factory.get("/"))
+        self.assertTrue(int(resp["Retry-After"]) >= 1)
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import random
+import time as _time
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.cms.models import News, Page
+from apps.common.models import PublishStatus
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist, ArtistAvailability, Genre
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import invalidate_schedule
+from apps.sponsors.models import Sponsor, SponsorTier, Sponsorship
+from apps.tickets.models import PricePhase, TicketChannelCounter, TicketType
+from apps.tickets.services import bump_cache_version
+
+GENRES = [
+    "Rock", "Pop", "Electro", "Techno", "House", "Hip-Hop", "Rap", "Jazz", "Soul", "Funk",
+    "Reggae", "Dub", "Metal", "Punk", "Folk", "Indie", "Blues", "World", "Afrobeat", "Ambient",
+]
+# pays pondérés (programmation majoritairement européenne)
+COUNTRIES = ["FR"] * 8 + ["GB"] * 3 + ["US"] * 3 + ["DE", "BE", "NL", "ES", "IT", "CA", "BR", "NG", "JP", "SE"]
+TIERS = [("platinum", "Platinum", 1), ("gold", "Gold", 2), ("silver", "Silver", 3), ("bronze", "Bronze", 4)]
+STAGE_NAMES = ["Main", "Valley", "Club", "Forest", "Dome", "Beach", "Garden", "Warehouse", "Tent", "Lab"]
+SET_MINUTES = [40, 45, 50, 60, 60, 60, 75, 90]
+DOORS, CURFEW = 14 * 60, 26 * 60  # 14:00 -> 02:00 le lendemain (minutes)
+# référentiels partagés entre éditions, slugs `<préfixe>-<kind>-<i>` (ordre de suppression de --flush)
+POOLS = ((Artist, "artist"), (Genre, "genre"), (Sponsor, "sponsor"), (SponsorTier, "tier"))
+
+
+def _minutes_to_time(minutes: int) -> time:
+    minutes %= 24 * 60
+    return time(minutes // 60, minutes % 60)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic festival dataset (editions, stages, artists, genres, "
+        "availabilities, slots, ticket types, sponsorships, pages, news) with chunked bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--editions", type=int, default=1)
+        parser.add_argument("--year", type=int, default=2100, help="Year of the first generated edition")
+        parser.add_argument("--days", type=int, default=3, help="Days per edition")
+        parser.add_argument("--stages", type=int, default=8, help="Stages per edition")
+        parser.add_argument("--slots-per-day", dest="slots_per_day", type=int, default=8,
+                            help="Slots per stage and day (sets shrink to fit 14:00-02:00)")
+        parser.add_argument("--artists", type=int, default=2000, help="Size of the shared artist pool")
+        parser.add_argument("--genres", type=int, default=40)
+        parser.add_argument("--availability-ratio", dest="availability_ratio", type=float, default=0.3,
+                            help="Share of artists with explicit availabilities per edition")
+        parser.add_argument("--sponsors", type=int, default=200, help="Size of the shared sponsor pool")
+        parser.add_argument("--pages", type=int, default=20, help="Pages per edition")
+        parser.add_argument("--news", type=int, default=50, help="News per edition")
+        parser.add_argument("--prefix", type=str, default="seed", help="Name/slug prefix of generated rows")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=2000)
+        parser.add_argument("--flush", action="store_true", default=False,
+                            help="Delete rows previously generated with the same prefix first")
+
+    def handle(self, *args, **opts):
+        if opts["editions"] < 1 or opts["days"] < 1 or opts["stages"] < 1 or opts["artists"] < 1:
+            raise CommandError("--editions, --days, --stages and --artists must be >= 1")
+        self.rng = random.Random(opts["seed"])
+        self.batch_size = max(1, opts["batch_size"])
+        self.prefix = opts["prefix"]
+        self.counts: Counter = Counter()
+        t0 = _time.perf_counter()
+
+        if opts["flush"]:
+            self._flush()
+        years = list(range(opts["year"], opts["year"] + opts["editions"]))
+        taken = list(FestivalEdition.objects.filter(year__in=years).values_list("year", flat=True))
+        if taken:
+            raise CommandError(f"Editions already exist for years {sorted(taken)} (use --flush or --year)")
+        # référentiels partagés (genres, artistes, sponsors, tiers) : slugs fixes par préfixe
+        if any(
+            model.objects.filter(slug__startswith=f"{self.prefix}-{kind}-").exists()
+            for model, kind in POOLS
+        ):
+            raise CommandError(f"Rows with prefix '{self.prefix}' already exist (use --flush or --prefix)")
+
+        with transaction.atomic():
+            genres = self._genres(opts["genres"])
+            artists = self._artists(opts["artists"], genres)
+            sponsors, tiers = self._sponsors(opts["sponsors"])
+        for year in years:
+            with transaction.atomic():
+                edition = self._edition(year, opts)
+                stages = self._stages(edition, opts["stages"])
+                unavailable = self._availabilities(edition, artists, opts["availability_ratio"])
+                self._slots(edition, stages, artists, unavailable, opts["slots_per_day"])
+                self._tickets(edition, stages)
+                self._sponsorships(edition, sponsors, tiers)
+                self._content(edition, opts["pages"], opts["news"])
+            invalidate_schedule(edition.id)  # bulk_create ne déclenche pas les signaux
+        bump_cache_version()
+
+        elapsed = _time.perf_counter() - t0
+        for label, count in sorted(self.counts.items()):
+            self.stdout.write(f"{label:<32} {count:>10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sum(self.counts.values())} rows in {elapsed:.1f}s (seed={opts['seed']})."
+        ))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _bulk(self, model, objs: List, *, ignore_conflicts: bool = False) -> List:
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=ignore_conflicts)
+        self.counts[model._meta.label] += len(created)
+        return created
+
+    def _slug(self, kind: str, i) -> str:
+        return f"{self.prefix}-{kind}-{i}"
+
+    def _flush(self) -> None:
+        editions = FestivalEdition.objects.filter(slug__startswith=f"{self.prefix}-edition-")
+        deleted, _ = Slot.objects.filter(edition__in=editions).delete()  # Slot.stage est PROTECT
+        n, _ = editions.delete()
+        deleted += n
+        for model, kind in POOLS:
+            n, _ = model.objects.filter(slug__startswith=f"{self.prefix}-{kind}-").delete()
+            deleted += n
+        self.stdout.write(f"Flushed {deleted} rows with prefix '{self.prefix}'.")
+
+    # ------------------------------------------------------------------
+    # Référentiels partagés
+    # ------------------------------------------------------------------
+
+    def _genres(self, n: int) -> List[Genre]:
+        return self._bulk(Genre, [
+            Genre(
+                name=f"{GENRES[i % len(GENRES)]} {i // len(GENRES) + 1}" if i >= len(GENRES) else GENRES[i],
+                slug=self._slug("genre", i),
+                color="#%06x" % self.rng.randrange(0x1000000),
+            )
+            for i in range(n)
+        ])
+
+    def _artists(self, n: int, genres: List[Genre]) -> List[Artist]:
+        rng = self.rng
+        artists = self._bulk(Artist, [
+            Artist(
+                name=f"{self.prefix.title()} Artist {i:06d}",
+                slug=self._slug("artist", i),
+                country=rng.choice(COUNTRIES),
+                short_bio=f"Synthetic artist #{i}.",
+                # popularité en loi de puissance : beaucoup d'artistes confidentiels, peu de têtes d'affiche
+                popularity=min(100, int(rng.paretovariate(1.3) * 6)),
+            )
+            for i in range(n)
+        ])
+        if genres:
+            # genres en loi de Zipf : quelques genres dominants
+            weights = [1.0 / (k + 1) for k in range(len(genres))]
+            through = Artist.genres.through
+            links = []
+            for a in artists:
+                picked = {g.pk for g in rng.choices(genres, weights=weights, k=rng.randint(1, 3))}
+                links.extend(through(artist_id=a.pk, genre_id=g) for g in sorted(picked))
+            self._bulk(through, links)
+        return artists
+
+    def _sponsors(self, n: int):
+        tiers = self._bulk(SponsorTier, [
+            SponsorTier(name=f"{self.prefix} {label}", slug=self._slug("tier", key), display_name=label, rank=rank)
+            for key, label, rank in TIERS
+        ])
+        sponsors = self._bulk(Sponsor, [
+            Sponsor(
+                name=f"{self.prefix.title()} Sponsor {i:05d}",
+                slug=self._slug("sponsor", i),
+                website=f"https://sponsor-{i}.example.com",
+            )
+            for i in range(n)
+        ])
+        return sponsors, tiers
+
+    # ------------------------------------------------------------------
+    # Par édition
+    # ------------------------------------------------------------------
+
+    def _edition(self, year: int, opts) -> FestivalEdition:
+        start = date(year, 7, 1) + timedelta(days=self.rng.randint(0, 20))
+        edition = FestivalEdition.objects.create(
+            name=f"{self.prefix.title()} Festival {year}",
+            slug=self._slug("edition", year),
+            year=year,
+            start_date=start,
+            end_date=start + timedelta(days=opts["days"] - 1),
+            tagline="Synthetic edition",
+        )
+        self.counts[FestivalEdition._meta.label] += 1
+        return edition
+
+    def _stages(self, edition: FestivalEdition, n: int) -> List[Stage]:
+        rng = self.rng
+        stages = []
+        for i in range(n):
+            base = STAGE_NAMES[i % len(STAGE_NAMES)]
+            stages.append(Stage(
+                edition=edition,
+                name=base if i < len(STAGE_NAMES) else f"{base} {i // len(STAGE_NAMES) + 1}",
+                covered=rng.random() < 0.4,
+                # jauges log-normales : une grande scène, beaucoup de petites
+                capacity=int(min(80000, max(200, rng.lognormvariate(8, 1)))),
+                changeover_minutes=rng.choice([0, 10, 15, 15, 20]),
+            ))
+        stages = self._bulk(Stage, stages)
+        return sorted(stages, key=lambda s: -(s.capacity or 0))
+
+    def _days(self, edition: FestivalEdition) -> List[date]:
+        return [edition.start_date + timedelta(days=d) for d in range((edition.end_date - edition.start_date).days + 1)]
+
+    def _availabilities(self, edition: FestivalEdition, artists: List[Artist], ratio: float) -> Dict[date, set]:
+        rows, unavailable = [], {}
+        for a in artists:
+            if self.rng.random() >= ratio:
+                continue
+            for day in self._days(edition):
+                available = self.rng.random() >= 0.25
+                rows.append(ArtistAvailability(artist_id=a.pk, date=day, available=available))
+                if not available:
+                    unavailable.setdefault(day, set()).add(a.pk)
+        self._bulk(ArtistAvailability, rows)
+        return unavailable
+
+    def _slots(self, edition, stages: List[Stage], artists: List[Artist], unavailable, per_day: int) -> None:
+        rng = self.rng
+        headliners = sorted(artists, key=lambda a: -a.popularity)[: max(1, len(artists) // 20)]
+        statuses = [SlotStatus.CONFIRMED] * 16 + [SlotStatus.TENTATIVE] * 3 + [SlotStatus.CANCELED]
+        batch: List[Slot] = []
+        for day in self._days(edition):
+            off = unavailable.get(day, set())
+            pool = [a.pk for a in artists if a.pk not in off] or [a.pk for a in artists]
+            top = [a.pk for a in headliners if a.pk not in off] or pool
+            for rank, stage in enumerate(stages):
+                gap = stage.changeover_minutes
+                fit = max(10, (CURFEW - DOORS) // max(1, per_day) - gap)
+                cursor = DOORS + rng.choice([0, 30, 60, 120])
+                for k in range(per_day):
+                    length = min(fit, rng.choice(SET_MINUTES))
+                    if cursor >= 24 * 60 or cursor + length > CURFEW:
+                        break  # un set commence avant minuit (il peut finir après)
+                    headline = rank == 0 and k == per_day - 1
+                    batch.append(Slot(
+                        edition_id=edition.pk, stage_id=stage.pk,
+                        artist_id=rng.choice(top if headline else pool),
+                        day=day, start_time=_minutes_to_time(cursor), end_time=_minutes_to_time(cursor + length),
+                        status=SlotStatus.CONFIRMED if headline else rng.choice(statuses),
+                        is_headliner=headline,
+                    ))
+                    cursor += length + gap
+                    if len(batch) >= self.batch_size:
+                        self._flush_slots(batch)
+        self._flush_slots(batch)
+
+    def _flush_slots(self, batch: List[Slot]) -> None:
+        for slot in batch:
+            slot.sync_window()  # bulk_create n'appelle pas save()
+        self._bulk(Slot, batch)
+        batch.clear()
+
+    def _tickets(self, edition: FestivalEdition, stages: List[Stage]) -> None:
+        rng = self.rng
+        days = self._days(edition)
+        capacity = sum(s.capacity or 0 for s in stages[:3]) or 1000
+        opening = timezone.make_aware(datetime.combine(edition.start_date - timedelta(days=180), time(10)))
+        specs = [(f"PASS{len(days)}J", f"Pass {len(days)} jours", None, Decimal("189.00"), capacity // 2),
+                 ("VIP", "Pass VIP", None, Decimal("390.00"), max(50, capacity // 50))]
+        specs += [(f"DAY{i + 1}", f"Pass 1 jour {d:%d/%m}", d, Decimal("69.00"), capacity // 3)
+                  for i, d in enumerate(days)]
+
+        tickets, counters = [], []
+        for code, name, day, price, quota in specs:
+            online = quota * 4 // 5
+            quotas = {"online": online, "partner": quota - online}
+            sold = {ch: int(q * rng.uniform(0, 0.9)) for ch, q in quotas.items()}
+            tickets.append(TicketType(
+                edition=edition, code=code, name=name, day=day, price=price,
+                phase=rng.choice([PricePhase.EARLY, PricePhase.REGULAR, PricePhase.LATE]),
+                quota_total=quota, quota_reserved=sum(sold.values()), quota_by_channel=quotas,
+                sale_start=opening, sale_end=timezone.make_aware(datetime.combine(edition.end_date, time(23))),
+            ))
+            counters.append(sold)
+        tickets = self._bulk(TicketType, tickets)
+        self._bulk(TicketChannelCounter, [
+            TicketChannelCounter(ticket_type_id=tt.pk, channel=ch, quota=tt.quota_by_channel[ch], reserved=n)
+            for tt, sold in zip(tickets, counters) for ch, n in sold.items()
+        ])
+
+    def _sponsorships(self, edition: FestivalEdition, sponsors: List[Sponsor], tiers: List[SponsorTier]) -> None:
+        rng = self.rng
+        picked = rng.sample(sponsors, k=min(len(sponsors), max(1, len(sponsors) // 3)))
+        rows = []
+        for order, sponsor in enumerate(picked):
+            # pyramide : peu de platinum, beaucoup de bronze
+            tier = rng.choices(tiers, weights=[1, 3, 6, 10])[0]
+            rows.append(Sponsorship(
+                edition=edition, sponsor=sponsor, tier=tier, order=order,
+                amount_eur=Decimal(rng.randint(1, 100) * 1000 // tier.rank), visible=rng.random() < 0.9,
+            ))
+        self._bulk(Sponsorship, rows)
+
+    def _content(self, edition: FestivalEdition, pages: int, news: int) -> None:
+        rng = self.rng
+        statuses = [PublishStatus.PUBLISHED] * 7 + [PublishStatus.DRAFT] * 2 + [PublishStatus.REVIEW]
+        self._bulk(Page, [
+            Page(edition=edition, slug=f"page-{i}", title=f"Page {i}", body_md=f"# Page {i}\n\nSynthetic content.",
+                 status=rng.choice(statuses))
+            for i in range(pages)
+        ])
+        first = timezone.make_aware(datetime.combine(edition.start_date - timedelta(days=180), time(9)))
+        self._bulk(News, [
+            News(edition=edition, title=f"News {i}", summary=f"Synthetic news #{i}", body_md="Lorem ipsum.",
+                 status=rng.choice(statuses), tags=rng.sample(["annonce", "lineup", "billetterie", "infos"], k=2),
+                 publish_at=first + timedelta(minutes=rng.randint(0, 200 * 24 * 60)))
+            for i in range(news)
+        ])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_add_i18n_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stage',
+            name='changeover_minutes',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
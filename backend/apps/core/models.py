@@ -51,6 +51,8 @@ class Stage(TimeStampedModel):
     name = models.CharField(max_length=120)
     covered = models.BooleanField(default=False)
     capacity = models.PositiveIntegerField(null=True, blank=True)
+    # montage/démontage entre deux sets (minutes), pris en compte par la détection de conflits
+    changeover_minutes = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         unique_together = [("edition", "name")]
@@ -40,7 +40,7 @@ class StageSerializer(serializers.ModelSerializer):
         model = Stage
         fields = (
             "id", "name", "edition", "edition_year", "venue",
-            "venue_name", "covered", "capacity", "created_at", "updated_at"
+            "venue_name", "covered", "capacity", "changeover_minutes", "created_at", "updated_at"
         )
 
 class ContactSerializer(serializers.ModelSerializer):
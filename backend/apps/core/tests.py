@@ -1,6 +1,7 @@
 import pytest
 from datetime import date
 from django.db import IntegrityError
+from django.core.management.base import CommandError
 from rest_framework.test import APIRequestFactory
 
 from .models import FestivalEdition, Venue, Stage
@@ -116,3 +117,34 @@ def test_i18n_localized_fallbacks():
     resp_fr = view(req_fr, pk=str(e.id))
     assert resp_fr.data["name_localized"] == "Nom FR par défaut"
     assert resp_fr.data["tagline_localized"] == "Accroche FR"
+
+
+def _seeded_schedule():
+    from apps.schedule.models import Slot
+    return list(
+        Slot.objects.filter(edition__slug__startswith="seed-edition-").order_by("day", "stage__name", "start_time")
+        .values_list("stage__name", "artist__slug", "day", "start_time", "end_time", "status")
+    )
+
+
+@pytest.mark.django_db
+def test_seed_festival_is_deterministic_and_consistent():
+    from io import StringIO
+    from django.core.management import call_command
+    from apps.schedule.services import validate_edition
+    from apps.tickets.models import TicketType
+
+    opts = dict(editions=2, stages=3, artists=50, sponsors=10, pages=2, news=3, seed=7, stdout=StringIO())
+    call_command("seed_festival", **opts)
+    first = _seeded_schedule()
+    assert first and FestivalEdition.objects.filter(slug__startswith="seed-edition-").count() == 2
+    for e in FestivalEdition.objects.filter(slug__startswith="seed-edition-"):
+        assert validate_edition(e.id) == []
+    for tt in TicketType.objects.filter(edition__slug__startswith="seed-edition-"):
+        assert sum(tt.reserved_by_channel.values()) == tt.quota_reserved <= tt.quota_total
+
+    call_command("seed_festival", flush=True, **opts)
+    assert _seeded_schedule() == first
+    # même préfixe sans --flush : refus explicite plutôt qu'une IntegrityError sur les slugs partagés
+    with pytest.raises(CommandError, match="--flush or --prefix"):
+        call_command("seed_festival", **{**opts, "year": 2200})
@@ -4,7 +4,7 @@ from __future__ import annotations
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Slot
+from .models import ScheduleSnapshot, Slot
 from .services import find_conflicts_for_slot_queryset
 
 
@@ -31,3 +31,12 @@ class SlotAdmin(admin.ModelAdmin):
             total += len(find_conflicts_for_slot_queryset(slot))
         self.message_user(request, f"Conflits détectés (sur sélection) : {total}")
     admin_check_conflicts.short_description = "Analyser les conflits (sélection)"
+
+
+@admin.register(ScheduleSnapshot)
+class ScheduleSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("edition","label","slot_count","schedule_version","published_at","created_by","created_at")
+    list_filter = ("edition",)
+    search_fields = ("label","checksum")
+    exclude = ("data",)
+    readonly_fields = ("schedule_version","slot_count","checksum","created_by","created_at","updated_at")
@@ -0,0 +1,135 @@
+# apps/schedule/agenda.py
+"""
+Agenda personnel ("mes concerts") : sélection de slots stockée dans
+`UserProfile.preferences["agenda"]` et flux ICS d'abonnement à URL signée.
+
+Le flux est assemblé à partir des fragments VEVENT par slot mis en cache
+(`ics.get_slot_fragments`) : aucun rendu complet par utilisateur. L'ETag ne
+dépend que de la sélection et des versions de planning des éditions qu'elle
+couvre (mémorisées avec la sélection), d'où un `304` sans lecture des slots
+tant que rien n'a changé dans ces éditions. Les slots annulés restent dans le
+flux avec `STATUS:CANCELLED`.
+
+Jeton : `<user_id>.<nonce>.<hmac>` ; le nonce (stocké dans l'agenda) est
+régénéré par `rotate_token` pour révoquer une URL divulguée.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import secrets
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from apps.authx.models import UserProfile
+from . import ics
+from .models import Slot
+from .services import current_schedule_version
+
+PREFERENCES_KEY = "agenda"
+
+
+def _secret() -> bytes:
+    return getattr(settings, "SCHEDULE_AGENDA_SECRET", settings.SECRET_KEY).encode("utf-8")
+
+
+def _max_slots() -> int:
+    return int(getattr(settings, "SCHEDULE_AGENDA_MAX_SLOTS", 500))
+
+
+def _sign(user_id: int, nonce: str) -> str:
+    digest = hmac.new(_secret(), f"{user_id}.{nonce}".encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode("ascii")
+
+
+# ---------------------------------------------------------------------------
+# Sélection
+# ---------------------------------------------------------------------------
+
+def _agenda(profile: UserProfile) -> Dict:
+    data = (profile.preferences or {}).get(PREFERENCES_KEY)
+    return dict(data) if isinstance(data, dict) else {}
+
+
+def selected_slots(profile: UserProfile) -> List[int]:
+    return sorted({int(i) for i in _agenda(profile).get("slots", []) if str(i).isdigit()})
+
+
+def selected_editions(profile: UserProfile, slot_ids: List[int]) -> List[int]:
+    editions = _agenda(profile).get("editions")
+    if editions is None:  # sélection enregistrée avant le suivi des éditions
+        editions = Slot.objects.filter(pk__in=slot_ids).order_by().values_list("edition_id", flat=True).distinct()
+    return sorted({int(e) for e in editions})
+
+
+def set_slots(profile: UserProfile, slot_ids: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """
+    Remplace la sélection par les slots existants parmi `slot_ids`.
+    Retourne (sélection enregistrée, ids inconnus). ValueError si trop de slots.
+    """
+    wanted = sorted({int(i) for i in slot_ids})
+    if len(wanted) > _max_slots():
+        raise ValueError(f"at most {_max_slots()} slots")
+    known = dict(Slot.objects.filter(pk__in=wanted).values_list("id", "edition_id"))
+    slots = [i for i in wanted if i in known]
+    agenda = _agenda(profile)
+    agenda["slots"] = slots
+    agenda["editions"] = sorted({known[i] for i in slots})
+    profile.preferences = {**(profile.preferences or {}), PREFERENCES_KEY: agenda}
+    profile.save(update_fields=["preferences", "updated_at"])
+    return slots, [i for i in wanted if i not in known]
+
+
+# ---------------------------------------------------------------------------
+# Jeton d'abonnement
+# ---------------------------------------------------------------------------
+
+def token_for(profile: UserProfile, *, rotate: bool = False) -> str:
+    agenda = _agenda(profile)
+    nonce = agenda.get("token")
+    if rotate or not nonce:
+        agenda["token"] = nonce = secrets.token_urlsafe(9)
+        profile.preferences = {**(profile.preferences or {}), PREFERENCES_KEY: agenda}
+        profile.save(update_fields=["preferences", "updated_at"])
+    return f"{profile.user_id}.{nonce}.{_sign(profile.user_id, nonce)}"
+
+
+def profile_for_token(token: str) -> Optional[UserProfile]:
+    """Profil correspondant à un jeton valide (signature + nonce courant), sinon None."""
+    try:
+        uid, nonce, sig = token.split(".")
+        uid = int(uid)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(sig, _sign(uid, nonce)):
+        return None
+    profile = UserProfile.objects.filter(user_id=uid).only("user_id", "preferences").first()
+    if profile is None or _agenda(profile).get("token") != nonce:
+        return None
+    return profile
+
+
+# ---------------------------------------------------------------------------
+# Flux ICS
+# ---------------------------------------------------------------------------
+
+@dataclass
+class AgendaFeed:
+    etag: str
+    slot_ids: List[int]
+    version: str
+
+    def body(self) -> bytes:
+        return ics.assemble_calendar(ics.get_slot_fragments(self.slot_ids, version=self.version))
+
+
+def agenda_feed(profile: UserProfile) -> AgendaFeed:
+    """ETag calculé sans toucher aux slots ; le corps n'est rendu que si nécessaire."""
+    slot_ids = selected_slots(profile)
+    versions = ",".join(f"{ed}.{current_schedule_version(ed)}" for ed in selected_editions(profile, slot_ids))
+    version = hashlib.sha256(versions.encode("ascii")).hexdigest()[:16]
+    raw = f"{version}:{','.join(map(str, slot_ids))}".encode("ascii")
+    return AgendaFeed(etag='"%s"' % hashlib.sha256(raw).hexdigest()[:40], slot_ids=slot_ids, version=version)
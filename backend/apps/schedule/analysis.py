@@ -0,0 +1,122 @@
+# apps/schedule/analysis.py
+"""
+Analyse d'une édition : chevauchements de têtes d'affiche et répartition
+projetée du public par scène.
+
+- Clashs : balayage unique par jour des slots `is_headliner` (scènes différentes).
+- Affluence : par jour, une courbe minute par minute par scène construite par
+  tableaux de différences (+poids au début, -poids à la fin) puis somme cumulée
+  (`itertools.accumulate`) ; le coût ne dépend pas de la durée des slots.
+  Modèle : à chaque minute, le public `audience` se répartit entre les scènes
+  actives au prorata de la popularité de l'artiste (+1), plafonné par
+  `Stage.capacity`.
+"""
+from __future__ import annotations
+
+from itertools import accumulate
+from typing import Dict, List, Optional
+
+from .index import end_seconds, sweep_overlaps, time_to_seconds
+from .models import Slot, SlotStatus
+
+MINUTES_PER_DAY = 24 * 60
+HORIZON = 2 * MINUTES_PER_DAY  # jour de programmation + nuit suivante (slots passant minuit)
+
+
+def _hm(minute: int) -> str:
+    minute %= MINUTES_PER_DAY  # après minuit : heure du lendemain
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def _rows(edition_id: int, day=None):
+    qs = Slot.objects.filter(edition_id=edition_id).exclude(status=SlotStatus.CANCELED)
+    if day is not None:
+        qs = qs.filter(day=day)
+    return qs.order_by("day", "start_time").values_list(
+        "id", "day", "stage_id", "stage__name", "stage__capacity",
+        "start_time", "end_time", "is_headliner", "artist__name", "artist__popularity",
+    )
+
+
+def headliner_clashes(rows) -> List[Dict]:
+    """Paires de têtes d'affiche qui se chevauchent sur des scènes différentes."""
+    by_day: Dict[object, List] = {}
+    for row in rows:
+        if row[7]:
+            by_day.setdefault(row[1], []).append(row)
+    clashes = []
+    for day, slots in sorted(by_day.items()):
+        intervals = [(time_to_seconds(r[5]) // 60, end_seconds(r[5], r[6]) // 60, r) for r in slots]
+        for a, b in sweep_overlaps(intervals):
+            if a[2] == b[2]:
+                continue  # même scène : conflit classique, hors périmètre
+            start = max(time_to_seconds(a[5]), time_to_seconds(b[5])) // 60
+            end = min(end_seconds(a[5], a[6]), end_seconds(b[5], b[6])) // 60
+            clashes.append({
+                "day": str(day),
+                "start": _hm(start),
+                "end": _hm(end),
+                "minutes": end - start,
+                "slots": [
+                    {"slot_id": r[0], "stage": r[3], "artist": r[8]} for r in (a, b)
+                ],
+            })
+    return clashes
+
+
+def attendance_curves(rows, audience: Optional[int] = None) -> List[Dict]:
+    """
+    Courbes d'affluence projetée par jour et par scène, restreintes à
+    [première minute jouée, dernière minute jouée[ de la journée.
+    """
+    by_day: Dict[object, List] = {}
+    for row in rows:
+        by_day.setdefault(row[1], []).append(row)
+
+    days = []
+    for day, slots in sorted(by_day.items()):
+        stages: Dict[int, Dict] = {}
+        diffs: Dict[int, List[int]] = {}
+        first, last = MINUTES_PER_DAY, 0
+        for pk, _, stage_id, stage_name, capacity, st, et, _, _, popularity in slots:
+            start, end = time_to_seconds(st) // 60, end_seconds(st, et) // 60
+            first, last = min(first, start), max(last, end)
+            if stage_id not in diffs:
+                diffs[stage_id] = [0] * (HORIZON + 1)
+                stages[stage_id] = {"stage_id": stage_id, "stage": stage_name, "capacity": capacity}
+            weight = (popularity or 0) + 1
+            diffs[stage_id][start] += weight
+            diffs[stage_id][end] -= weight
+
+        # poids par minute (somme cumulée) puis total toutes scènes
+        weights = {sid: list(accumulate(d))[first:last] for sid, d in diffs.items()}
+        total = [sum(col) for col in zip(*weights.values())]
+        # public par défaut : somme des capacités (sinon 100 -> courbes en % du public)
+        crowd = audience or sum(s["capacity"] or 0 for s in stages.values()) or 100
+
+        for sid, curve in weights.items():
+            cap = stages[sid]["capacity"]
+            projected = [
+                (crowd * w // t if t else 0) for w, t in zip(curve, total)
+            ]
+            if cap:
+                projected = [min(cap, v) for v in projected]
+            stages[sid]["attendance"] = projected
+            stages[sid]["peak"] = max(projected, default=0)
+        days.append({
+            "day": str(day),
+            "start": _hm(first),
+            "minutes": last - first,
+            "audience": crowd,
+            "stages": sorted(stages.values(), key=lambda s: s["stage"]),
+        })
+    return days
+
+
+def analyse_edition(edition_id: int, *, day=None, audience: Optional[int] = None) -> Dict:
+    rows = list(_rows(edition_id, day))
+    return {
+        "edition": edition_id,
+        "headliner_clashes": headliner_clashes(rows),
+        "attendance": attendance_curves(rows, audience=audience),
+    }
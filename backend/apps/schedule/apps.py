@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from django.apps import AppConfig
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 
 
 class ScheduleConfig(AppConfig):
@@ -9,9 +9,20 @@ class ScheduleConfig(AppConfig):
     name = "apps.schedule"
 
     def ready(self):
-        # Brancher les signaux (webhooks + métriques + détection d'annulation)
+        # Brancher les signaux (webhooks + métriques + détection d'annulation + index conflits)
+        from apps.core.models import Stage
+        from apps.lineup.models import Artist
         from .models import Slot
-        from .signals import slot_pre_save_cache, slot_post_save_emit  # noqa: F401
+        from .signals import (  # noqa: F401
+            artist_post_save_drop_feeds,
+            slot_pre_save_cache,
+            slot_post_save_emit,
+            slot_post_delete_invalidate,
+            stage_post_save_drop_feeds,
+        )
 
         pre_save.connect(slot_pre_save_cache, sender=Slot, dispatch_uid="schedule_slot_pre_save")
         post_save.connect(slot_post_save_emit, sender=Slot, dispatch_uid="schedule_slot_post_save")
+        post_delete.connect(slot_post_delete_invalidate, sender=Slot, dispatch_uid="schedule_slot_post_delete")
+        post_save.connect(stage_post_save_drop_feeds, sender=Stage, dispatch_uid="schedule_stage_post_save_feeds")
+        post_save.connect(artist_post_save_drop_feeds, sender=Artist, dispatch_uid="schedule_artist_post_save_feeds")
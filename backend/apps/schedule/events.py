@@ -0,0 +1,248 @@
+# apps/schedule/events.py
+"""
+Diffusion des changements de Slot en Server-Sent Events.
+
+Les signaux publient (après commit) les mêmes payloads que les webhooks
+`schedule.slot.*` dans un broker ; les écritures en masse (statut en masse,
+copie de template, import, solveur), qui n'émettent pas de signaux, publient
+un événement par slot via `publish_slots` ; l'endpoint SSE (vue async, servie par
+`festival_backend.asgi`) lit le broker depuis un curseur (`Last-Event-ID`).
+
+- `LocalBroker` : tampon circulaire en mémoire du process, réveil des
+  abonnés sans polling. Suffisant avec un seul worker ASGI.
+- `CacheBroker` : séquence + événements dans le cache Django (Redis en
+  prod), partagé entre workers ; les abonnés interrogent le cache.
+
+Le broker est choisi par `settings.SCHEDULE_EVENTS_BROKER` (chemin pointé).
+Si le curseur du client n'est plus couvert par le tampon (redémarrage,
+événements expirés), le flux émet `schedule.reset` : le client recharge
+l'état complet (`/slots/`, ICS) puis continue.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+RESET_EVENT = "schedule.reset"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    event: str
+    data: Dict
+
+    def encode(self) -> bytes:
+        body = json.dumps(self.data, separators=(",", ":"), ensure_ascii=False)
+        return f"id: {self.id}\nevent: {self.event}\ndata: {body}\n\n".encode("utf-8")
+
+
+def _backlog() -> int:
+    return int(getattr(settings, "SCHEDULE_EVENTS_BACKLOG", 1000))
+
+
+class Broker:
+    """Interface : `publish`, `read(cursor)` -> (événements > cursor, reset), `last_id`."""
+
+    poll_interval = 1.0
+
+    def publish(self, event: str, data: Dict) -> Event:
+        raise NotImplementedError
+
+    def read(self, cursor: int) -> Tuple[List[Event], bool]:
+        raise NotImplementedError
+
+    def last_id(self) -> int:
+        raise NotImplementedError
+
+    async def wait(self, cursor: int, timeout: float) -> Tuple[List[Event], bool]:
+        """Attend au plus `timeout` s des événements après `cursor` (défaut : polling)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        read = sync_to_async(self.read, thread_sensitive=False)
+        while True:
+            events, reset = await read(cursor)
+            remaining = deadline - loop.time()
+            if events or reset or remaining <= 0:
+                return events, reset
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+
+def _wake(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class LocalBroker(Broker):
+    def __init__(self, backlog: Optional[int] = None):
+        self._events: deque = deque(maxlen=backlog or _backlog())
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waiters = set()  # (loop, future) des abonnés en attente
+
+    def publish(self, event: str, data: Dict) -> Event:
+        with self._lock:
+            self._seq += 1
+            ev = Event(self._seq, event, data)
+            self._events.append(ev)
+            waiters, self._waiters = self._waiters, set()
+        # les signaux tournent dans un thread sync : réveil via la boucle de chaque abonné
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, fut)
+            except RuntimeError:  # boucle fermée
+                pass
+        return ev
+
+    def _read(self, cursor: int) -> Tuple[List[Event], bool]:
+        if cursor > self._seq:
+            return [], True
+        if not self._events or cursor >= self._seq:
+            return [], False
+        if cursor < self._events[0].id - 1:
+            return [], True
+        return [e for e in self._events if e.id > cursor], False
+
+    def read(self, cursor: int) -> Tuple[List[Event], bool]:
+        with self._lock:
+            return self._read(cursor)
+
+    def last_id(self) -> int:
+        return self._seq
+
+    async def wait(self, cursor: int, timeout: float) -> Tuple[List[Event], bool]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            events, reset = self._read(cursor)
+            if events or reset:
+                return events, reset
+            self._waiters.add((loop, fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard((loop, fut))
+        return self.read(cursor)
+
+
+class CacheBroker(Broker):
+    SEQ_KEY = "schedule:events:seq"
+    EVENT_KEY = "schedule:events:{id}"
+
+    def __init__(self, backlog: Optional[int] = None, alias: str = "default"):
+        self.backlog = backlog or _backlog()
+        self.alias = alias
+        self.ttl = int(getattr(settings, "SCHEDULE_EVENTS_TTL", 3600))
+        self.poll_interval = float(getattr(settings, "SCHEDULE_EVENTS_POLL_INTERVAL", 1.0))
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def publish(self, event: str, data: Dict) -> Event:
+        self.cache.add(self.SEQ_KEY, 0, None)
+        seq = self.cache.incr(self.SEQ_KEY)  # atomique sur Redis
+        self.cache.set(self.EVENT_KEY.format(id=seq), (event, data), self.ttl)
+        return Event(seq, event, data)
+
+    def last_id(self) -> int:
+        return int(self.cache.get(self.SEQ_KEY) or 0)
+
+    def read(self, cursor: int) -> Tuple[List[Event], bool]:
+        seq = self.last_id()
+        if cursor > seq:
+            return [], True
+        first = max(cursor + 1, seq - self.backlog + 1)
+        if first > seq:
+            return [], False
+        if first > cursor + 1:
+            return [], True
+        found = self.cache.get_many([self.EVENT_KEY.format(id=i) for i in range(first, seq + 1)])
+        events: List[Event] = []
+        for i in range(first, seq + 1):
+            item = found.get(self.EVENT_KEY.format(id=i))
+            if item is None:
+                if events:
+                    break  # publication en cours (incr fait, set pas encore)
+                continue
+            if not events and i > first:
+                return [], True  # événements expirés avant le premier trouvé
+            events.append(Event(i, *item))
+        return events, False
+
+
+@lru_cache(maxsize=1)
+def get_broker() -> Broker:
+    path = getattr(settings, "SCHEDULE_EVENTS_BROKER", "apps.schedule.events.LocalBroker")
+    return import_string(path)()
+
+
+def publish(event: str, data: Dict) -> Optional[Event]:
+    """Best-effort : une panne du broker ne doit pas faire échouer la sauvegarde."""
+    try:
+        return get_broker().publish(event, data)
+    except Exception:
+        logger.exception("schedule events: publish failed (%s)", event)
+        return None
+
+
+def slot_payload(event: str, slot) -> Dict:
+    return {
+        "event": event,
+        "slot": {
+            "id": slot.id,
+            "edition": slot.edition_id,
+            "stage": slot.stage_id,
+            "artist": slot.artist_id,
+            "day": str(slot.day),
+            "start": str(slot.start_time),
+            "end": str(slot.end_time),
+            "status": slot.status,
+        }
+    }
+
+
+def publish_slots(event: str, slots) -> None:
+    """Un événement par slot, publié après commit (écritures en masse, sans signaux)."""
+    payloads = [slot_payload(event, s) for s in slots]
+    if payloads:
+        transaction.on_commit(lambda: [publish(event, p) for p in payloads])
+
+
+async def stream(broker: Broker, cursor: Optional[int], *, edition: Optional[int] = None, heartbeat: float = 15.0):
+    """Flux SSE infini : rejoue depuis `cursor`, puis pousse les nouveaux événements."""
+    retry_ms = int(getattr(settings, "SCHEDULE_EVENTS_RETRY_MS", 3000))
+    yield f"retry: {retry_ms}\n\n".encode("ascii")
+    last_id = sync_to_async(broker.last_id, thread_sensitive=False)
+    if cursor is None:
+        cursor = await last_id()
+    while True:
+        events, reset = await broker.wait(cursor, heartbeat)
+        if reset:
+            cursor = await last_id()
+            yield Event(cursor, RESET_EVENT, {"event": RESET_EVENT}).encode()
+            continue
+        if not events:
+            yield b": ping\n\n"
+            continue
+        for ev in events:
+            cursor = ev.id
+            if edition is None or ev.data.get("slot", {}).get("edition") == edition:
+                yield ev.encode()
@@ -0,0 +1,93 @@
+# apps/schedule/grid.py
+"""
+Grille jour × scène au format colonnaire pour la page lineup publique.
+
+Les dictionnaires (jours, scènes, artistes, statuts) sont émis une seule fois ;
+les slots sont des tableaux parallèles d'entiers (indices, minutes depuis
+minuit). Le JSON est précalculé par édition et mis en cache sous la version
+de planning : toute modification de Slot (signaux) le rend obsolète.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Slot, SlotStatus
+
+GRID_KEY = "schedule:grid:ed{edition}:v{version}"
+STATUSES = [value for value, _ in SlotStatus.choices]
+
+
+@dataclass
+class StoredGrid:
+    etag: str
+    body: bytes
+
+
+def _minutes(t) -> int:
+    return t.hour * 60 + t.minute
+
+
+def build_payload(edition_id: int) -> Dict:
+    rows = (
+        Slot.objects.filter(edition_id=edition_id)
+        .order_by("day", "stage__name", "start_time", "id")
+        .values_list(
+            "id", "day", "stage_id", "stage__name", "artist_id", "artist__name", "artist__slug",
+            "start_time", "end_time", "status", "is_headliner",
+        )
+    )
+    days: List[str] = []
+    stages: Dict[int, int] = {}
+    artists: Dict[int, int] = {}
+    payload = {
+        "edition": edition_id,
+        "days": days,
+        "stages": {"id": [], "name": []},
+        "artists": {"id": [], "name": [], "slug": []},
+        "statuses": STATUSES,
+        "slots": {
+            "id": [], "day": [], "stage": [], "artist": [],
+            "start": [], "end": [], "status": [], "headliner": [],
+        },
+    }
+    status_index = {s: i for i, s in enumerate(STATUSES)}
+    cols = payload["slots"]
+    for pk, day, stage_id, stage_name, artist_id, artist_name, artist_slug, st, et, status, headliner in rows:
+        day_s = day.isoformat()
+        if not days or days[-1] != day_s:
+            days.append(day_s)
+        if stage_id not in stages:
+            stages[stage_id] = len(stages)
+            payload["stages"]["id"].append(stage_id)
+            payload["stages"]["name"].append(stage_name)
+        if artist_id not in artists:
+            artists[artist_id] = len(artists)
+            payload["artists"]["id"].append(artist_id)
+            payload["artists"]["name"].append(artist_name)
+            payload["artists"]["slug"].append(artist_slug)
+        cols["id"].append(pk)
+        cols["day"].append(len(days) - 1)
+        cols["stage"].append(stages[stage_id])
+        cols["artist"].append(artists[artist_id])
+        cols["start"].append(_minutes(st))
+        cols["end"].append(_minutes(et) + (24 * 60 if et < st else 0))  # > 1440 : passe minuit
+        cols["status"].append(status_index.get(status, -1))
+        cols["headliner"].append(1 if headliner else 0)
+    return payload
+
+
+def get_grid(edition_id: int, version: int) -> StoredGrid:
+    key = GRID_KEY.format(edition=edition_id, version=version)
+    grid = cache.get(key)
+    if grid is None:
+        body = json.dumps(build_payload(edition_id), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        grid = StoredGrid(etag='"%s"' % hashlib.sha256(body).hexdigest()[:40], body=body)
+        # TTL long : les versions périmées expirent d'elles-mêmes
+        cache.set(key, grid, int(getattr(settings, "SCHEDULE_GRID_CACHE_TTL", 86400)))
+    return grid
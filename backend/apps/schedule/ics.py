@@ -0,0 +1,259 @@
+# apps/schedule/ics.py
+"""
+Sérialiseur ICS (RFC 5545) minimaliste, sans construire d'objet `icalendar`.
+
+Chaque slot est rendu en un fragment VEVENT autonome (texte CRLF, lignes
+pliées à 75 octets), ce qui permet de streamer un calendrier ligne à ligne
+depuis un `QuerySet.values().iterator()` à mémoire constante.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import SlotStatus
+
+TZID = "Europe/Paris"
+
+CALENDAR_HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Festival//FR\r\n"
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+# champs lus par `render_vevent` (à passer à QuerySet.values())
+VEVENT_FIELDS = (
+    "id", "day", "start_time", "end_time", "status", "is_headliner", "notes",
+    "artist__name", "stage__name",
+)
+
+
+def escape_text(value: str) -> str:
+    return (
+        (value or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str, limit: int = 75) -> str:
+    """Plie une ligne de contenu à `limit` octets UTF-8 (sans couper un caractère)."""
+    raw = line.encode("utf-8")
+    if len(raw) <= limit:
+        return line + "\r\n"
+    parts = []
+    chunk = ""
+    size = 0
+    budget = limit
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > budget:
+            parts.append(chunk)
+            chunk, size = "", 0
+            budget = limit - 1  # l'espace de continuation compte
+        chunk += ch
+        size += n
+    parts.append(chunk)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_local(d: date, t: time) -> str:
+    return f"{d:%Y%m%d}T{t:%H%M%S}"
+
+
+def render_vevent(row: Dict) -> str:
+    """Rend un slot (dict issu de `values(*VEVENT_FIELDS)`) en fragment VEVENT."""
+    artist = row["artist__name"]
+    stage = row["stage__name"]
+    # fin < début : le slot passe minuit
+    end_day = row["day"] + timedelta(days=1) if row["end_time"] < row["start_time"] else row["day"]
+    lines = [
+        "BEGIN:VEVENT",
+        f"SUMMARY:{escape_text(f'{artist} @ {stage}')}",
+        f"DTSTART;TZID={TZID}:{format_local(row['day'], row['start_time'])}",
+        f"DTEND;TZID={TZID}:{format_local(end_day, row['end_time'])}",
+        f"UID:slot-{row['id']}@festival",
+    ]
+    if row.get("status") == SlotStatus.CANCELED:
+        # garde l'UID : les calendriers abonnés marquent l'événement annulé
+        lines.append("STATUS:CANCELLED")
+    if row.get("is_headliner"):
+        lines.append("CATEGORIES:Headliner")
+    notes = (row.get("notes") or "")[:1024]
+    if notes:
+        lines.append(f"DESCRIPTION:{escape_text(notes)}")
+    lines.append(f"LOCATION:{escape_text(stage)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def stream_calendar(rows: Iterable[Dict], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Générateur d'octets (blocs ~`chunk_size`) : en-tête, un VEVENT par ligne, pied."""
+    buf = [CALENDAR_HEADER]
+    size = len(CALENDAR_HEADER)
+    for row in rows:
+        frag = render_vevent(row)
+        buf.append(frag)
+        size += len(frag)
+        if size >= chunk_size:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    buf.append(CALENDAR_FOOTER)
+    yield "".join(buf).encode("utf-8")
+
+
+# ---------------------------------------------------------------------------
+# Flux précalculés (par édition / par scène) avec ETag fort
+# ---------------------------------------------------------------------------
+#
+# Chaque flux stocké (cache, TTL `SCHEDULE_ICS_FEED_TTL`) conserve ses fragments
+# VEVENT par slot : une sauvegarde de Slot ne re-rend que son fragment (après
+# commit) puis re-concatène le flux. Les changements de masse (copie, imports,
+# renommages) suppriment les flux, reconstruits paresseusement à la requête
+# suivante. Le TTL borne la durée de vie d'un flux construit à partir de lignes
+# lues avant un commit concurrent.
+
+FEED_KEY = "schedule:ics:feed:ed{edition}:st{stage}"
+
+
+@dataclass
+class StoredFeed:
+    etag: str
+    body: bytes
+    fragments: Dict[int, Tuple[Tuple, str]] = field(default_factory=dict)  # slot_id -> (clé de tri, VEVENT)
+
+
+def _feed_ttl() -> int:
+    return int(getattr(settings, "SCHEDULE_ICS_FEED_TTL", 3600))
+
+
+def feed_key(edition_id: int, stage_id: Optional[int] = None) -> str:
+    return FEED_KEY.format(edition=edition_id, stage=stage_id if stage_id is not None else "all")
+
+
+def _sort_key(row: Dict) -> Tuple:
+    # même ordre que Slot.Meta.ordering (day, stage__name, start_time)
+    return (row["day"].isoformat(), row["stage__name"], row["start_time"].isoformat(), row["id"])
+
+
+def assemble_calendar(fragments: Dict[int, Tuple[Tuple, str]]) -> bytes:
+    parts = [CALENDAR_HEADER]
+    parts.extend(frag for _, frag in sorted(fragments.values()))
+    parts.append(CALENDAR_FOOTER)
+    return "".join(parts).encode("utf-8")
+
+
+def _assemble(fragments: Dict[int, Tuple[Tuple, str]]) -> StoredFeed:
+    body = assemble_calendar(fragments)
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:40]
+    return StoredFeed(etag=etag, body=body, fragments=fragments)
+
+
+def _slot_rows(**filters) -> Iterable[Dict]:
+    from .models import Slot
+    return Slot.objects.filter(**filters).order_by().values("edition_id", "stage_id", *VEVENT_FIELDS)
+
+
+def build_feed(edition_id: int, stage_id: Optional[int] = None) -> StoredFeed:
+    filters = {"edition_id": edition_id}
+    if stage_id is not None:
+        filters["stage_id"] = stage_id
+    fragments = {row["id"]: (_sort_key(row), render_vevent(row)) for row in _slot_rows(**filters)}
+    feed = _assemble(fragments)
+    cache.set(feed_key(edition_id, stage_id), feed, _feed_ttl())
+    return feed
+
+
+def get_feed(edition_id: int, stage_id: Optional[int] = None) -> StoredFeed:
+    feed = cache.get(feed_key(edition_id, stage_id))
+    if feed is None:
+        feed = build_feed(edition_id, stage_id)
+    return feed
+
+
+def refresh_slot_feeds(
+    slot_id: int,
+    *,
+    keys: Iterable[Tuple[int, int]],
+    deleted: bool = False,
+) -> None:
+    """
+    Met à jour le fragment d'un slot dans les flux stockés concernés
+    (`keys` = couples (édition, scène) anciens et nouveaux). Appelée après
+    commit (signaux) : un changement annulé n'atteint jamais les flux.
+    Un flux absent du cache est ignoré (construit à la demande) ; en cas de
+    mise à jour concurrente, le flux est supprimé plutôt que risquer un état faux.
+    """
+    row = None
+    if not deleted:
+        row = next(iter(_slot_rows(pk=slot_id)), None)
+    frag = (_sort_key(row), render_vevent(row)) if row else None
+
+    targets = set()
+    for edition_id, stage_id in keys:
+        targets.add((edition_id, None))
+        targets.add((edition_id, stage_id))
+
+    for edition_id, stage_id in targets:
+        key = feed_key(edition_id, stage_id)
+        lock = f"{key}:lock"
+        if not cache.add(lock, 1, 10):
+            cache.delete(key)
+            continue
+        try:
+            feed = cache.get(key)
+            if feed is None:
+                continue
+            fragments = dict(feed.fragments)
+            fragments.pop(slot_id, None)
+            if row and row["edition_id"] == edition_id and stage_id in (None, row["stage_id"]):
+                fragments[slot_id] = frag
+            cache.set(key, _assemble(fragments), _feed_ttl())
+        finally:
+            cache.delete(lock)
+
+
+# ---------------------------------------------------------------------------
+# Fragments VEVENT par slot (agendas personnels)
+# ---------------------------------------------------------------------------
+#
+# Clés versionnées par les versions des éditions de la sélection (cf.
+# `agenda.agenda_feed`) : partagées entre les agendas des mêmes éditions, seuls
+# les fragments manquants sont rendus (une requête).
+
+VEVENT_KEY = "schedule:ics:vevent:s{slot}:v{version}"
+
+
+def get_slot_fragments(slot_ids: Iterable[int], *, version: str) -> Dict[int, Tuple[Tuple, str]]:
+    """slot_id -> (clé de tri, VEVENT) ; les slots inexistants sont ignorés."""
+    keys = {slot_id: VEVENT_KEY.format(slot=slot_id, version=version) for slot_id in slot_ids}
+    found = cache.get_many(list(keys.values()))
+    fragments = {slot_id: found[key] for slot_id, key in keys.items() if key in found}
+    missing = [slot_id for slot_id in keys if slot_id not in fragments]
+    if missing:
+        rendered = {row["id"]: (_sort_key(row), render_vevent(row)) for row in _slot_rows(pk__in=missing)}
+        ttl = int(getattr(settings, "SCHEDULE_ICS_FRAGMENT_TTL", 86400))
+        cache.set_many({keys[slot_id]: frag for slot_id, frag in rendered.items()}, ttl)
+        fragments.update(rendered)
+    return fragments
+
+
+def drop_feeds(edition_id: int, stage_ids: Optional[Iterable[int]] = None) -> None:
+    """Supprime les flux stockés d'une édition (toutes scènes si `stage_ids` absent)."""
+    if stage_ids is None:
+        from apps.core.models import Stage
+        from .models import Slot
+        stage_ids = set(Stage.objects.filter(edition_id=edition_id).values_list("id", flat=True))
+        stage_ids.update(
+            Slot.objects.filter(edition_id=edition_id).order_by().values_list("stage_id", flat=True).distinct()
+        )
+    keys = [feed_key(edition_id)] + [feed_key(edition_id, sid) for sid in stage_ids]
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        pass
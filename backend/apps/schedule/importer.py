@@ -0,0 +1,295 @@
+# apps/schedule/importer.py
+"""
+Import en masse de slots depuis un fichier CSV, JSON (liste) ou JSON Lines.
+
+Colonnes : stage, artist, day, start_time, end_time ; optionnelles : status,
+is_headliner, changeover_minutes, notes, edition (si pas d'édition imposée).
+`stage` et `artist` acceptent un id ou un nom (artiste : nom ou slug).
+
+Coût constant en requêtes, quel que soit le nombre de lignes :
+- lecture du fichier en flux (CSV / JSON Lines ligne à ligne) ;
+- une requête par table de référence (éditions, scènes, artistes) ;
+- validation en mémoire de toutes les lignes (dates dans l'édition, horaires) ;
+- conflits : un seul balayage via `find_conflicts_batch` (une requête) ;
+- écriture `bulk_create` par lots dans une transaction, un seul webhook
+  `schedule.slots.imported` (bulk_create ne déclenche pas les signaux).
+
+Les lignes invalides sont rapportées (`row` = rang de la ligne de données,
+à partir de 1) ; les lignes valides sont écrites, sauf en mode `strict`.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import date, time
+from typing import IO, Dict, Iterable, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from apps.common.services import dispatch_webhook
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from . import events
+from .metrics import SLOTS_STATUS_TOTAL
+from .models import Slot, SlotStatus, max_slot_hours, slot_too_long
+from .services import find_conflicts_batch, invalidate_schedule
+
+FORMATS = ("csv", "json", "jsonl")
+REQUIRED = ("stage", "artist", "day", "start_time", "end_time")
+_TRUE = {"1", "true", "yes", "y", "on", "oui"}
+
+
+@dataclass
+class RowError:
+    row: int
+    field: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    valid: int = 0
+    created: int = 0
+    dry_run: bool = False
+    errors: List[RowError] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "valid": self.valid,
+            "created": self.created,
+            "dry_run": self.dry_run,
+            "errors": [asdict(e) for e in self.errors],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Lecture (flux)
+# ---------------------------------------------------------------------------
+
+def detect_format(filename: str) -> str:
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext == "ndjson":
+        return "jsonl"
+    if ext not in FORMATS:
+        raise ValueError(f"unsupported format '{ext}' (expected one of {', '.join(FORMATS)})")
+    return ext
+
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[Dict]:
+    """Itère les lignes du fichier (octets, UTF-8 avec ou sans BOM)."""
+    text = codecs.getreader("utf-8-sig")(stream)
+    if fmt == "csv":
+        try:
+            for row in csv.DictReader(text):
+                yield {k.strip(): (v or "").strip() for k, v in row.items() if isinstance(k, str)}
+        except csv.Error as exc:
+            raise ValueError(f"invalid CSV: {exc}")
+    elif fmt == "jsonl":
+        for line in text:
+            if line.strip():
+                item = json.loads(line)
+                yield item if isinstance(item, dict) else {}
+    elif fmt == "json":
+        data = json.load(text)  # pas de parseur JSON incrémental en stdlib
+        if isinstance(data, dict):
+            data = data.get("slots")
+        if not isinstance(data, list):
+            raise ValueError("JSON must be a list of slots (or {\"slots\": [...]})")
+        for item in data:
+            yield item if isinstance(item, dict) else {}
+    else:
+        raise ValueError(f"unsupported format '{fmt}'")
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _as_int(value) -> Optional[int]:
+    value = _text(value)
+    return int(value) if value.isdigit() else None
+
+
+def import_slots(
+    rows: Iterable[Dict],
+    *,
+    edition_id: Optional[int] = None,
+    status: str = SlotStatus.TENTATIVE,
+    dry_run: bool = False,
+    strict: bool = False,
+    batch_size: int = 500,
+    max_rows: Optional[int] = None,
+) -> ImportResult:
+    """
+    Valide puis écrit les slots de `rows`. `edition_id` impose l'édition de
+    toutes les lignes (sinon colonne `edition`). En mode `strict`, rien n'est
+    écrit si une ligne est invalide.
+    """
+    result = ImportResult(dry_run=dry_run)
+    items: List[Dict] = []
+    for item in rows:
+        items.append(item)
+        if max_rows is not None and len(items) > max_rows:
+            raise ValueError(f"at most {max_rows} rows per import")
+    result.total = len(items)
+    if not items:
+        return result
+
+    def _error(i: int, name: str, message: str) -> None:
+        result.errors.append(RowError(row=i + 1, field=name, message=message))
+
+    # 1) références : une requête par table
+    edition_ids = {edition_id} if edition_id else {_as_int(it.get("edition")) for it in items} - {None}
+    editions = {e.id: e for e in FestivalEdition.objects.filter(pk__in=edition_ids)}
+
+    stages_by_id: Dict[int, int] = {}
+    stages_by_name: Dict[tuple, int] = {}
+    for pk, ed, name in Stage.objects.filter(edition_id__in=editions).values_list("id", "edition_id", "name"):
+        stages_by_id[pk] = ed
+        stages_by_name[(ed, name.casefold())] = pk
+
+    artist_keys = {_text(it.get("artist")) for it in items} - {""}
+    artist_ids = {int(k) for k in artist_keys if k.isdigit()}
+    names = artist_keys - {str(i) for i in artist_ids}
+    artists_by_id, artists_by_key = set(), {}
+    if artist_keys:
+        for pk, name, slug in Artist.objects.filter(
+            Q(pk__in=artist_ids) | Q(name__in=names) | Q(slug__in={slugify(n) for n in names})
+        ).values_list("id", "name", "slug"):
+            artists_by_id.add(pk)
+            artists_by_key[name.casefold()] = pk
+            artists_by_key.setdefault(slug, pk)
+
+    # 2) validation de toutes les lignes, sans requête
+    statuses = dict(SlotStatus.choices)
+    candidates: List[Dict] = []
+    rows_of: List[int] = []  # candidat -> indice de ligne
+    for i, it in enumerate(items):
+        missing = [name for name in REQUIRED if not _text(it.get(name))]
+        if missing:
+            for name in missing:
+                _error(i, name, "required")
+            continue
+
+        ed_id = edition_id or _as_int(it.get("edition"))
+        edition = editions.get(ed_id)
+        if edition is None:
+            _error(i, "edition", "unknown edition")
+            continue
+
+        stage_key = _text(it["stage"])
+        stage_id = _as_int(stage_key)
+        if stage_id is None or stages_by_id.get(stage_id) != ed_id:
+            stage_id = stages_by_name.get((ed_id, stage_key.casefold()))
+        if stage_id is None:
+            _error(i, "stage", f"unknown stage '{stage_key}' for edition {ed_id}")
+            continue
+
+        artist_key = _text(it["artist"])
+        artist_id = _as_int(artist_key)
+        if artist_id not in artists_by_id:
+            artist_id = artists_by_key.get(artist_key.casefold()) or artists_by_key.get(slugify(artist_key))
+        if artist_id is None:
+            _error(i, "artist", f"unknown artist '{artist_key}'")
+            continue
+
+        try:
+            day = date.fromisoformat(_text(it["day"]))
+        except ValueError:
+            _error(i, "day", "expected YYYY-MM-DD")
+            continue
+        if not (edition.start_date <= day <= edition.end_date):
+            _error(i, "day", "outside edition date range")
+            continue
+        try:
+            start, end = time.fromisoformat(_text(it["start_time"])), time.fromisoformat(_text(it["end_time"]))
+        except ValueError:
+            _error(i, "start_time", "expected HH:MM[:SS]")
+            continue
+        if start == end:
+            # end < start : le slot passe minuit (cf. Slot.clean)
+            _error(i, "end_time", "end_time must differ from start_time")
+            continue
+        if slot_too_long(start, end):
+            _error(i, "end_time", f"slot longer than {max_slot_hours()}h (check start/end times)")
+            continue
+
+        row_status = _text(it.get("status")) or status
+        if row_status not in statuses:
+            _error(i, "status", f"invalid status '{row_status}'")
+            continue
+        changeover = it.get("changeover_minutes")
+        if _text(changeover) and _as_int(changeover) is None:
+            _error(i, "changeover_minutes", "expected a positive integer")
+            continue
+
+        rows_of.append(i)
+        candidates.append({
+            "edition": ed_id, "stage": stage_id, "artist": artist_id, "day": day,
+            "start_time": start, "end_time": end, "status": row_status,
+            "changeover_minutes": _as_int(changeover),
+            "is_headliner": _text(it.get("is_headliner")).lower() in _TRUE,
+            "notes": _text(it.get("notes")),
+        })
+
+    # 3) conflits : un balayage (slots existants + lignes entre elles) ;
+    #    les slots annulés n'occupent pas la scène
+    active = [k for k, c in enumerate(candidates) if c["status"] != SlotStatus.CANCELED]
+    rejected = set()
+    for conflict in find_conflicts_batch([candidates[k] for k in active]):
+        if conflict.slot_id is not None:
+            rejected.add(active[conflict.candidate])
+            _error(rows_of[active[conflict.candidate]], "start_time",
+                   f"conflicts with slot {conflict.slot_id} ({conflict.start}-{conflict.end})")
+        else:
+            # chevauchement entre lignes : la première est conservée
+            rejected.add(active[conflict.other_candidate])
+            _error(rows_of[active[conflict.other_candidate]], "start_time",
+                   f"overlaps row {rows_of[active[conflict.candidate]] + 1}")
+    result.errors.sort(key=lambda e: e.row)
+
+    valid = [c for k, c in enumerate(candidates) if k not in rejected]
+    result.valid = len(valid)
+    if dry_run or not valid or (strict and result.errors):
+        return result
+
+    # 4) écriture par lots, transactionnelle
+    to_create = [Slot(
+        edition_id=c["edition"], stage_id=c["stage"], artist_id=c["artist"], day=c["day"],
+        start_time=c["start_time"], end_time=c["end_time"], status=c["status"],
+        changeover_minutes=c["changeover_minutes"], is_headliner=c["is_headliner"], notes=c["notes"],
+    ) for c in valid]
+    for slot in to_create:
+        slot.sync_window()  # bulk_create n'appelle pas save()
+    with transaction.atomic():
+        Slot.objects.bulk_create(to_create, batch_size=batch_size)
+    result.created = len(to_create)
+
+    for ed_id in sorted({c["edition"] for c in valid}):
+        invalidate_schedule(ed_id)
+    events.publish_slots("schedule.slot.created", to_create)
+    by_status: Dict[str, int] = {}
+    for c in valid:
+        by_status[c["status"]] = by_status.get(c["status"], 0) + 1
+    for st, count in by_status.items():
+        SLOTS_STATUS_TOTAL.labels(status=st).inc(count)
+    try:
+        dispatch_webhook("schedule.slots.imported", {
+            "event": "schedule.slots.imported",
+            "editions": sorted({c["edition"] for c in valid}),
+            "created": result.created,
+            "rejected": result.total - result.valid,
+        })
+    except Exception:
+        pass
+    return result
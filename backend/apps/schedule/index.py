@@ -0,0 +1,222 @@
+# apps/schedule/index.py
+"""
+Index d'intervalles en mémoire (process-local) pour la détection de conflits.
+
+Un index par (édition, scène, jour) : les slots non annulés sont triés par
+heure de début, ce qui permet de répondre en O(log n + k) via `bisect` au lieu
+de relire la base à chaque appel. La fin indexée inclut le changeover du slot
+(surcharge du slot, sinon valeur de la scène), calculé une fois au chargement.
+
+Un slot dont la fin précède le début passe minuit (fin > 24 h) ; l'index d'un
+jour inclut aussi les débordements après minuit des slots de la veille.
+
+L'index est construit paresseusement, puis invalidé par les signaux Slot
+(post_save/post_delete) et par la version de planning de l'édition (partagée
+entre workers via le cache).
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import FilteredRelation, Q
+
+IndexKey = Tuple[int, int, date]
+
+DAY_SECONDS = 24 * 3600
+ONE_DAY = timedelta(days=1)
+
+
+def time_to_seconds(t: time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+def end_seconds(start_time: time, end_time: time) -> int:
+    """Fin en secondes depuis le minuit du jour de programmation (> 86400 si le slot passe minuit)."""
+    end = time_to_seconds(end_time)
+    return end + DAY_SECONDS if end_time < start_time else end
+
+
+def sweep_overlaps(intervals: List[Tuple[int, int, object]]) -> Iterable[Tuple[object, object]]:
+    """
+    Balayage (sweep-line) : intervalles (start, end, ref) -> paires qui se chevauchent
+    (frontières ouvertes). O(n log n + k).
+    """
+    active: List[Tuple[int, int, object]] = []
+    for cur in sorted(intervals, key=lambda iv: (iv[0], iv[1])):
+        active = [iv for iv in active if iv[1] > cur[0]]
+        for iv in active:
+            yield iv[2], cur[2]
+        active.append(cur)
+
+
+@dataclass(frozen=True)
+class IndexedSlot:
+    start: int  # secondes depuis minuit
+    end: int  # fin (+24 h si passage de minuit) + changeover
+    slot_id: int
+    start_time: time
+    end_time: time
+    artist: str
+
+
+def spill(entry: "IndexedSlot") -> Optional["IndexedSlot"]:
+    """
+    Partie d'un intervalle qui déborde après minuit (fin tamponnée > 24 h),
+    ramenée sur l'échelle du lendemain ; None sinon. Les index par jour
+    intègrent les débordements de la veille : les conflits entre un set de
+    fin de nuit et les slots du lendemain sont ainsi détectés.
+    """
+    if entry.end <= DAY_SECONDS:
+        return None
+    return replace(entry, start=entry.start - DAY_SECONDS, end=entry.end - DAY_SECONDS)
+
+
+class IntervalIndex:
+    """
+    Intervalles d'une scène/jour triés par début.
+    `max_span` borne la durée d'un slot : seuls les slots commençant dans
+    ]start - max_span, end[ peuvent chevaucher [start, end[.
+    `changeover` : changeover par défaut de la scène (secondes), à ajouter à
+    la fin d'un candidat sans surcharge.
+    """
+
+    __slots__ = ("entries", "starts", "max_span", "version", "changeover")
+
+    def __init__(self, entries: List[IndexedSlot], version: int = 0, changeover: int = 0):
+        self.entries = sorted(entries, key=lambda e: (e.start, e.slot_id))
+        self.starts = [e.start for e in self.entries]
+        self.max_span = max((e.end - e.start for e in self.entries), default=0)
+        self.version = version
+        self.changeover = changeover
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: IndexedSlot) -> None:
+        """Insertion triée (utilisée pour les index locaux en cours de construction)."""
+        i = bisect_right(self.starts, entry.start)
+        self.entries.insert(i, entry)
+        self.starts.insert(i, entry.start)
+        self.max_span = max(self.max_span, entry.end - entry.start)
+
+    def discard(self, slot_id: int) -> None:
+        """Retire les intervalles d'un slot (`max_span` reste un majorant valide)."""
+        keep = [i for i, e in enumerate(self.entries) if e.slot_id != slot_id]
+        self.entries = [self.entries[i] for i in keep]
+        self.starts = [self.starts[i] for i in keep]
+
+    def overlapping(self, start: int, end: int, exclude_id: Optional[int] = None) -> List[IndexedSlot]:
+        # chevauchement strict (frontières ouvertes), comme services._overlap ; fins normalisées (end_seconds)
+        lo = bisect_left(self.starts, start - self.max_span + 1)
+        hi = bisect_left(self.starts, end)
+        return [
+            e for e in self.entries[lo:hi]
+            if e.end > start and e.slot_id != exclude_id
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Cache process-local (LRU borné)
+# ---------------------------------------------------------------------------
+
+_LOCK = threading.Lock()
+_INDEXES: "OrderedDict[IndexKey, IntervalIndex]" = OrderedDict()
+
+
+def _max_entries() -> int:
+    return int(getattr(settings, "SCHEDULE_INDEX_MAX_ENTRIES", 2048))
+
+
+def changeover_seconds(slot_minutes: Optional[int], stage_minutes: Optional[int]) -> int:
+    """Changeover effectif d'un slot : surcharge du slot, sinon valeur de la scène."""
+    minutes = slot_minutes if slot_minutes is not None else stage_minutes
+    return int(minutes or 0) * 60
+
+
+def stage_slot_rows(stage_filter: Q, slot_condition: Q):
+    """
+    Une requête : scènes (`changeover_minutes`) LEFT JOIN leurs slots non annulés
+    filtrés par `slot_condition` (lookups `slots__...`). Une scène sans slot
+    produit une ligne dont les colonnes `s__*` sont None.
+    """
+    from apps.core.models import Stage
+    from .models import SlotStatus
+
+    return (
+        Stage.objects.filter(stage_filter)
+        .annotate(s=FilteredRelation("slots", condition=slot_condition & ~Q(slots__status=SlotStatus.CANCELED)))
+        .order_by()
+        .values_list(
+            "id", "changeover_minutes",
+            "s__id", "s__edition_id", "s__day", "s__start_time", "s__end_time", "s__changeover_minutes",
+            "s__artist__name",
+        )
+    )
+
+
+def _load(key: IndexKey, version: int) -> IntervalIndex:
+    edition_id, stage_id, day = key
+    # slots du jour + ceux de la veille (pour leurs débordements après minuit)
+    rows = stage_slot_rows(Q(pk=stage_id), Q(slots__edition_id=edition_id, slots__day__in=[day - ONE_DAY, day]))
+    stage_changeover = 0
+    entries = []
+    for _, stage_minutes, pk, _, slot_day, st, et, slot_minutes, artist in rows:
+        stage_changeover = changeover_seconds(None, stage_minutes)
+        if pk is None:
+            continue
+        entry = IndexedSlot(
+            start=time_to_seconds(st),
+            end=end_seconds(st, et) + changeover_seconds(slot_minutes, stage_minutes),
+            slot_id=pk,
+            start_time=st,
+            end_time=et,
+            artist=artist,
+        )
+        if slot_day != day:
+            entry = spill(entry)
+            if entry is None:
+                continue
+        entries.append(entry)
+    return IntervalIndex(entries, version=version, changeover=stage_changeover)
+
+
+def get_index(edition_id: int, stage_id: int, day: date, *, version: int = 0) -> IntervalIndex:
+    """Retourne l'index (construit à la demande si absent ou de version périmée)."""
+    key = (int(edition_id), int(stage_id), day)
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is not None and idx.version == version:
+            _INDEXES.move_to_end(key)
+            return idx
+
+    idx = _load(key, version)
+    with _LOCK:
+        _INDEXES[key] = idx
+        _INDEXES.move_to_end(key)
+        while len(_INDEXES) > _max_entries():
+            _INDEXES.popitem(last=False)
+    return idx
+
+
+def invalidate(edition_id: int, stage_id: Optional[int] = None, day: Optional[date] = None) -> None:
+    """Supprime les index d'une édition (optionnellement restreints à une scène/jour)."""
+    with _LOCK:
+        for key in list(_INDEXES.keys()):
+            if key[0] != edition_id:
+                continue
+            if stage_id is not None and key[1] != stage_id:
+                continue
+            if day is not None and key[2] != day:
+                continue
+            _INDEXES.pop(key, None)
+
+
+def clear() -> None:
+    with _LOCK:
+        _INDEXES.clear()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+import time as _time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import FestivalEdition
+from apps.schedule.services import find_artist_conflicts
+
+
+class Command(BaseCommand):
+    help = "Detect artists double-booked across stages or without enough travel time between venues."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edition", type=int, required=True, help="Edition id")
+        parser.add_argument("--artist", type=int, default=None, help="Restrict to one artist id")
+        parser.add_argument("--speed-kmh", dest="speed_kmh", type=float, default=None,
+                            help="Travel speed between venues (default: SCHEDULE_TRAVEL_SPEED_KMH)")
+        parser.add_argument("--base-minutes", dest="base_minutes", type=int, default=None,
+                            help="Minimum transfer between two stages (default: SCHEDULE_TRAVEL_BASE_MINUTES)")
+        parser.add_argument("--json", dest="as_json", action="store_true", default=False)
+        parser.add_argument("--fail-on-conflict", dest="fail_on_conflict", action="store_true", default=False,
+                            help="Exit with an error when conflicts are found (CI)")
+
+    def handle(self, *args, **opts):
+        if not FestivalEdition.objects.filter(pk=opts["edition"]).exists():
+            raise CommandError(f"Edition {opts['edition']} not found")
+
+        t0 = _time.perf_counter()
+        conflicts = find_artist_conflicts(
+            opts["edition"],
+            artist_id=opts["artist"],
+            speed_kmh=opts["speed_kmh"],
+            base_minutes=opts["base_minutes"],
+        )
+        elapsed = _time.perf_counter() - t0
+
+        if opts["as_json"]:
+            self.stdout.write(json.dumps([c.to_dict() for c in conflicts], ensure_ascii=False))
+        else:
+            for c in conflicts:
+                detail = f"gap={c.gap_minutes}min required={c.required_minutes}min"
+                if c.distance_km is not None:
+                    detail += f" distance={c.distance_km}km"
+                self.stdout.write(f"[{c.kind}] {c.artist} {c.day} slot {c.slot_id} -> {c.other_slot_id} ({detail})")
+            self.stdout.write(self.style.SUCCESS(f"{len(conflicts)} conflict(s) in {elapsed:.3f}s"))
+
+        if conflicts and opts["fail_on_conflict"]:
+            raise CommandError(f"{len(conflicts)} artist conflict(s) found")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import random
+import time as _time
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import VALIDATE_MODES, validate_edition
+
+
+def _seconds_to_time(seconds: int) -> time:
+    return time(seconds // 3600, (seconds // 60) % 60, seconds % 60)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the edition validate endpoint (SQL self-join vs Python sweep) "
+        "on synthetic editions. Data is created in a transaction and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=str, default="10000,50000,200000",
+                            help="Comma separated slot counts")
+        parser.add_argument("--stages", type=int, default=12)
+        parser.add_argument("--days", type=int, default=4)
+        parser.add_argument("--overlap-ratio", dest="overlap_ratio", type=float, default=0.02,
+                            help="Share of slots shifted to overlap their predecessor")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = [int(x) for x in opts["sizes"].split(",") if x.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma separated list of integers")
+        rng = random.Random(opts["seed"])
+
+        self.stdout.write(f"vendor={connection.vendor}")
+        self.stdout.write(f"{'slots':>8} {'conflicts':>10} " + " ".join(f"{m + ' (s)':>12}" for m in VALIDATE_MODES))
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    edition_id = self._populate(size, opts, rng)
+                    timings = {}
+                    outputs = {}
+                    for mode in VALIDATE_MODES:
+                        best = None
+                        for _ in range(max(1, opts["repeat"])):
+                            t0 = _time.perf_counter()
+                            outputs[mode] = validate_edition(edition_id, mode=mode)
+                            elapsed = _time.perf_counter() - t0
+                            best = elapsed if best is None else min(best, elapsed)
+                        timings[mode] = best
+                    if len({repr(o) for o in outputs.values()}) != 1:
+                        raise CommandError(f"Implementations disagree for {size} slots")
+                    self.stdout.write(
+                        f"{Slot.objects.filter(edition_id=edition_id).count():>8} {len(outputs['sql']):>10} "
+                        + " ".join(f"{timings[m]:>12.3f}" for m in VALIDATE_MODES)
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _populate(self, size: int, opts, rng: random.Random) -> int:
+        year = (FestivalEdition.objects.aggregate(m=Max("year"))["m"] or 2099) + 1
+        start = date(2099, 7, 1)
+        edition = FestivalEdition.objects.create(
+            name=f"benchmark {year}", year=year, start_date=start,
+            end_date=start + timedelta(days=opts["days"] - 1),
+        )
+        stages = [Stage(edition=edition, name=f"Bench {i}") for i in range(opts["stages"])]
+        Stage.objects.bulk_create(stages)
+        stages = list(Stage.objects.filter(edition=edition))
+        artists = [
+            Artist(name=f"bench-{edition.id}-{i}", slug=f"bench-{edition.id}-{i}") for i in range(min(size, 500))
+        ]
+        Artist.objects.bulk_create(artists)
+        artist_ids = list(Artist.objects.filter(name__startswith=f"bench-{edition.id}-").values_list("id", flat=True))
+
+        # slots consécutifs par (scène, jour), durée moyenne ajustée pour tenir dans la journée
+        groups = opts["stages"] * opts["days"]
+        per_group = max(1, -(-size // groups))
+        day_span = 23 * 3600
+        avg = max(2, day_span // per_group)
+        batch = []
+        for g in range(groups):
+            stage = stages[g % len(stages)]
+            day = start + timedelta(days=g // len(stages))
+            cursor = 0
+            for _ in range(per_group):
+                if len(batch) >= size:
+                    break
+                length = rng.randint(max(1, avg // 2), max(1, avg * 3 // 2))
+                begin = cursor
+                if cursor and rng.random() < opts["overlap_ratio"]:
+                    begin = max(0, cursor - rng.randint(1, max(1, avg // 4)))
+                begin = min(begin, day_span)
+                end = min(begin + length, day_span + 3599)
+                batch.append(Slot(
+                    edition=edition, stage=stage, artist_id=rng.choice(artist_ids), day=day,
+                    start_time=_seconds_to_time(begin), end_time=_seconds_to_time(end),
+                    status=SlotStatus.CONFIRMED,
+                ))
+                cursor = end
+        for slot in batch:
+            slot.sync_window()
+        Slot.objects.bulk_create(batch, batch_size=2000)
+        return edition.id
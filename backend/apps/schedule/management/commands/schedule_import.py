@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.schedule import importer
+from apps.schedule.models import SlotStatus
+
+
+class Command(BaseCommand):
+    help = "Import slots from a CSV / JSON / JSON Lines file (validated in bulk, written with bulk_create)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=str, help="File path (.csv, .json, .jsonl)")
+        parser.add_argument("--edition", type=int, default=None,
+                            help="Edition id for every row (otherwise the 'edition' column)")
+        parser.add_argument("--format", choices=importer.FORMATS, default=None,
+                            help="Force the format (default: from the file extension)")
+        parser.add_argument("--status", choices=[c for c, _ in SlotStatus.choices], default=SlotStatus.TENTATIVE,
+                            help="Status of rows without a 'status' column")
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=500)
+        parser.add_argument("--strict", action="store_true", default=False,
+                            help="Write nothing if any row is invalid")
+        parser.add_argument("--dry-run", dest="dry_run", action="store_true", default=False)
+
+    def handle(self, *args, **opts):
+        path = Path(opts["path"])
+        if not path.is_file():
+            raise CommandError(f"File not found: {path}")
+        try:
+            fmt = opts["format"] or importer.detect_format(path.name)
+            with path.open("rb") as fh:
+                res = importer.import_slots(
+                    importer.read_rows(fh, fmt),
+                    edition_id=opts["edition"],
+                    status=opts["status"],
+                    dry_run=opts["dry_run"],
+                    strict=opts["strict"],
+                    batch_size=opts["batch_size"],
+                )
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise CommandError(str(exc))
+
+        for err in res.errors:
+            self.stderr.write(f"row {err.row} [{err.field}]: {err.message}")
+        prefix = "[dry-run] " if opts["dry_run"] else ""
+        style = self.style.SUCCESS if not res.errors else self.style.WARNING
+        self.stdout.write(style(
+            f"{prefix}Imported {res.created}/{res.total} slots (valid={res.valid}, errors={len(res.errors)})."
+        ))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_time
+
+from apps.core.models import FestivalEdition
+from apps.schedule.solver import apply_solution, build_problem, solve
+
+
+def _ids(value):
+    if not value:
+        return None
+    try:
+        return [int(x) for x in value.split(",") if x.strip()]
+    except ValueError:
+        raise CommandError(f"Invalid id list: {value}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a conflict-free TENTATIVE timetable (one set per artist) from artist availabilities, "
+        "stages, headliners and changeover buffers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edition", type=int, required=True, help="Edition id")
+        parser.add_argument("--artists", type=str, default=None,
+                            help="Comma separated artist ids (default: artists available on edition days)")
+        parser.add_argument("--stages", type=str, default=None, help="Comma separated stage ids (default: all)")
+        parser.add_argument("--headliners", type=str, default=None, help="Comma separated headliner artist ids")
+        parser.add_argument("--headliner-popularity", dest="headliner_popularity", type=int, default=None,
+                            help="Artists with popularity >= N are headliners")
+        parser.add_argument("--window", type=str, default="14:00-23:30", help="Daily opening window HH:MM-HH:MM")
+        parser.add_argument("--set-minutes", dest="set_minutes", type=int, default=60)
+        parser.add_argument("--headliner-minutes", dest="headliner_minutes", type=int, default=90)
+        parser.add_argument("--step", type=int, default=15, help="Start time granularity (minutes)")
+        parser.add_argument("--budget", type=float, default=5.0, help="Search time budget (seconds)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=500)
+        parser.add_argument("--dry-run", dest="dry_run", action="store_true", default=False)
+        parser.add_argument("--json", dest="as_json", action="store_true", default=False)
+
+    def handle(self, *args, **opts):
+        if not FestivalEdition.objects.filter(pk=opts["edition"]).exists():
+            raise CommandError(f"Edition {opts['edition']} not found")
+        try:
+            opening, closing = (parse_time(x.strip()) for x in opts["window"].split("-"))
+        except ValueError:
+            opening = closing = None
+        if not opening or not closing or closing <= opening:
+            raise CommandError("--window must look like 14:00-23:30")
+
+        problem = build_problem(
+            opts["edition"],
+            artist_ids=_ids(opts["artists"]),
+            stage_ids=_ids(opts["stages"]),
+            headliner_ids=_ids(opts["headliners"]),
+            headliner_popularity=opts["headliner_popularity"],
+            window=(opening, closing),
+            set_minutes=opts["set_minutes"],
+            headliner_minutes=opts["headliner_minutes"],
+            step_minutes=opts["step"],
+        )
+        if not problem.stages:
+            raise CommandError("No stage to schedule on")
+
+        result = solve(problem, budget_seconds=opts["budget"], seed=opts["seed"])
+        if not opts["dry_run"]:
+            try:
+                apply_solution(problem, result, batch_size=opts["batch_size"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        data = result.to_dict()
+        if opts["as_json"]:
+            self.stdout.write(json.dumps(data, ensure_ascii=False))
+            return
+        for row in data["grid"]:
+            star = " *" if row["is_headliner"] else ""
+            self.stdout.write(f"{row['day']} {row['stage']:<20} {row['start']}-{row['end']} {row['artist']}{star}")
+        for row in data["unplaced"]:
+            self.stdout.write(self.style.WARNING(f"unplaced: {row['artist']} ({row['reason']})"))
+        prefix = "[dry-run] " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}placed={data['placed']} created={data['created']} unplaced={len(data['unplaced'])} "
+            f"already_scheduled={data['already_scheduled']} iterations={data['iterations']} elapsed={data['elapsed']}s"
+        ))
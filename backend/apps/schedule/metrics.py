@@ -16,9 +16,15 @@ if Counter:
         "schedule_conflicts_detected_total",
         "Total des conflits détectés (API create/update ou endpoint conflicts)",
     )
+    CACHE_REQUESTS_TOTAL = Counter(
+        "schedule_cache_requests_total",
+        "Lectures des caches de planning (liste par jour, ICS filtré)",
+        ["cache", "result"],  # cache: list | ics ; result: hit | miss
+    )
 else:
     class _Noop:
         def labels(self, *args, **kwargs): return self
         def inc(self, *args, **kwargs): return None
     SLOTS_STATUS_TOTAL = _Noop()
     CONFLICTS_TOTAL = _Noop()
+    CACHE_REQUESTS_TOTAL = _Noop()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_add_object_permissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slot',
+            name='changeover_minutes',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:21
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_window(apps, schema_editor):
+    Slot = apps.get_model("schedule", "Slot")
+    tz = timezone.get_default_timezone()
+    batch = []
+    for slot in Slot.objects.only("id", "day", "start_time", "end_time").iterator(chunk_size=2000):
+        end_day = slot.day + timedelta(days=1) if slot.end_time < slot.start_time else slot.day
+        slot.starts_at = timezone.make_aware(datetime.combine(slot.day, slot.start_time), tz)
+        slot.ends_at = timezone.make_aware(datetime.combine(end_day, slot.end_time), tz)
+        batch.append(slot)
+        if len(batch) >= 2000:
+            Slot.objects.bulk_update(batch, ["starts_at", "ends_at"])
+            batch = []
+    if batch:
+        Slot.objects.bulk_update(batch, ["starts_at", "ends_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_stage_changeover_minutes'),
+        ('lineup', '0003_alter_artist_banner_alter_artist_picture_and_more'),
+        ('schedule', '0004_slot_changeover_minutes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slot',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slot',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['edition', 'status', 'starts_at'], name='schedule_slot_ed_status_start'),
+        ),
+        migrations.RunPython(backfill_window, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_stage_changeover_minutes'),
+        ('schedule', '0005_slot_starts_at_ends_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('label', models.CharField(blank=True, max_length=120)),
+                ('schedule_version', models.BigIntegerField(default=0)),
+                ('slot_count', models.PositiveIntegerField(default=0)),
+                ('checksum', models.CharField(db_index=True, max_length=64)),
+                ('data', models.JSONField(default=dict)),
+                ('published_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('edition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_snapshots', to='core.festivaledition')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['edition', 'published_at'], name='schedule_sc_edition_0e73e7_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,12 @@
 # backend/apps/schedule/models.py
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from apps.common.models import TimeStampedModel
 from apps.core.models import FestivalEdition, Stage
@@ -15,6 +19,34 @@ class SlotStatus(models.TextChoices):
     CANCELED = "canceled", "Annulé"
 
 
+def slot_window(day, start_time, end_time):
+    """
+    (starts_at, ends_at) conscients du fuseau du festival. Un slot dont la fin
+    précède le début passe minuit : il se termine le lendemain de `day`
+    (jour de programmation).
+    """
+    tz = timezone.get_default_timezone()
+    end_day = day + timedelta(days=1) if end_time < start_time else day
+    return (
+        timezone.make_aware(datetime.combine(day, start_time), tz),
+        timezone.make_aware(datetime.combine(end_day, end_time), tz),
+    )
+
+
+def max_slot_hours() -> int:
+    """Durée maximale d'un slot, aussi borne basse des requêtes `?from=&to=`."""
+    return int(getattr(settings, "SCHEDULE_SLOT_MAX_HOURS", 12))
+
+
+def slot_too_long(start_time, end_time) -> bool:
+    """Durée (passage de minuit compris) au-delà de `max_slot_hours()` : souvent une fin saisie à l'envers."""
+    start = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+    end = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+    if end_time < start_time:
+        end += 24 * 3600
+    return end - start > max_slot_hours() * 3600
+
+
 class Slot(TimeStampedModel):
     edition = models.ForeignKey(FestivalEdition, on_delete=models.CASCADE, related_name="slots")
     stage = models.ForeignKey(Stage, on_delete=models.PROTECT, related_name="slots")
@@ -22,6 +54,11 @@ class Slot(TimeStampedModel):
     day = models.DateField(db_index=True)
     start_time = models.TimeField()
     end_time = models.TimeField()
+    # surcharge du changeover de la scène après ce slot (None = valeur de la scène)
+    changeover_minutes = models.PositiveSmallIntegerField(null=True, blank=True)
+    # dérivés de (day, start_time, end_time), synchronisés à chaque save (cf. `sync_window`)
+    starts_at = models.DateTimeField(null=True, blank=True, editable=False)
+    ends_at = models.DateTimeField(null=True, blank=True, editable=False)
     status = models.CharField(
         max_length=10, choices=SlotStatus.choices, default=SlotStatus.TENTATIVE, db_index=True
     )
@@ -32,7 +69,10 @@ class Slot(TimeStampedModel):
 
     class Meta:
         ordering = ["day", "stage__name", "start_time"]
-        indexes = [models.Index(fields=["edition", "day", "stage", "start_time"])]
+        indexes = [
+            models.Index(fields=["edition", "day", "stage", "start_time"]),
+            models.Index(fields=["edition", "status", "starts_at"], name="schedule_slot_ed_status_start"),
+        ]
         permissions = [
             ("manage_slot", "Peut gérer le slot (annuler/confirmer)"),
         ]
@@ -40,17 +80,63 @@ class Slot(TimeStampedModel):
     def __str__(self):
         return f"{self.artist.name} @ {self.stage.name} {self.day} {self.start_time}-{self.end_time}"
 
+    def sync_window(self) -> None:
+        """À appeler avant `bulk_create`/`bulk_update` (save() le fait)."""
+        # valeurs éventuellement passées en chaînes ("2025-07-18", "20:00")
+        day, start, end = (
+            self._meta.get_field(name).to_python(getattr(self, name))
+            for name in ("day", "start_time", "end_time")
+        )
+        self.starts_at, self.ends_at = slot_window(day, start, end)
+
+    def save(self, *args, **kwargs):
+        self.sync_window()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"day", "start_time", "end_time"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "starts_at", "ends_at"}
+        super().save(*args, **kwargs)
+
     def clean(self):
-        # validité horaire
-        if self.end_time <= self.start_time:
-            raise ValidationError("end_time doit être > start_time")
+        # validité horaire (fin < début : le slot passe minuit)
+        if self.end_time == self.start_time:
+            raise ValidationError("end_time doit être différent de start_time")
+        if slot_too_long(self.start_time, self.end_time):
+            raise ValidationError(f"un slot ne peut pas dépasser {max_slot_hours()} h")
         # validité plage d'édition
         if self.edition and not (self.edition.start_date <= self.day <= self.edition.end_date):
             raise ValidationError("day doit être compris dans l’édition")
 
+    @property
+    def effective_changeover_minutes(self) -> int:
+        if self.changeover_minutes is not None:
+            return self.changeover_minutes
+        return getattr(self.stage, "changeover_minutes", 0) or 0
+
     @property
     def duration_minutes(self) -> int:
-        from datetime import datetime
-        dt_start = datetime.combine(self.day, self.start_time)
-        dt_end = datetime.combine(self.day, self.end_time)
+        dt_start, dt_end = slot_window(self.day, self.start_time, self.end_time)
         return int((dt_end - dt_start).total_seconds() // 60)
+
+
+class ScheduleSnapshot(TimeStampedModel):
+    """
+    Photo figée du planning d'une édition (encodage colonnaire trié par id de
+    slot, cf. `snapshots.capture`), comparée en O(n) par `snapshots.diff`.
+    """
+    edition = models.ForeignKey(FestivalEdition, on_delete=models.CASCADE, related_name="schedule_snapshots")
+    label = models.CharField(max_length=120, blank=True)
+    schedule_version = models.BigIntegerField(default=0)
+    slot_count = models.PositiveIntegerField(default=0)
+    checksum = models.CharField(max_length=64, db_index=True)
+    data = models.JSONField(default=dict)
+    published_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["edition", "published_at"])]
+
+    def __str__(self):
+        return f"{self.edition} #{self.pk} {self.label}".strip()
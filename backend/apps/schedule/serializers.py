@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
-from .models import Slot
+from .models import ScheduleSnapshot, Slot, max_slot_hours, slot_too_long
 
 
 class SlotSerializer(serializers.ModelSerializer):
@@ -15,7 +15,7 @@ class SlotSerializer(serializers.ModelSerializer):
         model = Slot
         fields = (
             "id", "edition", "edition_year", "stage", "stage_name",
-            "artist", "artist_name", "day", "start_time", "end_time",
+            "artist", "artist_name", "day", "start_time", "end_time", "changeover_minutes",
             "status", "is_headliner", "setlist_urls", "tech_rider",
             "notes", "duration_minutes", "created_at", "updated_at"
         )
@@ -26,10 +26,41 @@ class SlotSerializer(serializers.ModelSerializer):
         start = attrs.get("start_time") or getattr(self.instance, "start_time", None)
         end = attrs.get("end_time") or getattr(self.instance, "end_time", None)
         errors = {}
-        if start and end and end <= start:
-            errors["end_time"] = "must be after start_time"
+        if start and end and end == start:
+            errors["end_time"] = "must differ from start_time (earlier = ends after midnight)"
+        elif start and end and slot_too_long(start, end):
+            errors["end_time"] = f"slot longer than {max_slot_hours()}h (check start/end times)"
         if edition and day and not (edition.start_date <= day <= edition.end_date):
             errors["day"] = "must be within edition"
         if errors:
             raise serializers.ValidationError(errors)
-        return attrs
\ No newline at end of file
+        return attrs
+
+class SlotCandidateSerializer(serializers.Serializer):
+    """Slot candidat (non persisté) pour la vérification de conflits en lot."""
+    id = serializers.IntegerField(required=False, allow_null=True)
+    edition = serializers.IntegerField()
+    stage = serializers.IntegerField()
+    day = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    changeover_minutes = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+
+    def validate(self, attrs):
+        if attrs["end_time"] == attrs["start_time"]:
+            raise serializers.ValidationError({"end_time": "must differ from start_time (earlier = ends after midnight)"})
+        if slot_too_long(attrs["start_time"], attrs["end_time"]):
+            raise serializers.ValidationError({"end_time": f"slot longer than {max_slot_hours()}h (check start/end times)"})
+        return attrs
+
+
+class ScheduleSnapshotSerializer(serializers.ModelSerializer):
+    """Métadonnées seules : l'encodage (`data`) n'est exposé que via le diff."""
+
+    class Meta:
+        model = ScheduleSnapshot
+        fields = (
+            "id", "edition", "label", "schedule_version", "slot_count", "checksum",
+            "published_at", "created_by", "created_at",
+        )
+        read_only_fields = fields
@@ -1,17 +1,105 @@
 # apps/schedule/services.py
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+import hashlib
+import time as _time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, time as dt_time, timedelta
 from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
 
 from django.core.cache import cache
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
+from apps.common.services import dispatch_webhook, haversine_km
 from apps.core.models import FestivalEdition, Stage
+from . import events, ics
+from . import index as slot_index
+from . import timetable
+from .metrics import SLOTS_STATUS_TOTAL
 from .models import Slot, SlotStatus
 
 
+# ---------------------------------------------------------------------------
+# Version de planning (par édition, partagée entre workers via le cache)
+# ---------------------------------------------------------------------------
+
+SCHEDULE_VERSION_KEY = "schedule:version:ed{edition}"  # edition="all" : toutes éditions
+
+
+def _version_seed() -> int:
+    # graine horodatée : une clé évincée ne revient jamais à une ancienne valeur
+    return int(_time.time() * 1000)
+
+
+def current_schedule_version(edition_id: Optional[int] = None) -> int:
+    key = SCHEDULE_VERSION_KEY.format(edition=edition_id if edition_id is not None else "all")
+    try:
+        return int(cache.get_or_set(key, _version_seed, None))
+    except Exception:
+        return 0
+
+
+def bump_schedule_version(edition_id: int) -> None:
+    for ed in (edition_id, "all"):
+        key = SCHEDULE_VERSION_KEY.format(edition=ed)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _version_seed(), None)
+        except Exception:
+            pass
+
+
+def canonical_query_digest(params) -> str:
+    """
+    Empreinte déterministe d'une query string (indépendante de l'ordre des
+    paramètres et du processus, contrairement à `hash()` qui est salé par worker).
+    """
+    items = []
+    for k in sorted(params.keys()):
+        values = params.getlist(k) if hasattr(params, "getlist") else [params[k]]
+        items.extend((k, str(v)) for v in sorted(values))
+    return hashlib.sha1(urlencode(items).encode("utf-8")).hexdigest()
+
+
+def versioned_cache_key(prefix: str, params, edition: Optional[str] = None, scope: str = "public") -> str:
+    """Clé `prefix:v{version}:ed{edition}:{scope}:{digest}` invalidée par les signaux Slot."""
+    ed = int(edition) if edition and str(edition).isdigit() else None
+    version = current_schedule_version(ed)
+    return f"{prefix}:v{version}:ed{ed if ed is not None else 'all'}:{scope}:{canonical_query_digest(params)}"
+
+
+def invalidate_schedule(edition_id: int, stage_id: Optional[int] = None, day=None) -> None:
+    """
+    Invalide les caches dérivés des slots d'une édition (version + index/grille mémoire).
+    Sans scène (changement de masse), les flux ICS stockés sont aussi supprimés ;
+    les changements unitaires passent par `ics.refresh_slot_feeds` (signaux).
+    """
+    bump_schedule_version(edition_id)
+    slot_index.invalidate(edition_id, stage_id, day)
+    timetable.invalidate(edition_id)
+    if stage_id is None:
+        ics.drop_feeds(edition_id)
+
+
+ACTIVE_EDITION_KEY = "schedule:active_edition"
+
+
+def active_edition_id() -> Optional[int]:
+    """Édition active (`is_active`), mémorisée 60 s en cache (0 = aucune)."""
+    def _load() -> int:
+        ed = FestivalEdition.objects.filter(is_active=True).order_by("-year").values_list("id", flat=True).first()
+        return ed or 0
+    try:
+        value = cache.get_or_set(ACTIVE_EDITION_KEY, _load, 60)
+    except Exception:
+        value = _load()
+    return value or None
+
+
 # ---------------------------------------------------------------------------
 # Conflits
 # ---------------------------------------------------------------------------
@@ -28,7 +116,8 @@ class Conflict:
 
 
 def _overlap(a_start, a_end, b_start, b_end) -> bool:
-    # chevauchement strict (frontières ouvertes)
+    # chevauchement strict (frontières ouvertes) sur des secondes normalisées :
+    # fins via index.end_seconds (passage de minuit) + changeover
     return a_start < b_end and a_end > b_start
 
 
@@ -40,20 +129,34 @@ def find_conflicts(
     start_time,
     end_time,
     exclude_id: Optional[int] = None,
+    changeover_minutes: Optional[int] = None,
 ) -> List[Conflict]:
-    qs = Slot.objects.select_related("artist").filter(
-        edition_id=edition_id,
-        stage_id=stage_id,
-        day=day,
-    ).exclude(status=SlotStatus.CANCELED)
-    if exclude_id:
-        qs = qs.exclude(pk=exclude_id)
-
-    conflicts: List[Conflict] = []
-    for s in qs:
-        if _overlap(start_time, end_time, s.start_time, s.end_time):
-            conflicts.append(Conflict(slot_id=s.id, start=str(s.start_time), end=str(s.end_time), artist=s.artist.name))
-    return conflicts
+    """
+    Slots de la même scène/jour dont l'intervalle tamponné (fin + changeover)
+    chevauche celui du candidat. `changeover_minutes` : surcharge du candidat
+    (None = changeover de la scène).
+    """
+    # accepte ids ou instances (validated_data DRF)
+    edition_id = getattr(edition_id, "pk", edition_id)
+    stage_id = getattr(stage_id, "pk", stage_id)
+    version = current_schedule_version(edition_id)
+    idx = slot_index.get_index(edition_id, stage_id, day, version=version)
+    buffer = idx.changeover if changeover_minutes is None else changeover_minutes * 60
+    start = slot_index.time_to_seconds(start_time)
+    end = slot_index.end_seconds(start_time, end_time) + buffer
+    hits = idx.overlapping(start, end, exclude_id=exclude_id)
+    if end > slot_index.DAY_SECONDS:
+        # le candidat déborde après minuit : slots du lendemain
+        nxt = slot_index.get_index(edition_id, stage_id, day + slot_index.ONE_DAY, version=version)
+        known = {e.slot_id for e in hits}
+        hits += [
+            e for e in nxt.overlapping(start - slot_index.DAY_SECONDS, end - slot_index.DAY_SECONDS, exclude_id)
+            if e.slot_id not in known
+        ]
+    return [
+        Conflict(slot_id=e.slot_id, start=str(e.start_time), end=str(e.end_time), artist=e.artist)
+        for e in hits
+    ]
 
 
 def find_conflicts_for_slot_queryset(slot: Slot) -> List[Conflict]:
@@ -64,9 +167,424 @@ def find_conflicts_for_slot_queryset(slot: Slot) -> List[Conflict]:
         start_time=slot.start_time,
         end_time=slot.end_time,
         exclude_id=slot.id,
+        changeover_minutes=slot.changeover_minutes,
     )
 
 
+# ---------------------------------------------------------------------------
+# Conflits en lot (brouillon de grille complet)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BatchConflict:
+    candidate: int
+    start: str
+    end: str
+    slot_id: Optional[int] = None  # slot existant en conflit
+    other_candidate: Optional[int] = None  # ou autre candidat du lot
+    artist: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def find_conflicts_batch(candidates: List[Dict]) -> List[BatchConflict]:
+    """
+    Détecte en une passe les conflits d'une liste de slots candidats
+    (dicts: edition, stage, day, start_time, end_time, id et changeover_minutes optionnels) :
+    - contre les slots existants (une seule requête pour tous les groupes) ;
+    - entre candidats eux-mêmes.
+    Un candidat portant `id` remplace le slot existant correspondant.
+    """
+    if not candidates:
+        return []
+
+    day_seconds = slot_index.DAY_SECONDS
+    one_day = slot_index.ONE_DAY
+    days = {c["day"] for c in candidates}
+    rows = list(slot_index.stage_slot_rows(
+        Q(pk__in={int(c["stage"]) for c in candidates}),
+        # veille (débordements après minuit) et lendemain (débordement des candidats)
+        Q(slots__edition_id__in={int(c["edition"]) for c in candidates},
+          slots__day__in=days | {d - one_day for d in days} | {d + one_day for d in days}),
+    ))
+    stage_changeover = {r[0]: r[1] for r in rows}
+
+    groups: Dict[Tuple[int, int, object], List[Tuple[int, int, object]]] = {}
+
+    def _add(key, start, end, ref, create=True):
+        if create or key in groups:
+            groups.setdefault(key, []).append((start, end, ref))
+        if end > day_seconds:
+            nxt = (key[0], key[1], key[2] + one_day)
+            if create or nxt in groups:
+                groups.setdefault(nxt, []).append((start - day_seconds, end - day_seconds, ref))
+
+    replaced = set()
+    for i, c in enumerate(candidates):
+        key = (int(c["edition"]), int(c["stage"]), c["day"])
+        start = slot_index.time_to_seconds(c["start_time"])
+        end = slot_index.end_seconds(c["start_time"], c["end_time"]) + slot_index.changeover_seconds(
+            c.get("changeover_minutes"), stage_changeover.get(key[1])
+        )
+        _add(key, start, end, ("candidate", i))
+        if c.get("id"):
+            replaced.add(int(c["id"]))
+
+    existing: Dict[int, Tuple] = {}
+    for st, stage_minutes, pk, ed, day, start_time, end_time, slot_minutes, artist in rows:
+        if pk is None or pk in replaced:
+            continue
+        existing[pk] = (start_time, end_time, artist)
+        _add(
+            (ed, st, day),
+            slot_index.time_to_seconds(start_time),
+            slot_index.end_seconds(start_time, end_time) + slot_index.changeover_seconds(slot_minutes, stage_minutes),
+            ("slot", pk),
+            create=False,
+        )
+
+    def _fmt(i: int) -> Tuple[str, str]:
+        return str(candidates[i]["start_time"]), str(candidates[i]["end_time"])
+
+    conflicts: List[BatchConflict] = []
+    seen = set()  # une paire peut apparaître le jour même et dans le débordement du lendemain
+    for intervals in groups.values():
+        for a, b in slot_index.sweep_overlaps(intervals):
+            if a[0] == "slot" and b[0] == "slot":
+                continue  # conflits préexistants : hors périmètre du lot
+            pair = tuple(sorted((a, b)))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            if a[0] == "candidate" and b[0] == "candidate":
+                i, j = sorted((a[1], b[1]))
+                start, end = _fmt(j)
+                conflicts.append(BatchConflict(candidate=i, start=start, end=end, other_candidate=j))
+                continue
+            cand, slot = (a, b) if a[0] == "candidate" else (b, a)
+            start_time, end_time, artist = existing[slot[1]]
+            conflicts.append(BatchConflict(
+                candidate=cand[1], start=str(start_time), end=str(end_time),
+                slot_id=slot[1], artist=artist,
+            ))
+    conflicts.sort(key=lambda c: (c.candidate, c.slot_id or 0, c.other_candidate or 0))
+    return conflicts
+
+
+# ---------------------------------------------------------------------------
+# Conflits artiste (multi-scènes, temps de trajet)
+# ---------------------------------------------------------------------------
+#
+# Un artiste ne peut pas jouer sur deux scènes en même temps, ni enchaîner
+# deux scènes sans le temps de trajet nécessaire. Temps requis entre deux slots :
+#  - même scène : 0 ;
+#  - autre scène, même lieu (ou coordonnées inconnues) : SCHEDULE_TRAVEL_BASE_MINUTES ;
+#  - autres lieux : base + haversine_km / SCHEDULE_TRAVEL_SPEED_KMH.
+
+@dataclass
+class ArtistConflict:
+    kind: str  # "overlap" | "travel"
+    artist_id: int
+    artist: str
+    day: str
+    slot_id: int
+    other_slot_id: int
+    gap_minutes: int  # négatif si chevauchement
+    required_minutes: int
+    distance_km: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _travel_settings() -> Tuple[float, int]:
+    from django.conf import settings
+    speed = float(getattr(settings, "SCHEDULE_TRAVEL_SPEED_KMH", 30.0))
+    base = int(getattr(settings, "SCHEDULE_TRAVEL_BASE_MINUTES", 10))
+    return speed, base
+
+
+def find_artist_conflicts(
+    edition_id: int,
+    *,
+    artist_id: Optional[int] = None,
+    speed_kmh: Optional[float] = None,
+    base_minutes: Optional[int] = None,
+) -> List[ArtistConflict]:
+    """
+    Charge les slots non annulés de l'édition en une requête, les groupe par
+    artiste (secondes absolues : un set passant minuit touche le lendemain) et
+    signale chevauchements et transitions impossibles.
+    Les distances sont calculées une fois par couple de lieux.
+    """
+    default_speed, default_base = _travel_settings()
+    speed_kmh = speed_kmh or default_speed
+    base_minutes = default_base if base_minutes is None else base_minutes
+
+    qs = Slot.objects.filter(edition_id=edition_id).exclude(status=SlotStatus.CANCELED)
+    if artist_id is not None:
+        qs = qs.filter(artist_id=artist_id)
+    rows = qs.order_by("artist_id", "day", "start_time", "id").values_list(
+        "id", "artist_id", "artist__name", "day", "start_time", "end_time",
+        "stage_id", "stage__venue_id", "stage__venue__latitude", "stage__venue__longitude",
+    )
+
+    coords: Dict[int, Tuple[float, float]] = {}
+    groups: Dict[int, List[Tuple]] = {}
+    for pk, aid, name, day, st, et, stage_id, venue_id, lat, lon in rows:
+        if venue_id is not None and lat is not None and lon is not None:
+            coords[venue_id] = (float(lat), float(lon))
+        # secondes absolues (jour ordinal) : un set de fin de nuit touche le lendemain
+        base = day.toordinal() * slot_index.DAY_SECONDS
+        groups.setdefault(aid, []).append((
+            base + slot_index.time_to_seconds(st), base + slot_index.end_seconds(st, et),
+            pk, name, stage_id, venue_id, day,
+        ))
+
+    distances: Dict[Tuple[int, int], Optional[float]] = {}
+
+    def _requirement(a: Tuple, b: Tuple) -> Tuple[int, Optional[float]]:
+        if a[4] == b[4]:
+            return 0, None
+        va, vb = a[5], b[5]
+        if va is None or vb is None or va == vb or va not in coords or vb not in coords:
+            return base_minutes * 60, None
+        key = (va, vb) if va < vb else (vb, va)
+        if key not in distances:
+            distances[key] = haversine_km(*coords[key[0]], *coords[key[1]])
+        km = distances[key]
+        return int((base_minutes + km / speed_kmh * 60) * 60), round(km, 2)
+
+    # au-delà du pire trajet possible, plus aucun slot suivant (trié par début) n'est en conflit
+    venues = list(coords.values())
+    max_km = max(
+        (haversine_km(*p, *q) for i, p in enumerate(venues) for q in venues[i + 1:]),
+        default=0.0,
+    )
+    horizon = int((base_minutes + max_km / speed_kmh * 60) * 60)
+
+    conflicts: List[ArtistConflict] = []
+    for aid, slots in groups.items():
+        if len(slots) < 2:
+            continue
+        for i, a in enumerate(slots):
+            for b in slots[i + 1:]:
+                gap = b[0] - a[1]
+                if gap >= horizon:
+                    break
+                required, km = _requirement(a, b)
+                if gap >= required:
+                    continue
+                conflicts.append(ArtistConflict(
+                    kind="overlap" if gap < 0 else "travel",
+                    artist_id=aid,
+                    artist=a[3],
+                    day=str(a[6]),
+                    slot_id=a[2],
+                    other_slot_id=b[2],
+                    gap_minutes=gap // 60,
+                    required_minutes=required // 60,
+                    distance_km=km,
+                ))
+    return conflicts
+
+
+# ---------------------------------------------------------------------------
+# Validation d'une édition (tous les chevauchements)
+# ---------------------------------------------------------------------------
+#
+# Deux implémentations, même résultat (mêmes paires, même ordre) :
+#  - "sql"    : auto-jointure côté base sur l'index (edition, day, stage, start_time) ;
+#  - "python" : balayage trié sur `values_list` (repli SQLite / petites éditions).
+# Comme l'endpoint historique, les slots annulés sont inclus. Deux slots sont en
+# conflit si le second commence avant la fin + changeover du premier.
+
+VALIDATE_MODES = ("sql", "python")
+
+_VALIDATE_SQL = """
+SELECT a.id, a.day, a.start_time, a.end_time, st.name, b.id, a.stage_id
+FROM {slot} a
+JOIN {stage} st ON st.id = a.stage_id
+JOIN {slot} b
+  ON b.edition_id = a.edition_id
+ AND b.day = a.day
+ AND b.stage_id = a.stage_id
+ AND b.start_time >= a.start_time
+ AND {end_condition}
+ AND (b.start_time > a.start_time OR b.id > a.id)
+WHERE a.edition_id = %s
+ORDER BY a.day, a.stage_id, a.start_time, a.id, b.start_time, b.id
+"""
+
+# secondes depuis minuit d'une colonne TIME, par moteur
+_TIME_SECONDS_SQL = {
+    "postgresql": "EXTRACT(EPOCH FROM {col})",
+    "mysql": "TIME_TO_SEC({col})",
+    "sqlite": (
+        "(CAST(substr({col}, 1, 2) AS INTEGER) * 3600"
+        " + CAST(substr({col}, 4, 2) AS INTEGER) * 60"
+        " + CAST(substr({col}, 7, 2) AS INTEGER))"
+    ),
+}
+
+
+def default_validate_mode() -> str:
+    from django.db import connection
+    return "sql" if connection.vendor == "postgresql" else "python"
+
+
+def edition_has_changeover(edition_id: int) -> bool:
+    return (
+        Stage.objects.filter(edition_id=edition_id, changeover_minutes__gt=0).exists()
+        or Slot.objects.filter(edition_id=edition_id, changeover_minutes__gt=0).exists()
+    )
+
+
+def _conflict_row(slot_id, stage_name, day, start, end, overlaps: List[int]) -> Dict:
+    return {
+        "slot_id": slot_id,
+        "stage": stage_name,
+        "day": str(day),
+        "range": [str(start), str(end)],
+        "overlaps_with": overlaps,
+    }
+
+
+def _validation_order(rows: List[Dict], stage_ids: Dict[int, int]) -> List[Dict]:
+    return sorted(rows, key=lambda r: (r["day"], stage_ids[r["slot_id"]], r["range"][0], r["slot_id"]))
+
+
+def _merge_spill_overlaps(edition_id: int, results: List[Dict], stage_ids: Dict[int, int]) -> List[Dict]:
+    """
+    Ajoute les chevauchements entre un slot qui déborde après minuit (fin
+    tamponnée > 24 h) et les slots du lendemain sur la même scène. Les deux
+    modes de validation raisonnent par jour ; ces paires inter-jours sont rares
+    et lues à part (≤ 2 requêtes ciblées).
+    """
+    from django.db.models import Max
+
+    agg = Slot.objects.filter(edition_id=edition_id).aggregate(
+        slot_co=Max("changeover_minutes"), stage_co=Max("stage__changeover_minutes"),
+    )
+    max_co = max(agg["slot_co"] or 0, agg["stage_co"] or 0)
+    late = Q(end_time__lt=F("start_time"))
+    if max_co:
+        floor = max(0, 24 * 60 - max_co)
+        late |= Q(end_time__gte=dt_time(floor // 60, floor % 60))
+    spilling = []
+    for row in Slot.objects.filter(edition_id=edition_id).filter(late).values_list(
+        "id", "day", "stage_id", "stage__name", "start_time", "end_time",
+        "changeover_minutes", "stage__changeover_minutes",
+    ):
+        end = slot_index.end_seconds(row[4], row[5]) + slot_index.changeover_seconds(row[6], row[7])
+        if end > slot_index.DAY_SECONDS:
+            spilling.append((row, end - slot_index.DAY_SECONDS))
+    if not spilling:
+        return results
+
+    nexts: Dict[Tuple[int, object], List[Tuple]] = {}
+    for pk, day, stage_id, start in (
+        Slot.objects.filter(
+            edition_id=edition_id,
+            stage_id__in={r[2] for r, _ in spilling},
+            day__in={r[1] + slot_index.ONE_DAY for r, _ in spilling},
+        ).order_by("start_time", "id").values_list("id", "day", "stage_id", "start_time")
+    ):
+        nexts.setdefault((stage_id, day), []).append((slot_index.time_to_seconds(start), pk))
+
+    by_id = {r["slot_id"]: r for r in results}
+    for row, tail in spilling:
+        overlaps = [pk for start, pk in nexts.get((row[2], row[1] + slot_index.ONE_DAY), []) if start < tail]
+        if not overlaps:
+            continue
+        if row[0] not in by_id:
+            by_id[row[0]] = _conflict_row(row[0], row[3], row[1], row[4], row[5], [])
+            stage_ids[row[0]] = row[2]
+            results.append(by_id[row[0]])
+        by_id[row[0]]["overlaps_with"].extend(overlaps)
+    return _validation_order(results, stage_ids)
+
+
+def validate_edition_python(edition_id: int) -> List[Dict]:
+    rows = (
+        Slot.objects.filter(edition_id=edition_id)
+        .order_by("day", "stage_id", "start_time", "id")
+        .values_list(
+            "id", "day", "stage_id", "stage__name", "start_time", "end_time",
+            "changeover_minutes", "stage__changeover_minutes",
+        )
+    )
+    results: List[Dict] = []
+    stage_ids: Dict[int, int] = {}
+    group: List[Tuple] = []
+
+    def flush():
+        # fins tamponnées précalculées une fois par (scène, jour)
+        starts = [slot_index.time_to_seconds(r[4]) for r in group]
+        ends = [slot_index.end_seconds(r[4], r[5]) + slot_index.changeover_seconds(r[6], r[7]) for r in group]
+        n = len(group)
+        for i in range(n):
+            overlaps = []
+            for j in range(i + 1, n):
+                if starts[j] >= ends[i]:
+                    break
+                overlaps.append(group[j][0])
+            if overlaps:
+                s1 = group[i]
+                stage_ids[s1[0]] = s1[2]
+                results.append(_conflict_row(s1[0], s1[3], s1[1], s1[4], s1[5], overlaps))
+
+    for row in rows.iterator(chunk_size=5000):
+        if group and (group[0][1], group[0][2]) != (row[1], row[2]):
+            flush()
+            group = []
+        group.append(row)
+    flush()
+    return _merge_spill_overlaps(edition_id, results, stage_ids)
+
+
+def validate_edition_sql(edition_id: int) -> List[Dict]:
+    from django.db import connection
+    # a passe minuit (fin < début) : tout slot b commençant après a le chevauche
+    end_condition = "(b.start_time < a.end_time OR a.end_time < a.start_time)"
+    if edition_has_changeover(edition_id):
+        seconds = _TIME_SECONDS_SQL.get(connection.vendor)
+        if seconds is None:
+            return validate_edition_python(edition_id)
+        end_condition = (
+            f"{seconds.format(col='b.start_time')} < {seconds.format(col='a.end_time')}"
+            " + CASE WHEN a.end_time < a.start_time THEN 86400 ELSE 0 END"
+            " + 60 * COALESCE(a.changeover_minutes, st.changeover_minutes, 0)"
+        )
+    sql = _VALIDATE_SQL.format(
+        slot=connection.ops.quote_name(Slot._meta.db_table),
+        stage=connection.ops.quote_name(Stage._meta.db_table),
+        end_condition=end_condition,
+    )
+    results: List[Dict] = []
+    stage_ids: Dict[int, int] = {}
+    with connection.cursor() as cur:
+        cur.execute(sql, [edition_id])
+        current = None
+        for a_id, day, start, end, stage_name, b_id, stage_id in cur.fetchall():
+            if current is None or current["slot_id"] != a_id:
+                current = _conflict_row(a_id, stage_name, day, start, end, [])
+                stage_ids[a_id] = stage_id
+                results.append(current)
+            current["overlaps_with"].append(b_id)
+    return _merge_spill_overlaps(edition_id, results, stage_ids)
+
+
+def validate_edition(edition_id: int, mode: Optional[str] = None) -> List[Dict]:
+    mode = mode or default_validate_mode()
+    if mode not in VALIDATE_MODES:
+        raise ValueError(f"mode must be one of {', '.join(VALIDATE_MODES)}")
+    if mode == "sql":
+        return validate_edition_sql(edition_id)
+    return validate_edition_python(edition_id)
+
+
 # ---------------------------------------------------------------------------
 # Copie par template (édition N-1 -> N)
 # ---------------------------------------------------------------------------
@@ -77,6 +595,7 @@ class TemplateCopyResult:
     skipped_out_of_range: int
     skipped_conflicts: int
     total_source: int
+    skipped_duplicates: int = 0
 
     def to_dict(self): return asdict(self)
 
@@ -88,53 +607,232 @@ def copy_template(
     stage_map: Optional[Dict[str, str]] = None,
     status: str = SlotStatus.TENTATIVE,
     dry_run: bool = False,
+    shift_days: Optional[int] = None,
+    batch_size: int = 500,
 ) -> TemplateCopyResult:
+    """
+    Clone ensembliste : les slots de destination sont lus une seule fois,
+    doublons (scène+jour+début+artiste) et chevauchements sont détectés en mémoire
+    (y compris entre slots copiés), puis insertion par lots `bulk_create` dans une
+    transaction. Un unique webhook `schedule.template.copied` remplace les webhooks
+    par slot (bulk_create ne déclenche pas les signaux).
+    """
     src = FestivalEdition.objects.get(pk=from_edition_id)
     dst = FestivalEdition.objects.get(pk=to_edition_id)
-    offset_days = (dst.start_date - src.start_date).days
+    offset_days = shift_days if shift_days is not None else (dst.start_date - src.start_date).days
 
     stage_map = stage_map or {}
-    created = skipped_out = skipped_conf = 0
+    created = skipped_out = skipped_conf = skipped_dupe = 0
+
+    # 1) destination : une requête
+    seen = set()
+    groups: Dict[Tuple[int, object], slot_index.IntervalIndex] = {}
 
-    source_slots = Slot.objects.filter(edition_id=src.id).order_by("day", "stage_id", "start_time")
+    def _group(stage_id, day) -> slot_index.IntervalIndex:
+        return groups.setdefault((stage_id, day), slot_index.IntervalIndex([]))
+
+    def _add(stage_id, day, entry: slot_index.IndexedSlot) -> None:
+        _group(stage_id, day).add(entry)
+        tail = slot_index.spill(entry)
+        if tail is not None:
+            _group(stage_id, day + slot_index.ONE_DAY).add(tail)
+
+    dst_rows = Slot.objects.filter(edition_id=dst.id).order_by().values_list(
+        "id", "stage_id", "day", "start_time", "end_time", "artist_id", "status",
+        "changeover_minutes", "stage__changeover_minutes",
+    )
+    for pk, stage_id, day, start_time, end_time, artist_id, st, slot_co, stage_co in dst_rows:
+        seen.add((stage_id, day, start_time, artist_id))
+        if st == SlotStatus.CANCELED:
+            continue
+        _add(stage_id, day, slot_index.IndexedSlot(
+            start=slot_index.time_to_seconds(start_time),
+            end=slot_index.end_seconds(start_time, end_time) + slot_index.changeover_seconds(slot_co, stage_co),
+            slot_id=pk, start_time=start_time, end_time=end_time, artist="",
+        ))
+
+    # 2) source : une requête, dédoublonnage + conflits en mémoire
+    source_slots = list(
+        Slot.objects.filter(edition_id=src.id).order_by("day", "stage_id", "start_time").values(
+            "id", "stage_id", "artist_id", "day", "start_time", "end_time",
+            "is_headliner", "setlist_urls", "tech_rider", "notes", "changeover_minutes",
+        )
+    )
+    # changeover par défaut des scènes cibles : une requête
+    target_stages = {int(stage_map.get(str(s["stage_id"]), s["stage_id"])) for s in source_slots}
+    stage_changeover = dict(
+        Stage.objects.filter(pk__in=target_stages).values_list("id", "changeover_minutes")
+    ) if target_stages else {}
+    to_create: List[Slot] = []
     for s in source_slots:
-        new_day = s.day + timedelta(days=offset_days)
+        new_day = s["day"] + timedelta(days=offset_days)
         if not (dst.start_date <= new_day <= dst.end_date):
             skipped_out += 1
             continue
 
-        new_stage_id = int(stage_map.get(str(s.stage_id), s.stage_id))
-        conflicts = find_conflicts(
-            edition_id=dst.id,
-            stage_id=new_stage_id,
-            day=new_day,
-            start_time=s.start_time,
-            end_time=s.end_time,
-            exclude_id=None,
+        new_stage_id = int(stage_map.get(str(s["stage_id"]), s["stage_id"]))
+        dupe_key = (new_stage_id, new_day, s["start_time"], s["artist_id"])
+        if dupe_key in seen:
+            skipped_dupe += 1
+            continue
+
+        start = slot_index.time_to_seconds(s["start_time"])
+        end = slot_index.end_seconds(s["start_time"], s["end_time"]) + slot_index.changeover_seconds(
+            s["changeover_minutes"], stage_changeover.get(new_stage_id)
         )
-        if conflicts:
+        day_s = slot_index.DAY_SECONDS
+        if _group(new_stage_id, new_day).overlapping(start, end) or (
+            end > day_s
+            and _group(new_stage_id, new_day + slot_index.ONE_DAY).overlapping(start - day_s, end - day_s)
+        ):
             skipped_conf += 1
             continue
 
-        if not dry_run:
-            Slot.objects.create(
-                edition_id=dst.id,
-                stage_id=new_stage_id,
-                artist_id=s.artist_id,
-                day=new_day,
-                start_time=s.start_time,
-                end_time=s.end_time,
-                status=status,
-                is_headliner=s.is_headliner,
-                setlist_urls=s.setlist_urls,
-                tech_rider=s.tech_rider,
-                notes=f"[copied from {src.year}] {s.notes or ''}".strip(),
-            )
+        seen.add(dupe_key)
+        _add(new_stage_id, new_day, slot_index.IndexedSlot(
+            start=start, end=end, slot_id=-s["id"],
+            start_time=s["start_time"], end_time=s["end_time"], artist="",
+        ))
+        to_create.append(Slot(
+            edition_id=dst.id,
+            stage_id=new_stage_id,
+            artist_id=s["artist_id"],
+            day=new_day,
+            start_time=s["start_time"],
+            end_time=s["end_time"],
+            changeover_minutes=s["changeover_minutes"],
+            status=status,
+            is_headliner=s["is_headliner"],
+            setlist_urls=s["setlist_urls"],
+            tech_rider=s["tech_rider"],
+            notes=f"[copied from {src.year}] {s['notes'] or ''}".strip(),
+        ))
         created += 1
 
-    return TemplateCopyResult(
+    result = TemplateCopyResult(
         created=created,
         skipped_out_of_range=skipped_out,
         skipped_conflicts=skipped_conf,
-        total_source=source_slots.count(),
+        total_source=len(source_slots),
+        skipped_duplicates=skipped_dupe,
+    )
+
+    # 3) écriture par lots, transactionnelle
+    if not dry_run and to_create:
+        for slot in to_create:
+            slot.sync_window()  # bulk_create n'appelle pas save()
+        with transaction.atomic():
+            Slot.objects.bulk_create(to_create, batch_size=batch_size)
+        invalidate_schedule(dst.id)
+        events.publish_slots("schedule.slot.created", to_create)
+        SLOTS_STATUS_TOTAL.labels(status=status).inc(created)
+        payload = {
+            "event": "schedule.template.copied",
+            "from_edition": src.id,
+            "to_edition": dst.id,
+            "status": status,
+            "offset_days": offset_days,
+            "result": result.to_dict(),
+        }
+        try:
+            dispatch_webhook("schedule.template.copied", payload)
+        except Exception:
+            pass
+
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Changement de statut en masse
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BulkStatusResult:
+    status: str
+    requested: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    missing: List[int] = field(default_factory=list)  # ids absents ou sans permission `manage_slot`
+    conflicts: List[BatchConflict] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "status": self.status,
+            "requested": self.requested,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "missing": self.missing,
+            "conflicts": [c.to_dict() for c in self.conflicts],
+        }
+
+
+def bulk_set_status(*, user, ids: Iterable[int], status: str) -> BulkStatusResult:
+    """
+    Applique `status` à un ensemble de slots en tout-ou-rien :
+    - une requête pour les slots autorisés (`schedule.manage_slot`, perms objet ou globales) ;
+    - réactiver un slot annulé vérifie les conflits (une requête, `find_conflicts_batch`) ;
+    - un seul UPDATE, un seul webhook `schedule.slots.status_changed`.
+    Les signaux Slot ne sont pas émis (UPDATE ensembliste) : invalidations,
+    métriques et événements SSE (un par slot, après commit) sont faits ici.
+    """
+    from guardian.shortcuts import get_objects_for_user
+
+    ids = sorted({int(i) for i in ids})
+    result = BulkStatusResult(status=status, requested=len(ids))
+    if not ids:
+        return result
+
+    qs = Slot.objects.filter(pk__in=ids).order_by()
+    if not (user.is_staff or user.is_superuser):
+        qs = get_objects_for_user(user, "schedule.manage_slot", klass=qs, accept_global_perms=True)
+    rows = list(qs.values_list(
+        "id", "edition_id", "stage_id", "day", "start_time", "end_time", "status", "changeover_minutes",
+    ))
+
+    found = {r[0] for r in rows}
+    result.missing = [i for i in ids if i not in found]
+    if result.missing:
+        return result
+
+    changed = [r for r in rows if r[6] != status]
+    result.unchanged = len(rows) - len(changed)
+    if not changed:
+        return result
+
+    if status != SlotStatus.CANCELED:
+        revived = [r for r in changed if r[6] == SlotStatus.CANCELED]
+        result.conflicts = find_conflicts_batch([
+            {"id": pk, "edition": ed, "stage": st, "day": day, "start_time": start, "end_time": end,
+             "changeover_minutes": co}
+            for pk, ed, st, day, start, end, _, co in revived
+        ])
+        if result.conflicts:
+            return result
+
+    changed_ids = [r[0] for r in changed]
+    with transaction.atomic():
+        result.updated = Slot.objects.filter(pk__in=changed_ids).update(
+            status=status, updated_at=timezone.now()
+        )
+    for edition_id in sorted({r[1] for r in changed}):
+        invalidate_schedule(edition_id)
+    SLOTS_STATUS_TOTAL.labels(status=status).inc(result.updated)
+    events.publish_slots(
+        "schedule.slot.canceled" if status == SlotStatus.CANCELED else "schedule.slot.updated",
+        Slot.objects.filter(pk__in=changed_ids).order_by("pk"),
     )
+
+    payload = {
+        "event": "schedule.slots.status_changed",
+        "status": status,
+        "count": result.updated,
+        "slots": [
+            {"id": pk, "edition": ed, "stage": st, "day": str(day), "from": old}
+            for pk, ed, st, day, _, _, old, _ in changed
+        ],
+    }
+    try:
+        dispatch_webhook("schedule.slots.status_changed", payload)
+    except Exception:
+        pass
+    return result
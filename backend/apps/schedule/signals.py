@@ -1,32 +1,57 @@
 # apps/schedule/signals.py
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Tuple
 
-from django.db.models.signals import pre_save, post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 from apps.common.services import dispatch_webhook
+from apps.core.models import Stage
+from apps.lineup.models import Artist
+from . import events, ics
 from .metrics import SLOTS_STATUS_TOTAL
 from .models import Slot, SlotStatus
+from .services import invalidate_schedule
 
 _PRE: Dict[int, str] = {}  # cache old status
+_PRE_KEY: Dict[int, Tuple[int, int, object]] = {}  # cache old (edition, stage, day)
 
 
-@receiver(pre_save, sender=Slot)
+def _invalidate(edition_id, stage_id, day) -> None:
+    invalidate_schedule(edition_id, stage_id, day)
+    # une requête concurrente a pu reconstruire l'index avant le commit
+    transaction.on_commit(lambda: invalidate_schedule(edition_id, stage_id, day))
+
+
+@receiver(pre_save, sender=Slot, dispatch_uid="schedule_slot_pre_save")
 def slot_pre_save_cache(sender, instance: Slot, **kwargs):
     if instance.pk:
         try:
-            _PRE[instance.pk] = sender.objects.only("status").get(pk=instance.pk).status
+            old = sender.objects.only("status", "edition_id", "stage_id", "day").get(pk=instance.pk)
+            _PRE[instance.pk] = old.status
+            _PRE_KEY[instance.pk] = (old.edition_id, old.stage_id, old.day)
         except sender.DoesNotExist:
             _PRE.pop(instance.pk, None)
+            _PRE_KEY.pop(instance.pk, None)
 
 
-@receiver(post_save, sender=Slot)
+@receiver(post_save, sender=Slot, dispatch_uid="schedule_slot_post_save")
 def slot_post_save_emit(sender, instance: Slot, created: bool, **kwargs):
     status = instance.status
     SLOTS_STATUS_TOTAL.labels(status=status).inc()
 
+    old_key = _PRE_KEY.pop(instance.pk, None)
+    new_key = (instance.edition_id, instance.stage_id, instance.day)
+    _invalidate(*new_key)
+    if old_key and old_key != new_key:
+        _invalidate(*old_key)
+    feed_keys = [new_key[:2]] + ([old_key[:2]] if old_key else [])
+    slot_id = instance.pk
+    # flux ICS stockés : seulement les changements effectivement commités
+    transaction.on_commit(lambda: ics.refresh_slot_feeds(slot_id, keys=feed_keys))
+
     event = None
     if created:
         event = "schedule.slot.created"
@@ -39,20 +64,38 @@ def slot_post_save_emit(sender, instance: Slot, created: bool, **kwargs):
                 event = "schedule.slot.updated"
 
     if event:
-        payload = {
-            "event": event,
-            "slot": {
-                "id": instance.id,
-                "edition": instance.edition_id,
-                "stage": instance.stage_id,
-                "artist": instance.artist_id,
-                "day": str(instance.day),
-                "start": str(instance.start_time),
-                "end": str(instance.end_time),
-                "status": instance.status,
-            }
-        }
+        payload = events.slot_payload(event, instance)
         try:
             dispatch_webhook(event, payload)
         except Exception:
             pass
+        # flux SSE : seulement les changements effectivement commités
+        transaction.on_commit(lambda: events.publish(event, payload))
+
+
+@receiver(post_delete, sender=Slot, dispatch_uid="schedule_slot_post_delete")
+def slot_post_delete_invalidate(sender, instance: Slot, **kwargs):
+    _invalidate(instance.edition_id, instance.stage_id, instance.day)
+    slot_id, feed_keys = instance.pk, [(instance.edition_id, instance.stage_id)]
+    transaction.on_commit(lambda: ics.refresh_slot_feeds(slot_id, keys=feed_keys, deleted=True))
+
+
+def _drop_feeds_for_slots(*, extra_editions=(), **filters) -> None:
+    # noms/changeovers dénormalisés dans les flux ICS, la grille et les index : invalidation complète
+    editions = set(Slot.objects.filter(**filters).order_by().values_list("edition_id", flat=True).distinct())
+    editions.update(e for e in extra_editions if e)
+    for edition_id in sorted(editions):
+        invalidate_schedule(edition_id)
+
+
+@receiver(post_save, sender=Stage, dispatch_uid="schedule_stage_post_save_feeds")
+def stage_post_save_drop_feeds(sender, instance: Stage, created: bool, **kwargs):
+    # nom de scène = SUMMARY/LOCATION des VEVENT stockés ; changeover = index de conflits
+    if not created:
+        _drop_feeds_for_slots(stage_id=instance.pk, extra_editions=[instance.edition_id])
+
+
+@receiver(post_save, sender=Artist, dispatch_uid="schedule_artist_post_save_feeds")
+def artist_post_save_drop_feeds(sender, instance: Artist, created: bool, **kwargs):
+    if not created:
+        _drop_feeds_for_slots(artist_id=instance.pk)
@@ -0,0 +1,169 @@
+# apps/schedule/snapshots.py
+"""
+Snapshots de planning et diff entre versions.
+
+Encodage colonnaire, trié par id de slot (une requête) :
+    {"format": 1, "day0": "2025-07-18", "statuses": [...],
+     "id": [...], "stage": [...], "artist": [...],
+     "day": [décalage en jours depuis day0], "start": [s], "end": [s], "status": [indice]}
+`start`/`end` en secondes depuis minuit (`end` > 86400 si le slot passe minuit).
+
+`diff` fusionne linéairement deux encodages sur leurs ids triés (O(n + m)) :
+- added     : slot nouveau (ou réactivé) ;
+- cancelled : slot annulé ou supprimé (`deleted`) ;
+- moved     : scène ou jour changé (horaires inclus) ;
+- retimed   : même scène/jour, horaires changés ;
+- replaced  : artiste changé sur un slot conservé (`from_artist` -> `artist`),
+  cumulable avec moved/retimed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .index import end_seconds, time_to_seconds
+from .models import ScheduleSnapshot, Slot, SlotStatus
+from .services import current_schedule_version
+
+FORMAT = 1
+STATUSES = [value for value, _ in SlotStatus.choices]
+COLUMNS = ("id", "stage", "artist", "day", "start", "end", "status")
+_CANCELED = STATUSES.index(SlotStatus.CANCELED)
+
+
+def capture(edition_id: int) -> Dict:
+    """Encodage colonnaire des slots de l'édition (une requête)."""
+    rows = list(
+        Slot.objects.filter(edition_id=edition_id).order_by("id").values_list(
+            "id", "stage_id", "artist_id", "day", "start_time", "end_time", "status",
+        )
+    )
+    day0 = min((r[3] for r in rows), default=None)
+    cols: Dict[str, List[int]] = {name: [] for name in COLUMNS}
+    status_index = {s: i for i, s in enumerate(STATUSES)}
+    for pk, stage_id, artist_id, day, st, et, status in rows:
+        cols["id"].append(pk)
+        cols["stage"].append(stage_id)
+        cols["artist"].append(artist_id)
+        cols["day"].append((day - day0).days)
+        cols["start"].append(time_to_seconds(st))
+        cols["end"].append(end_seconds(st, et))
+        cols["status"].append(status_index[status])
+    return {"format": FORMAT, "day0": day0.isoformat() if day0 else None, "statuses": STATUSES, **cols}
+
+
+def checksum(data: Dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def create_snapshot(edition_id: int, *, label: str = "", user=None, publish: bool = False) -> ScheduleSnapshot:
+    version = current_schedule_version(edition_id)
+    data = capture(edition_id)
+    return ScheduleSnapshot.objects.create(
+        edition_id=edition_id,
+        label=label,
+        schedule_version=version,
+        slot_count=len(data["id"]),
+        checksum=checksum(data),
+        data=data,
+        published_at=timezone.now() if publish else None,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+
+
+def publish(snapshot: ScheduleSnapshot) -> ScheduleSnapshot:
+    with transaction.atomic():
+        snapshot.published_at = timezone.now()
+        snapshot.save(update_fields=["published_at", "updated_at"])
+    return snapshot
+
+
+def last_published(edition_id: int) -> Optional[ScheduleSnapshot]:
+    return (
+        ScheduleSnapshot.objects.filter(edition_id=edition_id, published_at__isnull=False)
+        .order_by("-published_at", "-id").first()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Diff
+# ---------------------------------------------------------------------------
+
+def _hms(seconds: int) -> str:
+    seconds %= 24 * 3600
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _row(data: Dict, i: int) -> Dict:
+    day0 = date.fromisoformat(data["day0"])
+    return {
+        "stage": data["stage"][i],
+        "day": (day0 + timedelta(days=data["day"][i])).isoformat(),
+        "start": _hms(data["start"][i]),
+        "end": _hms(data["end"][i]),
+    }
+
+
+def diff(old: Dict, new: Dict) -> Dict:
+    """Fusion linéaire sur les ids triés des deux encodages."""
+    added: List[Dict] = []
+    cancelled: List[Dict] = []
+    moved: List[Dict] = []
+    retimed: List[Dict] = []
+    replaced: List[Dict] = []
+    # les jours sont relatifs à day0 : ramenés à l'ordinal pour comparer
+    o_base = date.fromisoformat(old["day0"]).toordinal() if old.get("day0") else 0
+    n_base = date.fromisoformat(new["day0"]).toordinal() if new.get("day0") else 0
+    o_ids, n_ids = old.get("id", []), new.get("id", [])
+    o_status = [STATUSES.index(old["statuses"][s]) for s in old.get("status", [])]
+    n_status = [STATUSES.index(new["statuses"][s]) for s in new.get("status", [])]
+
+    i = j = 0
+    while i < len(o_ids) or j < len(n_ids):
+        if j >= len(n_ids) or (i < len(o_ids) and o_ids[i] < n_ids[j]):
+            if o_status[i] != _CANCELED:
+                cancelled.append({"slot_id": o_ids[i], "artist": old["artist"][i], **_row(old, i), "deleted": True})
+            i += 1
+            continue
+        if i >= len(o_ids) or n_ids[j] < o_ids[i]:
+            if n_status[j] != _CANCELED:
+                added.append({"slot_id": n_ids[j], "artist": new["artist"][j], **_row(new, j)})
+            j += 1
+            continue
+
+        pk = o_ids[i]
+        was_active, is_active = o_status[i] != _CANCELED, n_status[j] != _CANCELED
+        if was_active and not is_active:
+            cancelled.append({"slot_id": pk, "artist": new["artist"][j], **_row(new, j), "deleted": False})
+        elif is_active and not was_active:
+            added.append({"slot_id": pk, "artist": new["artist"][j], **_row(new, j)})
+        elif is_active:
+            if old["artist"][i] != new["artist"][j]:
+                replaced.append({"slot_id": pk, "from_artist": old["artist"][i], "artist": new["artist"][j], **_row(new, j)})
+            same_place = (
+                old["stage"][i] == new["stage"][j]
+                and o_base + old["day"][i] == n_base + new["day"][j]
+            )
+            same_times = (old["start"][i], old["end"][i]) == (new["start"][j], new["end"][j])
+            if not same_place or not same_times:
+                entry = {"slot_id": pk, "artist": new["artist"][j], "from": _row(old, i), "to": _row(new, j)}
+                (retimed if same_place else moved).append(entry)
+        i += 1
+        j += 1
+
+    return {
+        "added": added,
+        "cancelled": cancelled,
+        "moved": moved,
+        "retimed": retimed,
+        "replaced": replaced,
+        "summary": {
+            "added": len(added), "cancelled": len(cancelled),
+            "moved": len(moved), "retimed": len(retimed), "replaced": len(replaced),
+        },
+    }
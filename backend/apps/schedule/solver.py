@@ -0,0 +1,401 @@
+# apps/schedule/solver.py
+"""
+Génération automatique d'une grille (un set par artiste), sans conflit.
+
+1. `build_problem` lit en quelques requêtes l'édition, ses scènes (capacité,
+   changeover), les artistes, leurs `ArtistAvailability` et les slots existants
+   (obstacles fixes) ;
+2. `solve` place d'abord les têtes d'affiche (dernier créneau des plus grandes
+   scènes, une par scène et par jour), puis les autres artistes au plus tôt
+   (graine gloutonne), puis répare les non-placés par éjection/réinsertion
+   tant que le budget de temps le permet ;
+3. `apply_solution` écrit les slots TENTATIVE via `bulk_create`, après une
+   dernière vérification `find_conflicts_batch` (une requête).
+
+Le problème est en mémoire : une `IntervalIndex` par (jour, scène), intervalles
+tamponnés par le changeover comme dans le reste du moteur de conflits.
+"""
+from __future__ import annotations
+
+import random
+import time as _time
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+
+from apps.common.services import dispatch_webhook
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist, ArtistAvailability
+from . import events
+from . import index as slot_index
+from .index import IndexedSlot, IntervalIndex, time_to_seconds
+from .metrics import SLOTS_STATUS_TOTAL
+from .models import Slot, SlotStatus
+from .services import find_conflicts_batch, invalidate_schedule
+
+Cell = Tuple[date, int]  # (jour, scène)
+
+
+def _seconds_to_time(seconds: int) -> time:
+    return time(seconds // 3600, (seconds // 60) % 60)
+
+
+@dataclass
+class SolverArtist:
+    id: int
+    name: str
+    popularity: int = 0
+    headliner: bool = False
+    days: List[date] = field(default_factory=list)  # jours disponibles
+
+
+@dataclass
+class SolverStage:
+    id: int
+    name: str
+    capacity: int = 0
+    changeover: int = 0  # secondes
+
+
+@dataclass
+class Problem:
+    edition_id: int
+    days: List[date]
+    stages: List[SolverStage]
+    artists: List[SolverArtist]
+    window: Tuple[int, int]  # secondes depuis minuit (ouverture, fermeture)
+    set_seconds: int
+    headliner_seconds: int
+    step: int
+    fixed: Dict[Cell, List[IndexedSlot]] = field(default_factory=dict)  # slots existants
+    already_scheduled: int = 0
+
+
+@dataclass
+class Placement:
+    artist_id: int
+    artist: str
+    stage_id: int
+    stage: str
+    day: date
+    start: int
+    end: int
+    headliner: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "artist_id": self.artist_id,
+            "artist": self.artist,
+            "stage_id": self.stage_id,
+            "stage": self.stage,
+            "day": str(self.day),
+            "start": str(_seconds_to_time(self.start)),
+            "end": str(_seconds_to_time(self.end)),
+            "is_headliner": self.headliner,
+        }
+
+
+@dataclass
+class SolverResult:
+    placements: List[Placement]
+    unplaced: List[Dict]
+    iterations: int = 0
+    elapsed: float = 0.0
+    already_scheduled: int = 0
+    created: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "placed": len(self.placements),
+            "created": self.created,
+            "already_scheduled": self.already_scheduled,
+            "unplaced": self.unplaced,
+            "iterations": self.iterations,
+            "elapsed": round(self.elapsed, 3),
+            "grid": [p.to_dict() for p in sorted(self.placements, key=lambda p: (p.day, p.stage, p.start))],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Lecture du problème
+# ---------------------------------------------------------------------------
+
+def build_problem(
+    edition_id: int,
+    *,
+    artist_ids: Optional[Iterable[int]] = None,
+    stage_ids: Optional[Iterable[int]] = None,
+    headliner_ids: Optional[Iterable[int]] = None,
+    headliner_popularity: Optional[int] = None,
+    window: Tuple[time, time] = (time(14, 0), time(23, 30)),
+    set_minutes: int = 60,
+    headliner_minutes: int = 90,
+    step_minutes: int = 15,
+) -> Problem:
+    """
+    Artistes par défaut : ceux ayant au moins une disponibilité (`available=True`)
+    sur les jours de l'édition. Sans ligne `ArtistAvailability`, un artiste
+    explicitement demandé est considéré disponible tous les jours ; une ligne
+    `available=False` exclut le jour. Les artistes déjà programmés sont ignorés.
+    """
+    ed = FestivalEdition.objects.get(pk=edition_id)
+    days = [ed.start_date + timedelta(days=i) for i in range((ed.end_date - ed.start_date).days + 1)]
+
+    stage_qs = Stage.objects.filter(edition_id=edition_id)
+    if stage_ids is not None:
+        stage_qs = stage_qs.filter(pk__in=list(stage_ids))
+    stages = [
+        SolverStage(id=pk, name=name, capacity=capacity or 0, changeover=(co or 0) * 60)
+        for pk, name, capacity, co in stage_qs.order_by("name").values_list("id", "name", "capacity", "changeover_minutes")
+    ]
+
+    avail_qs = ArtistAvailability.objects.filter(date__in=days)
+    if artist_ids is not None:
+        artist_ids = [int(a) for a in artist_ids]
+        avail_qs = avail_qs.filter(artist_id__in=artist_ids)
+    available: Dict[int, Set[date]] = {}
+    blocked: Dict[int, Set[date]] = {}
+    for aid, d, ok in avail_qs.values_list("artist_id", "date", "available"):
+        (available if ok else blocked).setdefault(aid, set()).add(d)
+    if artist_ids is None:
+        artist_ids = sorted(available)
+
+    existing = Slot.objects.filter(edition_id=edition_id).exclude(status=SlotStatus.CANCELED).values_list(
+        "id", "artist_id", "stage_id", "day", "start_time", "end_time", "changeover_minutes", "stage__changeover_minutes",
+    )
+    fixed: Dict[Cell, List[IndexedSlot]] = {}
+    scheduled: Set[int] = set()
+    for pk, aid, sid, d, st, et, slot_co, stage_co in existing:
+        scheduled.add(aid)
+        entry = IndexedSlot(
+            start=time_to_seconds(st),
+            end=slot_index.end_seconds(st, et) + slot_index.changeover_seconds(slot_co, stage_co),
+            slot_id=pk, start_time=st, end_time=et, artist="",
+        )
+        fixed.setdefault((d, sid), []).append(entry)
+        tail = slot_index.spill(entry)  # set de fin de nuit : occupe aussi le début du lendemain
+        if tail is not None:
+            fixed.setdefault((d + slot_index.ONE_DAY, sid), []).append(tail)
+
+    headliner_ids = {int(h) for h in headliner_ids or ()}
+    artists: List[SolverArtist] = []
+    already = 0
+    rows = Artist.objects.filter(pk__in=artist_ids).values_list("id", "name", "popularity")
+    for pk, name, popularity in rows:
+        if pk in scheduled:
+            already += 1
+            continue
+        allowed = set(available[pk]) if pk in available else set(days)
+        allowed -= blocked.get(pk, set())
+        artists.append(SolverArtist(
+            id=pk, name=name, popularity=popularity or 0,
+            headliner=pk in headliner_ids or (
+                headliner_popularity is not None and (popularity or 0) >= headliner_popularity
+            ),
+            days=sorted(allowed),
+        ))
+
+    return Problem(
+        edition_id=edition_id,
+        days=days,
+        stages=stages,
+        artists=artists,
+        window=(time_to_seconds(window[0]), time_to_seconds(window[1])),
+        set_seconds=set_minutes * 60,
+        headliner_seconds=headliner_minutes * 60,
+        step=max(1, step_minutes) * 60,
+        fixed=fixed,
+        already_scheduled=already,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Recherche
+# ---------------------------------------------------------------------------
+
+class _State:
+    def __init__(self, problem: Problem):
+        self.p = problem
+        self.stages = {s.id: s for s in problem.stages}
+        self.cells: Dict[Cell, IntervalIndex] = {
+            (d, s.id): IntervalIndex(list(problem.fixed.get((d, s.id), []))) for d in problem.days for s in problem.stages
+        }
+        self.placed: Dict[int, Placement] = {}
+        self.headliner_cells: Set[Cell] = set()
+
+    def duration(self, artist: SolverArtist) -> int:
+        return self.p.headliner_seconds if artist.headliner else self.p.set_seconds
+
+    def _starts(self, duration: int, latest: bool) -> List[int]:
+        lo, hi = self.p.window
+        starts = list(range(lo, hi - duration + 1, self.p.step))
+        return starts[::-1] if latest else starts
+
+    def find_start(self, cell: Cell, artist: SolverArtist, latest: bool = False) -> Optional[int]:
+        duration = self.duration(artist)
+        buffer = self.stages[cell[1]].changeover
+        idx = self.cells[cell]
+        for start in self._starts(duration, latest):
+            if not idx.overlapping(start, start + duration + buffer):
+                return start
+        return None
+
+    def place(self, artist: SolverArtist, cell: Cell, start: int) -> None:
+        duration = self.duration(artist)
+        stage = self.stages[cell[1]]
+        self.cells[cell].add(IndexedSlot(
+            start=start, end=start + duration + stage.changeover, slot_id=-artist.id,
+            start_time=_seconds_to_time(start), end_time=_seconds_to_time(start + duration), artist=artist.name,
+        ))
+        self.placed[artist.id] = Placement(
+            artist_id=artist.id, artist=artist.name, stage_id=stage.id, stage=stage.name,
+            day=cell[0], start=start, end=start + duration, headliner=artist.headliner,
+        )
+        if artist.headliner:
+            self.headliner_cells.add(cell)
+
+    def remove(self, artist: SolverArtist) -> Placement:
+        placement = self.placed.pop(artist.id)
+        cell = (placement.day, placement.stage_id)
+        self.cells[cell].discard(-artist.id)
+        if artist.headliner:
+            self.headliner_cells.discard(cell)
+        return placement
+
+    def cells_for(self, artist: SolverArtist) -> List[Cell]:
+        if artist.headliner:
+            # grandes scènes d'abord, une tête d'affiche par scène et par jour
+            stages = sorted(self.p.stages, key=lambda s: (-s.capacity, s.name))
+            return [(d, s.id) for s in stages for d in artist.days if (d, s.id) not in self.headliner_cells]
+        return [(d, s.id) for d in artist.days for s in self.p.stages]
+
+    def try_place(self, artist: SolverArtist, exclude: Optional[Cell] = None) -> bool:
+        best = None
+        for cell in self.cells_for(artist):
+            if cell == exclude:
+                continue
+            start = self.find_start(cell, artist, latest=artist.headliner)
+            if start is None:
+                continue
+            # tête d'affiche : plus grande scène, au plus tard ; sinon au plus tôt,
+            # puis scène la moins chargée
+            if artist.headliner:
+                key = (-self.stages[cell[1]].capacity, -start, len(self.cells[cell]))
+            else:
+                key = (start, len(self.cells[cell]))
+            if best is None or key < best[0]:
+                best = (key, cell, start)
+        if best is None:
+            return False
+        self.place(artist, best[1], best[2])
+        return True
+
+
+def solve(problem: Problem, *, budget_seconds: float = 5.0, seed: int = 0) -> SolverResult:
+    t0 = _time.monotonic()
+    rng = random.Random(seed)
+    state = _State(problem)
+    by_id = {a.id: a for a in problem.artists}
+
+    # 1) graine gloutonne : têtes d'affiche puis autres artistes, les plus contraints
+    #    (moins de jours disponibles) d'abord ; à contrainte égale, les moins
+    #    populaires ouvrent la journée
+    order = sorted(problem.artists, key=lambda a: (not a.headliner, len(a.days), a.popularity, a.id))
+    unplaced = [a for a in order if a.days and not state.try_place(a)]
+
+    # 2) réparation : éjecter un artiste placé (non tête d'affiche) pour libérer
+    #    un créneau, puis le réinsérer ailleurs ; rollback sinon
+    iterations = 0
+    improved = True
+    while unplaced and improved and _time.monotonic() - t0 < budget_seconds:
+        improved = False
+        for artist in list(unplaced):
+            if _time.monotonic() - t0 >= budget_seconds:
+                break
+            cells = state.cells_for(artist)
+            rng.shuffle(cells)
+            done = False
+            for cell in cells:
+                victims = [by_id[-e.slot_id] for e in state.cells[cell].entries
+                           if e.slot_id < 0 and not by_id[-e.slot_id].headliner]
+                rng.shuffle(victims)
+                for victim in victims:
+                    iterations += 1
+                    old = state.remove(victim)
+                    start = state.find_start(cell, artist, latest=artist.headliner)
+                    if start is not None:
+                        state.place(artist, cell, start)
+                        if state.try_place(victim, exclude=cell) or state.try_place(victim):
+                            done = True
+                            break
+                        state.remove(artist)
+                    state.place(victim, (old.day, old.stage_id), old.start)
+                if done:
+                    break
+            if done:
+                unplaced.remove(artist)
+                improved = True
+
+    report = [
+        {"artist_id": a.id, "artist": a.name, "reason": "no available day" if not a.days else "no room"}
+        for a in problem.artists if a.id not in state.placed
+    ]
+    return SolverResult(
+        placements=list(state.placed.values()),
+        unplaced=report,
+        iterations=iterations,
+        elapsed=_time.monotonic() - t0,
+        already_scheduled=problem.already_scheduled,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Écriture
+# ---------------------------------------------------------------------------
+
+def apply_solution(problem: Problem, result: SolverResult, *, batch_size: int = 500) -> SolverResult:
+    """
+    Insère les placements en slots TENTATIVE (`bulk_create`, transaction).
+    Re-vérifie d'abord les conflits contre la base (une requête) : lève
+    ValueError si le planning a changé depuis `build_problem`.
+    """
+    if not result.placements:
+        return result
+    candidates = [
+        {"edition": problem.edition_id, "stage": p.stage_id, "day": p.day,
+         "start_time": _seconds_to_time(p.start), "end_time": _seconds_to_time(p.end)}
+        for p in result.placements
+    ]
+    conflicts = find_conflicts_batch(candidates)
+    if conflicts:
+        raise ValueError(f"{len(conflicts)} conflict(s) with the current schedule; re-run the solver")
+
+    rows = [
+        Slot(
+            edition_id=problem.edition_id, stage_id=p.stage_id, artist_id=p.artist_id, day=p.day,
+            start_time=_seconds_to_time(p.start), end_time=_seconds_to_time(p.end),
+            status=SlotStatus.TENTATIVE, is_headliner=p.headliner, notes="[solver]",
+        )
+        for p in result.placements
+    ]
+    for slot in rows:
+        slot.sync_window()  # bulk_create n'appelle pas save()
+    with transaction.atomic():
+        Slot.objects.bulk_create(rows, batch_size=batch_size)
+    result.created = len(rows)
+    invalidate_schedule(problem.edition_id)
+    events.publish_slots("schedule.slot.created", rows)
+    SLOTS_STATUS_TOTAL.labels(status=SlotStatus.TENTATIVE).inc(result.created)
+    payload = {
+        "event": "schedule.timetable.generated",
+        "edition": problem.edition_id,
+        "created": result.created,
+        "unplaced": len(result.unplaced),
+    }
+    try:
+        dispatch_webhook("schedule.timetable.generated", payload)
+    except Exception:
+        pass
+    return result
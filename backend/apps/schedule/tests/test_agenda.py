@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+
+
+class AgendaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("fan", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("schedule-agenda")
+        ed = FestivalEdition.objects.create(
+            name="Agenda", year=2045, start_date=date(2045, 7, 1), end_date=date(2045, 7, 1)
+        )
+        stage = Stage.objects.create(edition=ed, name="Main")
+        self.slots = [
+            Slot.objects.create(
+                edition=ed, stage=stage, artist=Artist.objects.create(name=f"Artist {i}"),
+                day=ed.start_date, start_time=time(18 + i, 0), end_time=time(18 + i, 45),
+            )
+            for i in range(3)
+        ]
+
+    def _ics(self, url, **headers):
+        return APIClient().get(url, headers=headers)
+
+    def test_selection_and_feed(self):
+        a, b, c = self.slots
+        resp = self.client.put(self.url, {"slots": [b.id, a.id, 999999]}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["slots"], [a.id, b.id])
+        self.assertEqual(resp.data["unknown"], [999999])
+        resp = self.client.patch(self.url, {"add": [c.id], "remove": [a.id]}, format="json")
+        self.assertEqual(resp.data["slots"], [b.id, c.id])
+
+        ics_url = resp.data["ics_url"]
+        resp = self._ics(ics_url)
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+        self.assertLess(body.index(f"UID:slot-{b.id}@"), body.index(f"UID:slot-{c.id}@"))
+        self.assertNotIn(f"UID:slot-{a.id}@", body)
+        etag = resp["ETag"]
+
+        # 304 : une requête (profil), aucun slot relu
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self._ics(ics_url, if_none_match=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        # modification d'un slot sélectionné -> nouveau contenu
+        b.notes = "Rappel public"
+        b.save()
+        resp = self._ics(ics_url, if_none_match=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("DESCRIPTION:Rappel public", resp.content.decode())
+
+    def test_etag_follows_selected_editions_and_cancellations(self):
+        a, b, _ = self.slots
+        ics_url = self.client.put(self.url, {"slots": [a.id, b.id]}, format="json").data["ics_url"]
+        etag = self._ics(ics_url)["ETag"]
+
+        # autre édition modifiée : l'agenda reste à jour (304)
+        other = FestivalEdition.objects.create(
+            name="Other", year=2046, start_date=date(2046, 7, 1), end_date=date(2046, 7, 1)
+        )
+        Slot.objects.create(
+            edition=other, stage=Stage.objects.create(edition=other, name="Side"), artist=a.artist,
+            day=other.start_date, start_time=time(20, 0), end_time=time(21, 0),
+        )
+        self.assertEqual(self._ics(ics_url, if_none_match=etag).status_code, 304)
+
+        # slot annulé : conservé avec STATUS:CANCELLED (même UID)
+        b.status = SlotStatus.CANCELED
+        b.save()
+        resp = self._ics(ics_url, if_none_match=etag)
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        event = body[body.index(f"UID:slot-{b.id}@"):]
+        self.assertIn("STATUS:CANCELLED", event[:event.index("END:VEVENT")])
+        self.assertEqual(body.count("STATUS:CANCELLED"), 1)
+
+    def test_fragments_shared_between_users(self):
+        a, b, _ = self.slots
+        self.client.put(self.url, {"slots": [a.id, b.id]}, format="json")
+        self._ics(self.client.get(self.url).data["ics_url"])
+
+        other = get_user_model().objects.create_user("other", password="x")
+        client = APIClient()
+        client.force_authenticate(other)
+        url = client.put(self.url, {"slots": [a.id]}, format="json").data["ics_url"]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self._ics(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(any("schedule_slot" in q["sql"] for q in ctx.captured_queries))
+
+    def test_token_rotation_and_bad_tokens(self):
+        old = self.client.get(self.url).data["ics_url"]
+        self.assertEqual(self._ics(old).status_code, 200)
+        new = self.client.post(reverse("schedule-agenda-token")).data["ics_url"]
+        self.assertNotEqual(old, new)
+        self.assertEqual(self._ics(old).status_code, 404)
+        self.assertEqual(self._ics(new).status_code, 200)
+        forged = new.replace(f"/{self.user.id}.", f"/{self.user.id + 1}.")
+        self.assertEqual(self._ics(forged).status_code, 404)
+
+    def test_requires_auth_and_valid_payload(self):
+        self.assertEqual(APIClient().get(self.url).status_code, 403)
+        resp = self.client.put(self.url, {"slots": "1,2"}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        with self.settings(SCHEDULE_AGENDA_MAX_SLOTS=1):
+            resp = self.client.put(self.url, {"slots": [s.id for s in self.slots]}, format="json")
+        self.assertEqual(resp.status_code, 400)
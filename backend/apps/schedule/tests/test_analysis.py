@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.analysis import analyse_edition
+from apps.schedule.models import Slot, SlotStatus
+
+
+class AnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ed = FestivalEdition.objects.create(
+            name="Analysis", year=2043, start_date=date(2043, 7, 1), end_date=date(2043, 7, 2)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main", capacity=1000)
+        self.club = Stage.objects.create(edition=self.ed, name="Club", capacity=200)
+        self.day = self.ed.start_date
+
+    def _slot(self, stage, name, start, end, popularity=0, **kw):
+        artist = Artist.objects.create(name=name, popularity=popularity)
+        return Slot.objects.create(
+            edition=self.ed, stage=stage, artist=artist, day=kw.pop("day", self.day),
+            start_time=start, end_time=end, **kw
+        )
+
+    def test_headliner_clash_on_other_stage_only(self):
+        a = self._slot(self.main, "A", time(21, 0), time(22, 30), is_headliner=True)
+        b = self._slot(self.club, "B", time(22, 0), time(23, 0), is_headliner=True)
+        self._slot(self.club, "C", time(21, 0), time(21, 30))  # pas tête d'affiche
+        self._slot(self.main, "D", time(22, 0), time(23, 0), is_headliner=True,
+                   status=SlotStatus.CANCELED)
+
+        clashes = analyse_edition(self.ed.id)["headliner_clashes"]
+        self.assertEqual(len(clashes), 1)
+        clash = clashes[0]
+        self.assertEqual((clash["start"], clash["end"], clash["minutes"]), ("22:00", "22:30", 30))
+        self.assertEqual({s["slot_id"] for s in clash["slots"]}, {a.id, b.id})
+
+    def test_headliner_clash_after_midnight_renders_clock_time(self):
+        self._slot(self.main, "Late", time(23, 30), time(1, 30), is_headliner=True)
+        self._slot(self.club, "Later", time(23, 45), time(1, 0), is_headliner=True)
+        clash = analyse_edition(self.ed.id)["headliner_clashes"][0]
+        self.assertEqual((clash["start"], clash["end"], clash["minutes"]), ("23:45", "01:00", 75))
+
+    def test_attendance_split_and_capped(self):
+        self._slot(self.main, "Big", time(20, 0), time(21, 0), popularity=3)
+        self._slot(self.club, "Small", time(20, 30), time(21, 30), popularity=0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = analyse_edition(self.ed.id)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        day = data["attendance"][0]
+        self.assertEqual((day["start"], day["minutes"], day["audience"]), ("20:00", 90, 1200))
+        curves = {s["stage"]: s["attendance"] for s in day["stages"]}
+        # 20:00-20:30 : seule la grande scène joue -> plafonnée à sa capacité
+        self.assertEqual(curves["Main"][0], 1000)
+        self.assertEqual(curves["Club"][0], 0)
+        # 20:30-21:00 : partage 4/1 du public, Club plafonné à 200
+        self.assertEqual(curves["Main"][30], 960)
+        self.assertEqual(curves["Club"][30], 200)
+        # 21:00-21:30 : seul le club
+        self.assertEqual((curves["Main"][60], curves["Club"][60]), (0, 200))
+        self.assertEqual(len(curves["Main"]), 90)
+
+    def test_endpoint_validates_and_caches(self):
+        self._slot(self.main, "A", time(20, 0), time(21, 0))
+        client = APIClient()
+        url = reverse("schedule-slots-analysis")
+        self.assertEqual(client.get(url).status_code, 400)
+        self.assertEqual(client.get(url, {"edition": self.ed.id, "audience": "-1"}).status_code, 400)
+
+        resp = client.get(url, {"edition": self.ed.id, "audience": 500})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["attendance"][0]["stages"][0]["peak"], 500)
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url, {"edition": self.ed.id, "audience": 500})
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        # une modification de slot invalide le cache (version de planning)
+        self._slot(self.club, "B", time(20, 0), time(21, 0), is_headliner=True)
+        resp = client.get(url, {"edition": self.ed.id, "audience": 500})
+        self.assertEqual(len(resp.data["attendance"][0]["stages"]), 2)
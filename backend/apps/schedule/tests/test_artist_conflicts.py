@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.core.models import FestivalEdition, Stage, Venue
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import find_artist_conflicts
+
+
+class ArtistConflictTests(TestCase):
+    def setUp(self):
+        self.ed = FestivalEdition.objects.create(
+            name="Artists", year=2042, start_date=date(2042, 7, 1), end_date=date(2042, 7, 2)
+        )
+        # ~9.3 km entre les deux lieux
+        north = Venue.objects.create(name="Nord", latitude=Decimal("48.8867"), longitude=Decimal("2.3431"))
+        south = Venue.objects.create(name="Sud", latitude=Decimal("48.8049"), longitude=Decimal("2.3212"))
+        self.a1 = Stage.objects.create(edition=self.ed, venue=north, name="Nord A")
+        self.a2 = Stage.objects.create(edition=self.ed, venue=north, name="Nord B")
+        self.b1 = Stage.objects.create(edition=self.ed, venue=south, name="Sud A")
+        self.artist = Artist.objects.create(name="Solo")
+        self.day = self.ed.start_date
+
+    def _slot(self, stage, start, end, **kw):
+        return Slot.objects.create(
+            edition=self.ed, stage=stage, artist=kw.pop("artist", self.artist), day=kw.pop("day", self.day),
+            start_time=start, end_time=end, **kw
+        )
+
+    def test_overlap_and_travel(self):
+        s1 = self._slot(self.a1, time(18, 0), time(19, 0))
+        s2 = self._slot(self.a2, time(19, 15), time(20, 0))  # même lieu : 15 min >= 10 min
+        s3 = self._slot(self.b1, time(20, 15), time(21, 0))  # autre lieu : 15 min < 10 + ~19 min
+        s4 = self._slot(self.a1, time(20, 45), time(21, 30))  # chevauche s3
+        self._slot(self.b1, time(18, 30), time(19, 0), status=SlotStatus.CANCELED)
+
+        conflicts = find_artist_conflicts(self.ed.id)
+        pairs = {(c.slot_id, c.other_slot_id): c for c in conflicts}
+        self.assertNotIn((s1.id, s2.id), pairs)
+        travel = pairs[(s2.id, s3.id)]
+        self.assertEqual(travel.kind, "travel")
+        self.assertEqual(travel.gap_minutes, 15)
+        self.assertGreater(travel.required_minutes, 25)
+        self.assertAlmostEqual(travel.distance_km, 9.2, delta=0.5)
+        self.assertEqual(pairs[(s3.id, s4.id)].kind, "overlap")
+        self.assertEqual(len(conflicts), 2)
+
+    def test_other_days_and_artists_ignored(self):
+        other = Artist.objects.create(name="Other")
+        self._slot(self.a1, time(18, 0), time(19, 0))
+        self._slot(self.b1, time(18, 0), time(19, 0), artist=other)
+        self._slot(self.b1, time(18, 0), time(19, 0), day=self.ed.end_date)
+        self.assertEqual(find_artist_conflicts(self.ed.id), [])
+
+    def test_command_and_action(self):
+        self._slot(self.a1, time(18, 0), time(19, 0))
+        self._slot(self.b1, time(18, 30), time(19, 30))
+        out = StringIO()
+        call_command("schedule_artist_conflicts", "--edition", str(self.ed.id), stdout=out)
+        self.assertIn("[overlap] Solo", out.getvalue())
+        res = self.client.get("/api/v1/schedule/slots/artist-conflicts/", {"edition": self.ed.id})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["conflicts"][0]["kind"], "overlap")
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import date, time
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import services
+from apps.schedule.models import Slot, SlotStatus
+
+
+class BulkCloneTests(TestCase):
+    def setUp(self):
+        self.src = FestivalEdition.objects.create(
+            name="src", year=2033, start_date=date(2033, 7, 1), end_date=date(2033, 7, 2)
+        )
+        self.dst = FestivalEdition.objects.create(
+            name="dst", year=2034, start_date=date(2034, 7, 1), end_date=date(2034, 7, 2)
+        )
+        self.stage = Stage.objects.create(edition=self.src, name="Main")
+        self.artists = [Artist.objects.create(name=f"A{i}") for i in range(4)]
+
+    def _slot(self, ed, day, start, end, artist, **kw):
+        return Slot.objects.create(
+            edition=ed, stage=self.stage, artist=artist, day=day,
+            start_time=start, end_time=end, **kw
+        )
+
+    def test_bulk_clone_dedupes_and_checks_conflicts_in_memory(self):
+        d1, d2 = self.src.start_date, self.src.end_date
+        for i in range(20):
+            self._slot(self.src, d1, time(10 + i // 2, 30 * (i % 2)), time(10 + i // 2, 30 * (i % 2) + 29),
+                       self.artists[i % 4])
+        self._slot(self.src, d2, time(20, 0), time(21, 0), self.artists[0])
+        self._slot(self.src, d2, time(20, 30), time(21, 30), self.artists[1])  # conflit avec la copie précédente
+        # déjà présent en destination -> doublon
+        self._slot(self.dst, self.dst.start_date, time(10, 0), time(10, 29), self.artists[0])
+
+        with patch.object(services, "dispatch_webhook") as hook:
+            with CaptureQueriesContext(connection) as ctx:
+                res = services.copy_template(from_edition_id=self.src.id, to_edition_id=self.dst.id)
+
+        selects = [q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        # 2 éditions + destination + source + changeover des scènes cibles
+        # (+ scènes pour la purge des flux ICS), indépendant du volume
+        self.assertLessEqual(len(selects), 7)
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(res.total_source, 22)
+        self.assertEqual(res.skipped_duplicates, 1)
+        self.assertEqual(res.skipped_conflicts, 1)
+        self.assertEqual(res.created, 20)
+        self.assertEqual(Slot.objects.filter(edition=self.dst).count(), 21)
+        self.assertTrue(
+            Slot.objects.filter(edition=self.dst, status=SlotStatus.TENTATIVE, notes__startswith="[copied from 2033]").exists()
+        )
+        hook.assert_called_once()
+        self.assertEqual(hook.call_args[0][0], "schedule.template.copied")
+
+    def test_dry_run_writes_nothing(self):
+        self._slot(self.src, self.src.start_date, time(20, 0), time(21, 0), self.artists[0])
+        res = services.copy_template(from_edition_id=self.src.id, to_edition_id=self.dst.id, dry_run=True)
+        self.assertEqual(res.created, 1)
+        self.assertFalse(Slot.objects.filter(edition=self.dst).exists())
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from guardian.shortcuts import assign_perm
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import events, services
+from apps.schedule.models import Slot, SlotStatus
+
+User = get_user_model()
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("schedule-slots-bulk-status")
+        self.user = User.objects.create_user(username="mgr", password="pwd")
+        self.ed = FestivalEdition.objects.create(
+            name="Bulk", year=2041, start_date=date(2041, 7, 1), end_date=date(2041, 7, 2)
+        )
+        self.stage = Stage.objects.create(edition=self.ed, name="Main")
+        artist = Artist.objects.create(name="B")
+        self.slots = [
+            Slot.objects.create(
+                edition=self.ed, stage=self.stage, artist=artist, day=self.ed.start_date,
+                start_time=time(10 + i, 0), end_time=time(10 + i, 45),
+            )
+            for i in range(10)
+        ]
+        self.ids = [s.id for s in self.slots]
+
+    def test_confirm_all_single_update_and_webhook(self):
+        for s in self.slots:
+            assign_perm("schedule.manage_slot", self.user, s)
+        self.client.force_authenticate(self.user)
+        with patch.object(services, "dispatch_webhook") as hook:
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(self.url, {"ids": self.ids, "status": "confirmed"}, format="json")
+        self.assertEqual(res.status_code, 200, res.content)
+        self.assertEqual(res.json()["updated"], 10)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Slot.objects.filter(status=SlotStatus.CONFIRMED).count(), 10)
+        hook.assert_called_once()
+        self.assertEqual(hook.call_args[0][1]["count"], 10)
+
+    def test_all_or_nothing_on_missing_permission(self):
+        for s in self.slots[:-1]:
+            assign_perm("schedule.manage_slot", self.user, s)
+        self.client.force_authenticate(self.user)
+        res = self.client.post(self.url, {"ids": self.ids, "status": "canceled"}, format="json")
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(res.json()["missing"], [self.slots[-1].id])
+        self.assertFalse(Slot.objects.filter(status=SlotStatus.CANCELED).exists())
+
+    def test_reviving_canceled_slot_checks_conflicts(self):
+        staff = User.objects.create_user(username="staff", password="pwd", is_staff=True)
+        self.client.force_authenticate(staff)
+        canceled = self.slots[0]
+        Slot.objects.filter(pk=canceled.pk).update(status=SlotStatus.CANCELED)
+        Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=canceled.artist, day=self.ed.start_date,
+            start_time=time(10, 15), end_time=time(10, 30),
+        )
+        res = self.client.post(self.url, {"ids": [canceled.id], "status": "confirmed"}, format="json")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(len(res.json()["conflicts"]), 1)
+
+    def test_bulk_change_reaches_event_subscribers(self):
+        events.get_broker.cache_clear()
+        self.addCleanup(events.get_broker.cache_clear)
+        broker = events.get_broker()
+        cursor = broker.last_id()
+        staff = User.objects.create_user(username="staff", password="pwd", is_staff=True)
+        self.client.force_authenticate(staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(self.url, {"ids": self.ids[:3], "status": "canceled"}, format="json")
+        self.assertEqual(res.status_code, 200, res.content)
+        evs, reset = broker.read(cursor)
+        self.assertFalse(reset)
+        self.assertEqual([e.event for e in evs], ["schedule.slot.canceled"] * 3)
+        self.assertEqual([e.data["slot"]["id"] for e in evs], self.ids[:3])
+        self.assertEqual({e.data["slot"]["status"] for e in evs}, {SlotStatus.CANCELED})
+
+    def test_validation(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post(self.url, {"ids": self.ids, "status": "x"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(self.url, {"ids": [], "status": "confirmed"}, format="json").status_code, 400)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import index as slot_index
+from apps.schedule import services
+from apps.schedule.models import Slot
+
+
+class ChangeoverTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        slot_index.clear()
+        self.ed = FestivalEdition.objects.create(
+            name="Changeover", year=2043, start_date=date(2043, 7, 1), end_date=date(2043, 7, 2)
+        )
+        self.stage = Stage.objects.create(edition=self.ed, name="Main", changeover_minutes=30)
+        self.artist = Artist.objects.create(name="C")
+        self.day = self.ed.start_date
+        self.slot = Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=self.artist, day=self.day,
+            start_time=time(18, 0), end_time=time(19, 0),
+        )
+
+    def _conflicts(self, start, end, **kw):
+        return services.find_conflicts(
+            edition_id=self.ed.id, stage_id=self.stage.id, day=self.day, start_time=start, end_time=end, **kw
+        )
+
+    def test_stage_buffer_and_slot_override(self):
+        self.assertEqual(len(self._conflicts(time(19, 15), time(20, 0))), 1)  # dans le changeover
+        self.assertEqual(self._conflicts(time(19, 30), time(20, 0)), [])
+        # le candidat avant le slot existant doit aussi laisser son changeover
+        self.assertEqual(len(self._conflicts(time(17, 0), time(17, 45))), 1)
+        self.assertEqual(self._conflicts(time(17, 0), time(17, 45), changeover_minutes=0), [])
+
+        self.slot.changeover_minutes = 10
+        self.slot.save()
+        self.assertEqual(self._conflicts(time(19, 15), time(20, 0)), [])
+
+    def test_stage_change_invalidates_index(self):
+        self.assertEqual(self._conflicts(time(19, 30), time(20, 0)), [])
+        self.stage.changeover_minutes = 45
+        self.stage.save()
+        self.assertEqual(len(self._conflicts(time(19, 30), time(20, 0))), 1)
+
+    def test_batch_validate_and_copy(self):
+        later = Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=self.artist, day=self.day,
+            start_time=time(19, 20), end_time=time(20, 0),
+        )
+        sql = services.validate_edition(self.ed.id, mode="sql")
+        self.assertEqual(sql, services.validate_edition(self.ed.id, mode="python"))
+        self.assertEqual(sql[0]["overlaps_with"], [later.id])
+
+        batch = services.find_conflicts_batch([{
+            "edition": self.ed.id, "stage": self.stage.id, "day": self.day,
+            "start_time": time(20, 10), "end_time": time(21, 0),
+        }])
+        self.assertEqual([c.slot_id for c in batch], [later.id])
+
+        dst = FestivalEdition.objects.create(
+            name="Changeover dst", year=2044, start_date=date(2044, 7, 1), end_date=date(2044, 7, 2)
+        )
+        res = services.copy_template(
+            from_edition_id=self.ed.id, to_edition_id=dst.id, stage_map={}, dry_run=True,
+        )
+        self.assertEqual((res.created, res.skipped_conflicts), (1, 1))
+
+    def test_create_returns_409_within_buffer(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser("root", "r@x.io", "pwd"))
+        payload = {
+            "edition": self.ed.id, "stage": self.stage.id, "artist": self.artist.id,
+            "day": str(self.day), "start_time": "19:10", "end_time": "20:00",
+        }
+        self.assertEqual(client.post("/api/v1/schedule/slots/", payload, format="json").status_code, 409)
+        payload["start_time"] = "19:30"
+        self.assertEqual(client.post("/api/v1/schedule/slots/", payload, format="json").status_code, 201)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import index as slot_index
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import find_conflicts
+
+
+class IntervalIndexTests(SimpleTestCase):
+    def test_overlapping_matches_bruteforce(self):
+        rnd = random.Random(42)
+        entries = []
+        for i in range(300):
+            start = rnd.randrange(0, 80000)
+            end = start + rnd.randrange(60, 7200)
+            entries.append(slot_index.IndexedSlot(start, end, i, time(0), time(0), f"a{i}"))
+        idx = slot_index.IntervalIndex(entries)
+        for _ in range(200):
+            qs = rnd.randrange(0, 80000)
+            qe = qs + rnd.randrange(60, 7200)
+            expected = {e.slot_id for e in entries if qs < e.end and qe > e.start}
+            got = {e.slot_id for e in idx.overlapping(qs, qe)}
+            self.assertEqual(got, expected)
+
+
+class ConflictIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        slot_index.clear()
+        self.ed = FestivalEdition.objects.create(
+            name="Idx", year=2031, start_date=date(2031, 7, 1), end_date=date(2031, 7, 3)
+        )
+        self.stage = Stage.objects.create(edition=self.ed, name="Main")
+        self.artist = Artist.objects.create(name="Alpha")
+        self.day = self.ed.start_date
+        self.slot = Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=self.artist,
+            day=self.day, start_time=time(20, 0), end_time=time(21, 0),
+        )
+
+    def _conflicts(self, start, end, **kw):
+        return find_conflicts(
+            edition_id=self.ed.id, stage_id=self.stage.id, day=self.day,
+            start_time=start, end_time=end, **kw
+        )
+
+    def test_cached_lookup_hits_no_database(self):
+        self.assertEqual(len(self._conflicts(time(20, 30), time(21, 30))), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual([c.slot_id for c in self._conflicts(time(20, 59), time(22, 0))], [self.slot.id])
+            self.assertEqual(self._conflicts(time(21, 0), time(22, 0)), [])
+            self.assertEqual(self._conflicts(time(20, 0), time(21, 0), exclude_id=self.slot.id), [])
+
+    def test_signals_invalidate_index(self):
+        self.assertEqual(len(self._conflicts(time(22, 0), time(23, 0))), 0)
+        other = Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=self.artist,
+            day=self.day, start_time=time(22, 0), end_time=time(23, 0),
+        )
+        self.assertEqual([c.slot_id for c in self._conflicts(time(22, 30), time(23, 30))], [other.id])
+
+        other.status = SlotStatus.CANCELED
+        other.save()
+        self.assertEqual(self._conflicts(time(22, 30), time(23, 30)), [])
+
+        self.slot.delete()
+        self.assertEqual(self._conflicts(time(20, 0), time(21, 0)), [])
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+
+
+class ConflictsBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.ed = FestivalEdition.objects.create(
+            name="Batch", year=2032, start_date=date(2032, 7, 1), end_date=date(2032, 7, 3)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        artist = Artist.objects.create(name="Alpha")
+        self.day = str(self.ed.start_date)
+        self.existing = Slot.objects.create(
+            edition=self.ed, stage=self.main, artist=artist,
+            day=self.ed.start_date, start_time=time(20, 0), end_time=time(21, 0),
+        )
+        Slot.objects.create(
+            edition=self.ed, stage=self.main, artist=artist, status=SlotStatus.CANCELED,
+            day=self.ed.start_date, start_time=time(22, 0), end_time=time(23, 0),
+        )
+        self.url = reverse("schedule-slots-conflicts-batch")
+
+    def _cand(self, stage, start, end, **extra):
+        return {"edition": self.ed.id, "stage": stage.id, "day": self.day,
+                "start_time": start, "end_time": end, **extra}
+
+    def test_batch_reports_existing_and_intra_batch_conflicts(self):
+        payload = {"slots": [
+            self._cand(self.main, "20:30", "21:30"),  # vs slot existant
+            self._cand(self.main, "22:00", "23:00"),  # slot annulé ignoré
+            self._cand(self.club, "18:00", "19:30"),
+            self._cand(self.club, "19:00", "20:00"),  # vs candidat 2
+            self._cand(self.club, "20:00", "21:00"),  # frontière ouverte: OK
+        ]}
+        with self.assertNumQueries(1):
+            res = self.client.post(self.url, payload, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["checked"], 5)
+        conflicts = res.data["conflicts"]
+        self.assertEqual(len(conflicts), 2)
+        self.assertEqual(conflicts[0]["candidate"], 0)
+        self.assertEqual(conflicts[0]["slot_id"], self.existing.id)
+        self.assertEqual(conflicts[1]["candidate"], 2)
+        self.assertEqual(conflicts[1]["other_candidate"], 3)
+
+    def test_candidate_replacing_existing_slot(self):
+        payload = [self._cand(self.main, "20:30", "21:30", id=self.existing.id)]
+        res = self.client.post(self.url, payload, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["conflicts"], [])
+
+    def test_invalid_candidate(self):
+        res = self.client.post(self.url, {"slots": [self._cand(self.main, "21:00", "21:00")]}, format="json")
+        self.assertEqual(res.status_code, 400)
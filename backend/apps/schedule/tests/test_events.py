@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import events
+from apps.schedule.models import Slot, SlotStatus
+
+
+class BrokerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _check(self, broker):
+        self.assertEqual(broker.read(0), ([], False))
+        for i in range(3):
+            broker.publish("schedule.slot.updated", {"slot": {"id": i}})
+        evs, reset = broker.read(1)
+        self.assertFalse(reset)
+        self.assertEqual([e.id for e in evs], [2, 3])
+        self.assertEqual(evs[0].data, {"slot": {"id": 1}})
+        self.assertEqual(broker.read(3), ([], False))
+        # curseur hors historique (backlog=3) ou inconnu (redémarrage) -> reset
+        broker.publish("schedule.slot.updated", {"slot": {"id": 3}})
+        self.assertEqual(broker.read(0), ([], True))
+        self.assertEqual(broker.read(99), ([], True))
+        self.assertEqual(broker.last_id(), 4)
+
+    def test_local_broker(self):
+        self._check(events.LocalBroker(backlog=3))
+
+    def test_cache_broker(self):
+        self._check(events.CacheBroker(backlog=3))
+
+    def test_cache_broker_expired_events_reset(self):
+        broker = events.CacheBroker()
+        for i in range(3):
+            broker.publish("schedule.slot.updated", {"slot": {"id": i}})
+        cache.delete(broker.EVENT_KEY.format(id=1))
+        self.assertEqual(broker.read(0), ([], True))
+        self.assertEqual([e.id for e in broker.read(1)[0]], [2, 3])
+
+    def test_local_wait_wakes_on_publish_from_thread(self):
+        broker = events.LocalBroker()
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, lambda: loop.run_in_executor(None, broker.publish, "x", {}))
+            return await broker.wait(0, timeout=5)
+
+        evs, reset = asyncio.run(scenario())
+        self.assertEqual(([e.id for e in evs], reset), ([1], False))
+
+
+@override_settings(SCHEDULE_EVENTS_HEARTBEAT=0.05)
+class EventStreamTests(SimpleTestCase):
+    def setUp(self):
+        events.get_broker.cache_clear()
+        self.broker = events.get_broker()
+        self.url = reverse("schedule-events")
+
+    def tearDown(self):
+        events.get_broker.cache_clear()
+
+    async def _chunks(self, n, **kwargs):
+        resp = await self.async_client.get(self.url, **kwargs)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        it = resp.streaming_content.__aiter__()
+        try:
+            return [await asyncio.wait_for(it.__anext__(), 2) for _ in range(n)]
+        finally:
+            await it.aclose()
+
+    async def test_replay_from_last_event_id_filtered_by_edition(self):
+        self.broker.publish("schedule.slot.created", {"slot": {"id": 1, "edition": 1}})
+        self.broker.publish("schedule.slot.created", {"slot": {"id": 2, "edition": 2}})
+        self.broker.publish("schedule.slot.canceled", {"slot": {"id": 3, "edition": 1}})
+        chunks = await self._chunks(3, data={"edition": 1}, headers={"Last-Event-ID": "0"})
+        self.assertEqual(chunks[0], b"retry: 3000\n\n")
+        self.assertTrue(chunks[1].startswith(b"id: 1\nevent: schedule.slot.created\ndata: "))
+        self.assertTrue(chunks[2].startswith(b"id: 3\nevent: schedule.slot.canceled\n"))
+
+    async def test_live_heartbeat_and_reset(self):
+        chunks = await self._chunks(2)
+        self.assertEqual(chunks[1], b": ping\n\n")
+        chunks = await self._chunks(2, headers={"Last-Event-ID": "42"})
+        self.assertTrue(chunks[1].startswith(b"id: 0\nevent: schedule.reset\n"))
+
+    async def test_bad_params(self):
+        resp = await self.async_client.get(self.url, {"edition": "x"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_wsgi_refused(self):
+        self.assertEqual(self.client.get(self.url).status_code, 501)
+
+
+class SignalPublishTests(TestCase):
+    def setUp(self):
+        events.get_broker.cache_clear()
+        self.broker = events.get_broker()
+        ed = FestivalEdition.objects.create(
+            name="Events", year=2044, start_date=date(2044, 7, 1), end_date=date(2044, 7, 1)
+        )
+        stage = Stage.objects.create(edition=ed, name="Main")
+        self.slot_kwargs = dict(
+            edition=ed, stage=stage, artist=Artist.objects.create(name="A"), day=ed.start_date,
+            start_time=time(20, 0), end_time=time(21, 0),
+        )
+
+    def tearDown(self):
+        events.get_broker.cache_clear()
+
+    def test_publishes_webhook_payloads_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            slot = Slot.objects.create(**self.slot_kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.notes = "sans changement de statut"
+            slot.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.status = SlotStatus.CANCELED
+            slot.save()
+
+        evs, _ = self.broker.read(0)
+        self.assertEqual([e.event for e in evs], ["schedule.slot.created", "schedule.slot.canceled"])
+        self.assertEqual(evs[1].data["slot"]["id"], slot.id)
+        self.assertEqual(evs[1].data["slot"]["status"], SlotStatus.CANCELED)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+
+
+class GridTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("schedule-grid")
+        self.ed = FestivalEdition.objects.create(
+            name="Grid", year=2040, start_date=date(2040, 7, 1), end_date=date(2040, 7, 2)
+        )
+        main = Stage.objects.create(edition=self.ed, name="Main")
+        club = Stage.objects.create(edition=self.ed, name="Club")
+        a = Artist.objects.create(name="Alpha")
+        b = Artist.objects.create(name="Beta")
+        d1, d2 = self.ed.start_date, self.ed.end_date
+        self.s1 = Slot.objects.create(edition=self.ed, stage=main, artist=a, day=d1,
+                                      start_time=time(20, 0), end_time=time(21, 30), is_headliner=True)
+        Slot.objects.create(edition=self.ed, stage=club, artist=a, day=d1,
+                            start_time=time(18, 0), end_time=time(19, 0), status=SlotStatus.CONFIRMED)
+        Slot.objects.create(edition=self.ed, stage=main, artist=b, day=d2,
+                            start_time=time(19, 0), end_time=time(20, 0))
+
+    def test_columnar_payload(self):
+        res = self.client.get(self.url, {"edition": self.ed.id})
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data["days"], ["2040-07-01", "2040-07-02"])
+        self.assertEqual(data["stages"]["name"], ["Club", "Main"])
+        self.assertEqual(data["artists"]["name"], ["Alpha", "Beta"])
+        cols = data["slots"]
+        self.assertEqual(len({len(v) for v in cols.values()}), 1)
+        i = cols["id"].index(self.s1.id)
+        self.assertEqual((cols["start"][i], cols["end"][i]), (1200, 1290))
+        self.assertEqual(data["stages"]["name"][cols["stage"][i]], "Main")
+        self.assertEqual(data["statuses"][cols["status"][i]], SlotStatus.TENTATIVE)
+        self.assertEqual(cols["headliner"][i], 1)
+
+    def test_cached_etag_and_invalidation(self):
+        etag = self.client.get(self.url, {"edition": self.ed.id})["ETag"]
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, {"edition": self.ed.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        self.s1.start_time = time(19, 45)
+        self.s1.save()
+        res = self.client.get(self.url, {"edition": self.ed.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(1185, res.json()["slots"]["start"])
+
+    def test_edition_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_artist_rename_invalidates(self):
+        self.client.get(self.url, {"edition": self.ed.id})
+        self.s1.artist.name = "Alpha Prime"
+        self.s1.artist.save()
+        data = self.client.get(self.url, {"edition": self.ed.id}).json()
+        self.assertIn("Alpha Prime", data["artists"]["name"])
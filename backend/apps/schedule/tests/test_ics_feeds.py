@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import ics
+from apps.schedule.models import Slot
+
+
+class StoredIcsFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse("schedule-ics")
+        self.ed = FestivalEdition.objects.create(
+            name="Feeds", year=2036, start_date=date(2036, 7, 1), end_date=date(2036, 7, 2)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        self.artist = Artist.objects.create(name="Alpha")
+        self.s1 = Slot.objects.create(
+            edition=self.ed, stage=self.main, artist=self.artist,
+            day=self.ed.start_date, start_time=time(18, 0), end_time=time(19, 0),
+        )
+        self.s2 = Slot.objects.create(
+            edition=self.ed, stage=self.club, artist=self.artist,
+            day=self.ed.start_date, start_time=time(20, 0), end_time=time(21, 0),
+        )
+
+    def test_etag_and_not_modified(self):
+        res = self.client.get(self.url, {"edition": self.ed.id})
+        self.assertEqual(res.status_code, 200)
+        etag = res["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual(res.content.count(b"BEGIN:VEVENT"), 2)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url, {"edition": self.ed.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_stage_feed(self):
+        res = self.client.get(self.url, {"edition": self.ed.id, "stage": self.club.id})
+        self.assertEqual(res.content.count(b"BEGIN:VEVENT"), 1)
+        self.assertIn(f"UID:slot-{self.s2.id}@festival".encode(), res.content)
+
+    def test_slot_save_rerenders_only_its_fragment(self):
+        etag = self.client.get(self.url, {"edition": self.ed.id})["ETag"]
+        before = cache.get(ics.feed_key(self.ed.id))
+        untouched = before.fragments[self.s2.id]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.s1.start_time = time(17, 0)
+            self.s1.save()
+
+        after = cache.get(ics.feed_key(self.ed.id))
+        self.assertIsNotNone(after)  # mis à jour en place, pas supprimé
+        self.assertEqual(after.fragments[self.s2.id], untouched)
+        self.assertIn("T170000", after.fragments[self.s1.id][1])
+        res = self.client.get(self.url, {"edition": self.ed.id}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.s2.delete()
+        res = self.client.get(self.url, {"edition": self.ed.id})
+        self.assertEqual(res.content.count(b"BEGIN:VEVENT"), 1)
+
+    def test_rolled_back_edit_never_reaches_stored_feed(self):
+        self.client.get(self.url, {"edition": self.ed.id})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.s1.start_time = time(9, 0)
+                    self.s1.save()
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        feed = ics.get_feed(self.ed.id)
+        self.assertNotIn("T090000", feed.body.decode())
+        self.assertIn("T180000", feed.fragments[self.s1.id][1])
+
+    def test_stage_rename_drops_feed(self):
+        self.client.get(self.url, {"edition": self.ed.id})
+        self.main.name = "Grande scène"
+        self.main.save()
+        res = self.client.get(self.url, {"edition": self.ed.id})
+        self.assertIn("Grande scène".encode(), res.content)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from icalendar import Calendar
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.ics import fold_line
+from apps.schedule.models import Slot
+
+
+class FoldLineTests(SimpleTestCase):
+    def test_fold_respects_octet_limit_and_multibyte(self):
+        folded = fold_line("DESCRIPTION:" + "é" * 100)
+        for part in folded.split("\r\n"):
+            self.assertLessEqual(len(part.encode("utf-8")), 75)
+        self.assertEqual(folded.replace("\r\n ", ""), "DESCRIPTION:" + "é" * 100 + "\r\n")
+
+
+class IcsStreamingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.ed = FestivalEdition.objects.create(
+            name="Ics", year=2035, start_date=date(2035, 7, 1), end_date=date(2035, 7, 2)
+        )
+        stage = Stage.objects.create(edition=self.ed, name="Main, Stage")
+        for i, name in enumerate(["Alpha; Beta", "Gamma"]):
+            Slot.objects.create(
+                edition=self.ed, stage=stage, artist=Artist.objects.create(name=name),
+                day=self.ed.start_date, start_time=time(18 + i, 0), end_time=time(19 + i, 0),
+                is_headliner=bool(i), notes="ligne 1\nligne 2 " + "x" * 120,
+            )
+
+    @staticmethod
+    def _events(content: bytes):
+        cal = Calendar.from_ical(content)
+        return sorted(
+            (str(e["uid"]), str(e["summary"]), e.decoded("dtstart"), e.decoded("dtend"),
+             str(e["location"]), str(e.get("description", "")))
+            for e in cal.walk("VEVENT")
+        )
+
+    def test_streaming_matches_icalendar_path(self):
+        url = reverse("schedule-ics")
+        legacy = self.client.get(url, {"edition": self.ed.id, "day": str(self.ed.start_date)})
+        streamed = self.client.get(url, {"edition": self.ed.id, "stream": "1"})
+        self.assertFalse(legacy.streaming)
+        self.assertTrue(streamed.streaming)
+        body = b"".join(streamed.streaming_content)
+        self.assertEqual(self._events(body), self._events(legacy.content))
+        self.assertIn(b"CATEGORIES:Headliner", body)
+
+    def test_unfiltered_export_streams(self):
+        res = self.client.get(reverse("schedule-ics"))
+        self.assertTrue(res.streaming)
+        body = b"".join(res.streaming_content)
+        self.assertTrue(body.startswith(b"BEGIN:VCALENDAR\r\n"))
+        self.assertEqual(body.count(b"BEGIN:VEVENT"), 2)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import localtime
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import importer
+from apps.schedule.models import Slot, SlotStatus
+
+CSV = """stage,artist,day,start_time,end_time,is_headliner
+Main,Alpha,2047-07-01,20:00,21:00,yes
+main,beta,2047-07-01,21:30,22:30,
+Club,Gamma,2047-07-01,23:30,00:30,
+Main,Alpha,2047-07-01,20:30,21:15,
+Main,Nobody,2047-07-01,18:00,19:00,
+Ghost,Alpha,2047-07-01,18:00,19:00,
+Club,Gamma,2047-07-05,18:00,19:00,
+Club,Gamma,2047-07-02,19:00,19:00,
+Club,Gamma,2047-07-02,00:00,01:00,
+Main,Beta,2047-07-02,16:00,17:00,
+"""
+
+
+class SlotImportTests(TestCase):
+    def setUp(self):
+        self.ed = FestivalEdition.objects.create(
+            name="Import", year=2047, start_date=date(2047, 7, 1), end_date=date(2047, 7, 2)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        for name in ("Alpha", "Beta", "Gamma"):
+            Artist.objects.create(name=name)
+        self.existing = Slot.objects.create(
+            edition=self.ed, stage=self.main, artist=Artist.objects.get(name="Beta"),
+            day=date(2047, 7, 2), start_time=time(16, 30), end_time=time(17, 30),
+        )
+
+    def _rows(self, text=CSV):
+        return importer.read_rows(io.BytesIO(text.encode("utf-8")), "csv")
+
+    def test_constant_queries_and_row_report(self):
+        # éditions, scènes, artistes, conflits, SAVEPOINT + INSERT + RELEASE, invalidation (2)
+        with self.assertNumQueries(9):
+            res = importer.import_slots(self._rows(), edition_id=self.ed.id)
+        self.assertEqual((res.total, res.valid, res.created), (10, 3, 3))
+        errors = {(e.row, e.field) for e in res.errors}
+        self.assertEqual(errors, {
+            (4, "start_time"),  # chevauche la ligne 1
+            (5, "artist"), (6, "stage"), (7, "day"), (8, "end_time"),
+            (9, "start_time"),  # débordement de minuit de la ligne 3
+            (10, "start_time"),  # slot existant
+        })
+        gamma = Slot.objects.get(artist__name="Gamma")
+        self.assertEqual(localtime(gamma.ends_at).date(), date(2047, 7, 2))
+        self.assertTrue(Slot.objects.get(artist__name="Alpha").is_headliner)
+        self.assertEqual(Slot.objects.filter(status=SlotStatus.TENTATIVE).count(), 4)
+
+    def test_dry_run_and_strict_write_nothing(self):
+        res = importer.import_slots(self._rows(), edition_id=self.ed.id, dry_run=True)
+        self.assertEqual((res.valid, res.created), (3, 0))
+        res = importer.import_slots(self._rows(), edition_id=self.ed.id, strict=True)
+        self.assertEqual(res.created, 0)
+        self.assertEqual(Slot.objects.count(), 1)
+
+    def test_json_with_edition_column(self):
+        payload = json.dumps([{"edition": self.ed.id, "stage": self.club.id, "artist": "alpha",
+                               "day": "2047-07-02", "start_time": "20:00", "end_time": "21:00",
+                               "status": "confirmed"}])
+        res = importer.import_slots(importer.read_rows(io.BytesIO(payload.encode()), "json"))
+        self.assertEqual(res.created, 1, res.errors)
+        self.assertTrue(Slot.objects.filter(stage=self.club, status=SlotStatus.CONFIRMED).exists())
+
+    def test_upload_endpoint(self):
+        url = reverse("schedule-slots-import-file")
+        upload = SimpleUploadedFile("slots.csv", CSV.encode("utf-8"), content_type="text/csv")
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("fan", password="x"))
+        self.assertEqual(client.post(url, {"file": upload, "edition": self.ed.id}).status_code, 403)
+
+        client.force_authenticate(get_user_model().objects.create_user("ops", password="x", is_staff=True))
+        upload.seek(0)
+        res = client.post(url, {"file": upload, "edition": self.ed.id})
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["created"], 3)
+        self.assertEqual(len(res.data["errors"]), 7)
+
+        bad = SimpleUploadedFile("slots.xlsx", b"x")
+        self.assertEqual(client.post(url, {"file": bad, "edition": self.ed.id}).status_code, 400)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as fh:
+            fh.write(CSV)
+        out, err = io.StringIO(), io.StringIO()
+        call_command("schedule_import", fh.name, edition=self.ed.id, dry_run=True, stdout=out, stderr=err)
+        self.assertIn("[dry-run] Imported 0/10 slots (valid=3, errors=7)", out.getvalue())
+        self.assertIn("row 5 [artist]", err.getvalue())
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import services
+from apps.schedule.models import Slot
+
+
+class CanonicalDigestTests(SimpleTestCase):
+    def test_order_independent(self):
+        a = QueryDict("day=2030-07-01&edition=1&status=confirmed")
+        b = QueryDict("status=confirmed&edition=1&day=2030-07-01")
+        self.assertEqual(services.canonical_query_digest(a), services.canonical_query_digest(b))
+        c = QueryDict("day=2030-07-01&edition=2&status=confirmed")
+        self.assertNotEqual(services.canonical_query_digest(a), services.canonical_query_digest(c))
+
+    def test_multi_values(self):
+        a = QueryDict("stage=1&stage=2")
+        b = QueryDict("stage=2&stage=1")
+        self.assertEqual(services.canonical_query_digest(a), services.canonical_query_digest(b))
+        self.assertNotEqual(services.canonical_query_digest(a), services.canonical_query_digest(QueryDict("stage=1")))
+
+
+class VersionedKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ed = FestivalEdition.objects.create(
+            name="Keys", year=2037, start_date=date(2037, 7, 1), end_date=date(2037, 7, 2)
+        )
+        self.stage = Stage.objects.create(edition=self.ed, name="Main")
+
+    def test_slot_save_changes_edition_and_global_keys(self):
+        params = QueryDict(f"edition={self.ed.id}&day=2037-07-01")
+        k_ed = services.versioned_cache_key("schedule:list", params, edition=str(self.ed.id))
+        k_all = services.versioned_cache_key("schedule:list", QueryDict("day=2037-07-01"))
+        self.assertEqual(k_ed, services.versioned_cache_key("schedule:list", params, edition=str(self.ed.id)))
+
+        Slot.objects.create(
+            edition=self.ed, stage=self.stage, artist=Artist.objects.create(name="K"),
+            day=self.ed.start_date, start_time=time(18, 0), end_time=time(19, 0),
+        )
+        self.assertNotEqual(k_ed, services.versioned_cache_key("schedule:list", params, edition=str(self.ed.id)))
+        self.assertNotEqual(k_all, services.versioned_cache_key("schedule:list", QueryDict("day=2037-07-01")))
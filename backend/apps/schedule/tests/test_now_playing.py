@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import timetable
+from apps.schedule.models import Slot, SlotStatus
+
+
+class NowPlayingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        timetable.clear()
+        self.url = reverse("schedule-now")
+        self.ed = FestivalEdition.objects.create(
+            name="Now", year=2039, start_date=date(2039, 7, 1), end_date=date(2039, 7, 2), is_active=True
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        self.a = Artist.objects.create(name="Alpha")
+        self.b = Artist.objects.create(name="Beta")
+        day = self.ed.start_date
+        self.s1 = Slot.objects.create(edition=self.ed, stage=self.main, artist=self.a, day=day,
+                                      start_time=time(18, 0), end_time=time(19, 0))
+        self.s2 = Slot.objects.create(edition=self.ed, stage=self.main, artist=self.b, day=day,
+                                      start_time=time(19, 30), end_time=time(20, 30))
+        Slot.objects.create(edition=self.ed, stage=self.club, artist=self.b, day=day,
+                            start_time=time(18, 20), end_time=time(19, 0), status=SlotStatus.CANCELED)
+
+    def _get(self, at, **params):
+        return self.client.get(self.url, {"at": at, **params})
+
+    def test_now_next_and_cache_control(self):
+        self._get("2039-07-01T18:10:00")  # construit la grille
+        with self.assertNumQueries(0):
+            res = self._get("2039-07-01T18:10:00")
+        self.assertEqual(res.status_code, 200)
+        data = res.json()
+        self.assertEqual(data["edition"], self.ed.id)
+        main = next(s for s in data["stages"] if s["stage_id"] == self.main.id)
+        self.assertEqual(main["now"]["slot_id"], self.s1.id)
+        self.assertEqual(main["next"]["slot_id"], self.s2.id)
+        # la scène Club n'a qu'un slot annulé : absente de la grille
+        self.assertEqual(len(data["stages"]), 1)
+        self.assertIn("max-age=60", res["Cache-Control"])
+
+        res = self._get("2039-07-01T18:59:30")
+        self.assertIn("max-age=30", res["Cache-Control"])
+
+        main = self._get("2039-07-01T19:10:00").json()["stages"][0]
+        self.assertIsNone(main["now"])
+        self.assertEqual(main["next"]["start"], "19:30:00")
+
+    def test_after_midnight_spill(self):
+        late = Slot.objects.create(edition=self.ed, stage=self.main, artist=self.a, day=self.ed.start_date,
+                                   start_time=time(23, 30), end_time=time(1, 30))
+        res = self._get("2039-07-02T00:30:00")
+        main = res.json()["stages"][0]
+        self.assertEqual(main["now"]["slot_id"], late.id)
+        self.assertEqual((main["now"]["start"], main["now"]["end"]), ("23:30:00", "01:30:00"))
+        self.assertIn("max-age=60", res["Cache-Control"])
+        # frontière = fin du slot (01:30) sur la base du jour de la requête
+        res = self._get("2039-07-02T01:29:40")
+        self.assertIn("max-age=20", res["Cache-Control"])
+        self.assertIsNone(self._get("2039-07-02T01:30:00").json()["stages"][0]["now"])
+        # avant minuit, l'heure de fin est rendue modulo 24 h
+        main = self._get("2039-07-01T23:45:00").json()["stages"][0]
+        self.assertEqual(main["now"]["end"], "01:30:00")
+
+    def test_spill_boundary_keeps_earliest_change_across_stages(self):
+        # Club (premier dans l'ordre d'affichage) change à 00:10, Main finit son débordement à 02:00
+        Slot.objects.create(edition=self.ed, stage=self.main, artist=self.a, day=self.ed.start_date,
+                            start_time=time(23, 0), end_time=time(2, 0))
+        Slot.objects.create(edition=self.ed, stage=self.club, artist=self.b, day=self.ed.end_date,
+                            start_time=time(0, 0), end_time=time(0, 10))
+        grid = timetable.build(self.ed.id)
+        self.assertEqual(grid.now_next(self.ed.end_date, 300)["next_boundary"], 600)
+        self.assertEqual(grid.now_next(self.ed.end_date, 900)["next_boundary"], 7200)
+
+    def test_slot_change_rebuilds(self):
+        self._get("2039-07-01T18:10:00")
+        self.s1.end_time = time(18, 5)
+        self.s1.save()
+        main = self._get("2039-07-01T18:10:00").json()["stages"][0]
+        self.assertIsNone(main["now"])
+
+    def test_errors(self):
+        self.assertEqual(self._get("nope").status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"edition": "x"}).status_code, 400)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import snapshots
+from apps.schedule.models import ScheduleSnapshot, Slot, SlotStatus
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.ed = FestivalEdition.objects.create(
+            name="Snap", year=2046, start_date=date(2046, 7, 1), end_date=date(2046, 7, 2)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        self.slots = [
+            Slot.objects.create(
+                edition=self.ed, stage=self.main, artist=Artist.objects.create(name=f"Artist {i}"),
+                day=self.ed.start_date, start_time=time(18 + i, 0), end_time=time(18 + i, 45),
+            )
+            for i in range(4)
+        ]
+
+    def test_capture_single_query(self):
+        with self.assertNumQueries(1):
+            data = snapshots.capture(self.ed.id)
+        self.assertEqual(data["id"], sorted(s.id for s in self.slots))
+        self.assertEqual(data["day0"], "2046-07-01")
+        self.assertEqual(data["start"][0], 18 * 3600)
+
+    def test_diff_categories(self):
+        old = snapshots.capture(self.ed.id)
+        a, b, c, d = self.slots
+        a.stage = self.club
+        a.save()
+        b.start_time, b.end_time = time(23, 30), time(0, 30)
+        b.save()
+        c.status = SlotStatus.CANCELED
+        c.save()
+        d_id = d.id
+        d.delete()
+        e = Slot.objects.create(
+            edition=self.ed, stage=self.club, artist=a.artist,
+            day=date(2046, 7, 2), start_time=time(20, 0), end_time=time(21, 0),
+        )
+        result = snapshots.diff(old, snapshots.capture(self.ed.id))
+
+        self.assertEqual(result["summary"], {"added": 1, "cancelled": 2, "moved": 1, "retimed": 1, "replaced": 0})
+        self.assertEqual(result["moved"][0]["slot_id"], a.id)
+        self.assertEqual(result["retimed"][0]["to"]["end"], "00:30:00")
+        self.assertEqual(result["added"][0]["slot_id"], e.id)
+        self.assertEqual(result["added"][0]["day"], "2046-07-02")
+        cancelled = {x["slot_id"]: x["deleted"] for x in result["cancelled"]}
+        self.assertEqual(cancelled, {c.id: False, d_id: True})
+
+        # artiste remplacé sur un slot inchangé
+        replacement = Artist.objects.create(name="Remplaçant")
+        old_artist = b.artist_id
+        b.artist = replacement
+        b.save()
+        result = snapshots.diff(old, snapshots.capture(self.ed.id))
+        self.assertEqual(result["summary"]["replaced"], 1)
+        self.assertEqual(
+            {k: result["replaced"][0][k] for k in ("slot_id", "from_artist", "artist")},
+            {"slot_id": b.id, "from_artist": old_artist, "artist": replacement.id},
+        )
+
+        # réactivation = ajout
+        c.status = SlotStatus.CONFIRMED
+        c.save()
+        again = snapshots.diff(old, snapshots.capture(self.ed.id))
+        self.assertNotIn(c.id, [x["slot_id"] for x in again["cancelled"]])
+
+    def test_api_create_publish_and_diff_against_live(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("ops", password="x", is_staff=True))
+        url = reverse("schedule-snapshots-list")
+
+        res = client.post(url, {"edition": self.ed.id, "label": "v1"}, format="json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["slot_count"], 4)
+        self.assertIsNone(res.data["published_at"])
+        snap_id = res.data["id"]
+
+        # aucun publié : diff depuis un planning vide
+        diff_url = reverse("schedule-snapshots-diff")
+        res = client.get(diff_url, {"edition": self.ed.id})
+        self.assertIsNone(res.data["from"])
+        self.assertEqual(res.data["summary"]["added"], 4)
+
+        res = client.post(reverse("schedule-snapshots-publish", args=[snap_id]))
+        self.assertIsNotNone(res.data["published_at"])
+
+        self.slots[0].start_time, self.slots[0].end_time = time(17, 0), time(17, 45)
+        self.slots[0].save()
+        res = client.get(diff_url, {"edition": self.ed.id})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual((res.data["from"], res.data["to"]), (snap_id, "live"))
+        self.assertEqual(res.data["summary"], {"added": 0, "cancelled": 0, "moved": 0, "retimed": 1, "replaced": 0})
+
+        self.assertEqual(client.get(diff_url).status_code, 400)
+        self.assertEqual(client.get(diff_url, {"from": 999999}).status_code, 404)
+        self.assertEqual(ScheduleSnapshot.objects.count(), 1)
+
+    def test_requires_admin(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user("fan", password="x"))
+        res = client.post(reverse("schedule-snapshots-list"), {"edition": self.ed.id}, format="json")
+        self.assertEqual(res.status_code, 403)
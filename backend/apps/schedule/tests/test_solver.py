@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist, ArtistAvailability
+from apps.schedule import solver
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import validate_edition
+
+
+class SolverTests(TestCase):
+    def setUp(self):
+        self.ed = FestivalEdition.objects.create(
+            name="Solver", year=2045, start_date=date(2045, 7, 1), end_date=date(2045, 7, 3)
+        )
+        self.days = [self.ed.start_date + timedelta(days=i) for i in range(3)]
+        self.main = Stage.objects.create(edition=self.ed, name="Main", capacity=20000, changeover_minutes=20)
+        self.stages = [self.main] + [
+            Stage.objects.create(edition=self.ed, name=f"Stage {i}", capacity=1000, changeover_minutes=10)
+            for i in range(3)
+        ]
+        self.artists = []
+        for i in range(150):
+            a = Artist.objects.create(name=f"Artist {i:03d}", popularity=i % 100)
+            self.artists.append(a)
+            # un tiers des artistes n'est disponible qu'un jour
+            days = self.days if i % 3 else [self.days[i % 2]]
+            for d in days:
+                ArtistAvailability.objects.create(artist=a, date=d, available=True)
+
+    # 150 artistes, 4 scènes, 3 jours : sets de 40 min, fenêtre 12:00-23:45
+    OPTIONS = {"window": (time(12, 0), time(23, 45)), "set_minutes": 40, "step_minutes": 5}
+
+    def test_solve_places_everyone_without_conflict(self):
+        headliners = [a.id for a in self.artists[-3:]]
+        problem = solver.build_problem(self.ed.id, headliner_ids=headliners, **self.OPTIONS)
+        result = solver.solve(problem, budget_seconds=5)
+        self.assertEqual(result.unplaced, [])
+        self.assertEqual(len(result.placements), 150)
+
+        with patch.object(solver, "dispatch_webhook") as hook:
+            solver.apply_solution(problem, result)
+        hook.assert_called_once()
+        self.assertEqual(Slot.objects.filter(edition=self.ed, status=SlotStatus.TENTATIVE).count(), 150)
+        self.assertEqual(validate_edition(self.ed.id, mode="python"), [])
+
+        heads = Slot.objects.filter(edition=self.ed, is_headliner=True)
+        self.assertEqual(heads.count(), 3)
+        for slot in heads:
+            self.assertEqual(slot.stage_id, self.main.id)
+            self.assertEqual(slot.end_time, time(23, 45))
+
+    def test_availability_and_report(self):
+        lonely = Artist.objects.create(name="Blocked")
+        ArtistAvailability.objects.create(artist=lonely, date=self.days[0], available=False)
+        ArtistAvailability.objects.create(artist=lonely, date=self.days[1], available=False)
+        ArtistAvailability.objects.create(artist=lonely, date=self.days[2], available=False)
+        problem = solver.build_problem(
+            self.ed.id, artist_ids=[lonely.id, self.artists[0].id], stage_ids=[self.main.id],
+        )
+        result = solver.solve(problem, budget_seconds=1)
+        self.assertEqual(result.unplaced, [{"artist_id": lonely.id, "artist": "Blocked", "reason": "no available day"}])
+        self.assertEqual(result.placements[0].day, self.days[0])
+
+    def test_repair_ejects_to_fit_constrained_artist(self):
+        # un set par jour ; jour 1 déjà pris. La graine place F (moins populaire)
+        # le jour 2, C n'a plus de place : la réparation déplace F au jour 3.
+        d1, d2, d3 = self.days
+        f = Artist.objects.create(name="F", popularity=1)
+        c = Artist.objects.create(name="C", popularity=90)
+        for artist, days in ((f, (d2, d3)), (c, (d1, d2))):
+            for d in days:
+                ArtistAvailability.objects.create(artist=artist, date=d, available=True)
+        Slot.objects.create(edition=self.ed, stage=self.main, artist=self.artists[0], day=d1,
+                            start_time=time(14, 0), end_time=time(15, 0))
+        problem = solver.build_problem(
+            self.ed.id, artist_ids=[f.id, c.id], stage_ids=[self.main.id],
+            window=(time(14, 0), time(15, 0)), set_minutes=60,
+        )
+        result = solver.solve(problem, budget_seconds=2)
+        placed = {p.artist_id: p.day for p in result.placements}
+        self.assertEqual(result.unplaced, [])
+        self.assertGreater(result.iterations, 0)
+        self.assertEqual(placed, {c.id: d2, f.id: d3})
+
+    def test_command_dry_run(self):
+        out = StringIO()
+        call_command(
+            "schedule_solve", "--edition", str(self.ed.id), "--dry-run", "--budget", "2",
+            "--window", "12:00-23:45", "--set-minutes", "40", "--step", "5", stdout=out,
+        )
+        self.assertIn("[dry-run] placed=150 created=0", out.getvalue())
+        self.assertFalse(Slot.objects.filter(edition=self.ed).exists())
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import io
+from datetime import date, datetime, time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule import importer
+from apps.schedule import index as slot_index
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import find_conflicts, find_conflicts_batch, validate_edition
+
+
+def local(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class TimeWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        slot_index.clear()
+        self.ed = FestivalEdition.objects.create(
+            name="Nights", year=2046, start_date=date(2046, 7, 6), end_date=date(2046, 7, 7)
+        )
+        self.fri, self.sat = self.ed.start_date, self.ed.end_date
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user("staff", is_staff=True))
+        self.url = reverse("schedule-slots-list")
+
+    def _slot(self, stage, day, start, end, **kw):
+        return Slot.objects.create(
+            edition=self.ed, stage=stage, artist=Artist.objects.create(name=f"A{Slot.objects.count()}"),
+            day=day, start_time=start, end_time=end, **kw
+        )
+
+    def test_window_synced_on_save(self):
+        slot = self._slot(self.main, self.fri, time(23, 30), time(1, 0))
+        self.assertEqual((slot.starts_at, slot.ends_at), (local(2046, 7, 6, 23, 30), local(2046, 7, 7, 1, 0)))
+        self.assertEqual(slot.duration_minutes, 90)
+        slot.end_time = time(23, 45)
+        slot.save(update_fields=["end_time"])
+        slot.refresh_from_db()
+        self.assertEqual(slot.ends_at, local(2046, 7, 6, 23, 45))
+
+    def test_from_to_filter_crosses_midnight(self):
+        crossing = self._slot(self.main, self.fri, time(23, 30), time(1, 0), status=SlotStatus.CONFIRMED)
+        after = self._slot(self.club, self.sat, time(1, 30), time(2, 30), status=SlotStatus.CONFIRMED)
+        self._slot(self.club, self.sat, time(0, 30), time(1, 15))  # tentative
+        self._slot(self.main, self.fri, time(20, 0), time(21, 0), status=SlotStatus.CONFIRMED)
+        self._slot(self.main, self.sat, time(20, 0), time(21, 0), status=SlotStatus.CONFIRMED)
+
+        resp = self.client.get(self.url, {
+            "edition": self.ed.id, "status": SlotStatus.CONFIRMED,
+            "from": "2046-07-06T22:00:00", "to": "2046-07-07T02:00:00",
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([s["id"] for s in resp.data["results"]], [crossing.id, after.id])
+
+        for params in ({"from": "demain"}, {"from": "2046-07-07T02:00", "to": "2046-07-06T22:00"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_range_query_uses_index(self):
+        qs = Slot.objects.filter(
+            edition=self.ed, status=SlotStatus.CONFIRMED,
+            starts_at__lt=local(2046, 7, 7, 2, 0), starts_at__gte=local(2046, 7, 5, 22, 0),
+        )
+        self.assertIn("schedule_slot_ed_status_start", qs.explain())
+
+    def test_duration_capped_by_max_hours(self):
+        artist = Artist.objects.create(name="Typo")
+        # 21:00 -> 20:00 : 23 h, fin saisie à l'envers plutôt qu'un passage de minuit
+        slot = Slot(edition=self.ed, stage=self.main, artist=artist, day=self.fri,
+                    start_time=time(21, 0), end_time=time(20, 0))
+        with self.assertRaises(ValidationError):
+            slot.clean()
+        body = {"edition": self.ed.id, "stage": self.main.id, "artist": artist.id, "day": str(self.fri)}
+        resp = self.client.post(self.url, {**body, "start_time": "21:00", "end_time": "20:00"}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("end_time", resp.json())
+        resp = self.client.post(self.url, {**body, "start_time": "22:00", "end_time": "04:00"}, format="json")
+        self.assertEqual(resp.status_code, 201, resp.content)
+        csv = "stage,artist,day,start_time,end_time\nMain,Typo,2046-07-07,21:00,20:00\n"
+        res = importer.import_slots(importer.read_rows(io.BytesIO(csv.encode()), "csv"), edition_id=self.ed.id)
+        self.assertEqual([(e.row, e.field) for e in res.errors], [(1, "end_time")])
+
+    def test_conflicts_across_midnight(self):
+        crossing = self._slot(self.main, self.fri, time(23, 30), time(1, 0))
+        late = self._slot(self.main, self.sat, time(0, 30), time(1, 30))  # même nuit, jour suivant
+        self._slot(self.club, self.sat, time(0, 0), time(1, 0))  # autre scène
+
+        def hits(day, start, end):
+            return {c.slot_id for c in find_conflicts(
+                edition_id=self.ed.id, stage_id=self.main.id, day=day, start_time=start, end_time=end,
+            )}
+
+        self.assertEqual(hits(self.fri, time(23, 45), time(0, 15)), {crossing.id})
+        self.assertEqual(hits(self.sat, time(0, 15), time(0, 45)), {crossing.id, late.id})
+        self.assertEqual(hits(self.fri, time(22, 0), time(23, 30)), set())
+
+        batch = find_conflicts_batch([{
+            "edition": self.ed.id, "stage": self.main.id, "day": self.fri,
+            "start_time": time(22, 0), "end_time": time(0, 45),
+        }])
+        self.assertEqual([c.slot_id for c in batch], [crossing.id, late.id])
+        for mode in ("python", "sql"):
+            rows = validate_edition(self.ed.id, mode=mode)
+            self.assertEqual([(r["slot_id"], r["overlaps_with"]) for r in rows], [(crossing.id, [late.id])], mode)
+
+    def test_changeover_spills_past_midnight(self):
+        self.main.changeover_minutes = 30
+        self.main.save()
+        first = self._slot(self.main, self.fri, time(23, 0), time(23, 50))
+        second = self._slot(self.main, self.sat, time(0, 10), time(1, 0))
+        for mode in ("python", "sql"):
+            rows = validate_edition(self.ed.id, mode=mode)
+            self.assertEqual([(r["slot_id"], r["overlaps_with"]) for r in rows], [(first.id, [second.id])], mode)
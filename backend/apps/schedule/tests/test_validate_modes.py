@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition, Stage
+from apps.lineup.models import Artist
+from apps.schedule.models import Slot, SlotStatus
+from apps.schedule.services import validate_edition
+
+
+class ValidateModesTests(TestCase):
+    def setUp(self):
+        self.ed = FestivalEdition.objects.create(
+            name="Validate", year=2038, start_date=date(2038, 7, 1), end_date=date(2038, 7, 2)
+        )
+        self.main = Stage.objects.create(edition=self.ed, name="Main")
+        self.club = Stage.objects.create(edition=self.ed, name="Club")
+        a = Artist.objects.create(name="V")
+        d1, d2 = self.ed.start_date, self.ed.end_date
+        spec = [
+            (self.main, d1, time(18, 0), time(20, 0)),
+            (self.main, d1, time(19, 0), time(19, 30)),
+            (self.main, d1, time(19, 15), time(21, 0)),
+            (self.main, d1, time(21, 0), time(22, 0)),  # adjacent : pas de conflit
+            (self.main, d1, time(18, 0), time(18, 30)),  # même début
+            (self.club, d1, time(19, 0), time(20, 0)),  # autre scène
+            (self.main, d2, time(19, 0), time(20, 0)),
+            (self.main, d2, time(19, 30), time(20, 30), SlotStatus.CANCELED),
+        ]
+        for stage, day, st, et, *status in spec:
+            Slot.objects.create(
+                edition=self.ed, stage=stage, artist=a, day=day, start_time=st, end_time=et,
+                status=status[0] if status else SlotStatus.TENTATIVE,
+            )
+
+    def test_sql_and_python_agree(self):
+        sql = validate_edition(self.ed.id, mode="sql")
+        py = validate_edition(self.ed.id, mode="python")
+        self.assertEqual(sql, py)
+        pairs = sum(len(c["overlaps_with"]) for c in sql)
+        self.assertEqual(pairs, 5)
+        self.assertEqual(sql[0]["range"], ["18:00:00", "20:00:00"])
+
+    def test_endpoint_mode_param(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser("root", "r@x.io", "pwd"))
+        url = "/api/v1/schedule/slots/validate/"
+        res_sql = client.get(url, {"edition": self.ed.id, "mode": "sql"})
+        res_py = client.get(url, {"edition": self.ed.id, "mode": "python"})
+        self.assertEqual(res_sql.status_code, 200)
+        self.assertEqual(res_sql.json(), res_py.json())
+        self.assertEqual(client.get(url, {"edition": self.ed.id, "mode": "nope"}).status_code, 400)
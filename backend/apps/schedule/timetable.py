@@ -0,0 +1,134 @@
+# apps/schedule/timetable.py
+"""
+Grille horaire en mémoire (process-local) pour « en ce moment / ensuite ».
+
+Une `Timetable` par édition : pour chaque (jour, scène), tableaux parallèles
+triés par heure de début (secondes depuis minuit) interrogés par `bisect`.
+Un slot qui passe minuit reste rangé sous son jour de début (`end` > 86400) :
+après minuit, il est cherché dans le jour précédent à `seconds + 86400`.
+Construite paresseusement (une requête), puis invalidée par les signaux Slot
+(via `services.invalidate_schedule`) et par la version de planning de l'édition.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from .index import end_seconds, time_to_seconds
+
+
+DAY = 24 * 3600
+
+
+def _hms(seconds: int) -> str:
+    seconds %= DAY  # fin après minuit : heure du lendemain
+    return f"{seconds // 3600:02d}:{(seconds // 60) % 60:02d}:{seconds % 60:02d}"
+
+
+@dataclass
+class StageDay:
+    starts: List[int] = field(default_factory=list)
+    ends: List[int] = field(default_factory=list)
+    slot_ids: List[int] = field(default_factory=list)
+    artists: List[str] = field(default_factory=list)
+    headliners: List[bool] = field(default_factory=list)
+
+    def entry(self, i: int) -> Dict:
+        return {
+            "slot_id": self.slot_ids[i],
+            "artist": self.artists[i],
+            "start": _hms(self.starts[i]),
+            "end": _hms(self.ends[i]),
+            "is_headliner": self.headliners[i],
+        }
+
+
+@dataclass
+class Timetable:
+    edition_id: int
+    version: int
+    stages: Dict[int, str]  # stage_id -> nom (ordre d'affichage)
+    days: Dict[date, Dict[int, StageDay]]
+
+    def now_next(self, day: date, seconds: int) -> Dict:
+        """
+        Slot en cours et suivant par scène à `seconds` (depuis minuit) le jour `day`,
+        plus le prochain instant où la réponse change (`next_boundary`, secondes ou None).
+        """
+        per_stage = self.days.get(day, {})
+        previous = self.days.get(day - timedelta(days=1), {})
+        boundary: Optional[int] = None
+        stages = []
+        for stage_id, name in self.stages.items():
+            sd = per_stage.get(stage_id)
+            now = nxt = None
+            spill = previous.get(stage_id)
+            if spill is not None and spill.ends and spill.ends[-1] > seconds + DAY:
+                # slot de la veille encore en cours (pas de chevauchement : le dernier suffit)
+                now = spill.entry(len(spill.ends) - 1)
+                ends = spill.ends[-1] - DAY
+                boundary = ends if boundary is None else min(boundary, ends)
+            if sd is not None:
+                i = bisect_right(sd.starts, seconds)
+                if i > 0 and sd.ends[i - 1] > seconds:
+                    now = sd.entry(i - 1)
+                    boundary = sd.ends[i - 1] if boundary is None else min(boundary, sd.ends[i - 1])
+                if i < len(sd.starts):
+                    nxt = sd.entry(i)
+                    boundary = sd.starts[i] if boundary is None else min(boundary, sd.starts[i])
+            stages.append({"stage_id": stage_id, "stage": name, "now": now, "next": nxt})
+        return {"stages": stages, "next_boundary": boundary}
+
+
+def build(edition_id: int, version: int = 0) -> Timetable:
+    from .models import Slot, SlotStatus
+
+    rows = (
+        Slot.objects.filter(edition_id=edition_id)
+        .exclude(status=SlotStatus.CANCELED)
+        .order_by("stage__name", "stage_id", "day", "start_time", "id")
+        .values_list("day", "stage_id", "stage__name", "start_time", "end_time", "id", "artist__name", "is_headliner")
+    )
+    stages: Dict[int, str] = {}
+    days: Dict[date, Dict[int, StageDay]] = {}
+    for day, stage_id, stage_name, st, et, pk, artist, headliner in rows:
+        stages.setdefault(stage_id, stage_name)
+        sd = days.setdefault(day, {}).setdefault(stage_id, StageDay())
+        sd.starts.append(time_to_seconds(st))
+        sd.ends.append(end_seconds(st, et))
+        sd.slot_ids.append(pk)
+        sd.artists.append(artist)
+        sd.headliners.append(headliner)
+    return Timetable(edition_id=edition_id, version=version, stages=stages, days=days)
+
+
+# ---------------------------------------------------------------------------
+# Cache process-local
+# ---------------------------------------------------------------------------
+
+_LOCK = threading.Lock()
+_TIMETABLES: Dict[int, Timetable] = {}
+
+
+def get_timetable(edition_id: int, *, version: int = 0) -> Timetable:
+    with _LOCK:
+        tt = _TIMETABLES.get(edition_id)
+    if tt is not None and tt.version == version:
+        return tt
+    tt = build(edition_id, version)
+    with _LOCK:
+        _TIMETABLES[edition_id] = tt
+    return tt
+
+
+def invalidate(edition_id: int) -> None:
+    with _LOCK:
+        _TIMETABLES.pop(edition_id, None)
+
+
+def clear() -> None:
+    with _LOCK:
+        _TIMETABLES.clear()
@@ -1,12 +1,29 @@
 # backend/apps/schedule/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SlotViewSet, ics_export
+from .views import (
+    ScheduleSnapshotViewSet,
+    SlotViewSet,
+    agenda_ics,
+    ics_export,
+    my_agenda,
+    my_agenda_token,
+    now_playing,
+    slot_events,
+    timetable_grid,
+)
 
 router = DefaultRouter()
 router.register(r'slots', SlotViewSet, basename="schedule-slots")
+router.register(r'snapshots', ScheduleSnapshotViewSet, basename="schedule-snapshots")
 
 urlpatterns = [
     path('', include(router.urls)),
     path('ics/', ics_export, name='schedule-ics'),
+    path('now/', now_playing, name='schedule-now'),
+    path('grid/', timetable_grid, name='schedule-grid'),
+    path('events/', slot_events, name='schedule-events'),
+    path('agenda/', my_agenda, name='schedule-agenda'),
+    path('agenda/token/', my_agenda_token, name='schedule-agenda-token'),
+    path('agenda/<str:token>.ics', agenda_ics, name='schedule-agenda-ics'),
 ]
@@ -1,26 +1,48 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import timedelta
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
 from django.core.cache import cache
-from django.http import HttpResponse
-from django.utils.dateparse import parse_date, parse_time
-from django.utils.timezone import now
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime, parse_time
+from django.utils.timezone import is_naive, localtime, make_aware, now
 from icalendar import Calendar, Event
-from rest_framework import filters, status, viewsets
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.decorators import action, api_view
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .metrics import CONFLICTS_TOTAL
-from .models import Slot, SlotStatus
-from .serializers import SlotSerializer
-from .services import copy_template, find_conflicts
+from . import agenda
+from . import events
+from . import grid
+from . import importer
+from . import snapshots
+from . import ics
+from . import timetable
+from .analysis import analyse_edition
+from .ics import VEVENT_FIELDS, stream_calendar
+from .metrics import CACHE_REQUESTS_TOTAL, CONFLICTS_TOTAL
+from .models import ScheduleSnapshot, Slot, SlotStatus, max_slot_hours, slot_window
+from .serializers import ScheduleSnapshotSerializer, SlotCandidateSerializer, SlotSerializer
+from .services import (
+    active_edition_id,
+    bulk_set_status,
+    copy_template,
+    current_schedule_version,
+    find_artist_conflicts,
+    find_conflicts,
+    find_conflicts_batch,
+    validate_edition,
+    versioned_cache_key,
+)
+from apps.authx.models import UserProfile
 from apps.common.rbac import ObjectPermissionsMixin, AssignCreatorObjectPermsMixin
-from collections import defaultdict
 
 
 # ---------------------------------------------------------------------------
@@ -36,20 +58,62 @@ class SlotViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewset
     ordering_fields = ["day", "start_time", "created_at"]
     ordering = ["day", "stage__name", "start_time"]
 
+    def filter_queryset(self, queryset):
+        """
+        `?from=&to=` (ISO 8601, heure locale du festival si naïf) : slots qui
+        chevauchent la fenêtre, y compris ceux passant minuit. La borne basse
+        `starts_at >= from - SCHEDULE_SLOT_MAX_HOURS` garde un parcours d'index
+        borné sur (edition, status, starts_at).
+        """
+        queryset = super().filter_queryset(queryset)
+        raw_from = self.request.query_params.get("from")
+        raw_to = self.request.query_params.get("to")
+        if not raw_from and not raw_to:
+            return queryset
+        bounds = []
+        for name, raw in (("from", raw_from), ("to", raw_to)):
+            value = parse_datetime(raw) if raw else None
+            if raw and value is None:
+                raise ValidationError({name: "must be an ISO 8601 datetime"})
+            bounds.append(make_aware(value) if value is not None and is_naive(value) else value)
+        start, end = bounds
+        if start and end and end <= start:
+            raise ValidationError({"to": "must be after from"})
+        if end:
+            queryset = queryset.filter(starts_at__lt=end)
+        if start:
+            max_span = timedelta(hours=max_slot_hours())  # durée imposée par la validation des slots
+            queryset = queryset.filter(ends_at__gt=start, starts_at__gte=start - max_span)
+        return queryset
+
     def list(self, request, *args, **kwargs):
         # cache appliquer lorsque ?day= est fourni
         day = request.query_params.get("day")
         ttl = int(getattr(settings, "SCHEDULE_LIST_DAY_CACHE_TTL", 120))
         if day:
-            key = f"schedule:list:{day}:{hash(frozenset(request.GET.items()))}"
+            key = versioned_cache_key(
+                "schedule:list", request.query_params,
+                edition=request.query_params.get("edition"), scope=self._cache_scope(),
+            )
             cached = cache.get(key)
             if cached is not None:
+                CACHE_REQUESTS_TOTAL.labels(cache="list", result="hit").inc()
                 return Response(cached)
+            CACHE_REQUESTS_TOTAL.labels(cache="list", result="miss").inc()
             resp = super().list(request, *args, **kwargs)
             cache.set(key, resp.data, ttl)
             return resp
         return super().list(request, *args, **kwargs)
 
+    def _cache_scope(self) -> str:
+        # la liste dépend des permissions objet de l'utilisateur (ObjectPermissionsMixin)
+        user = getattr(self.request, "user", None)
+        if not user or user.is_anonymous:
+            return "anon"
+        if user.is_staff or user.is_superuser:
+            return "staff"
+        return f"u{user.pk}"
+
     def perform_update(self, serializer):
         instance = self.get_object()
         new_status = serializer.validated_data.get("status")
@@ -67,6 +131,7 @@ class SlotViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewset
             start_time=data["start_time"],
             end_time=data["end_time"],
             exclude_id=exclude_id,
+            changeover_minutes=data.get("changeover_minutes"),
         )
         if conflicts:
             CONFLICTS_TOTAL.inc()
@@ -96,6 +161,7 @@ class SlotViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewset
             "day": ser.validated_data.get("day", instance.day),
             "start_time": ser.validated_data.get("start_time", instance.start_time),
             "end_time": ser.validated_data.get("end_time", instance.end_time),
+            "changeover_minutes": ser.validated_data.get("changeover_minutes", instance.changeover_minutes),
         }
         block = self._check_and_block_conflicts(payload, exclude_id=instance.id)
         if block:
@@ -111,47 +177,134 @@ class SlotViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewset
             day = parse_date(request.query_params.get("day"))
             start_time = parse_time(request.query_params.get("start_time"))
             end_time = parse_time(request.query_params.get("end_time"))
+            changeover = request.query_params.get("changeover_minutes")
+            changeover = int(changeover) if changeover not in (None, "") else None
+            exclude_id = request.query_params.get("exclude_id")
+            exclude_id = int(exclude_id) if exclude_id else None
         except Exception:
             return Response({"detail": "Missing or invalid parameters"}, status=400)
         conflicts = find_conflicts(
-            edition_id=edition, stage_id=stage, day=day, start_time=start_time, end_time=end_time
+            edition_id=edition, stage_id=stage, day=day, start_time=start_time, end_time=end_time,
+            exclude_id=exclude_id, changeover_minutes=changeover,
         )
         if conflicts:
             CONFLICTS_TOTAL.inc()
         return Response({"conflicts": [c.to_dict() for c in conflicts]})
 
+    @action(methods=["POST"], detail=False, url_path="conflicts/batch")
+    def conflicts_batch(self, request):
+        """
+        Body: {"slots": [{"edition": 1, "stage": 2, "day": "2025-07-18",
+                          "start_time": "20:00", "end_time": "21:00", "id": null}, ...]}
+        (une liste brute est aussi acceptée)
+        """
+        data = request.data
+        items = data.get("slots") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return Response({"detail": "slots must be a list"}, status=400)
+        ser = SlotCandidateSerializer(data=items, many=True)
+        ser.is_valid(raise_exception=True)
+        conflicts = find_conflicts_batch(ser.validated_data)
+        if conflicts:
+            CONFLICTS_TOTAL.inc()
+        return Response({"checked": len(items), "conflicts": [c.to_dict() for c in conflicts]})
+
+    @action(methods=["POST"], detail=False, url_path="bulk-status")
+    def bulk_status(self, request):
+        """
+        Body: {"ids": [1, 2, 3], "status": "confirmed"}
+        Tout-ou-rien : 403 si un slot est absent ou sans `manage_slot`,
+        409 si la réactivation d'un slot annulé crée un conflit.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        status_val = data.get("status")
+        if status_val not in dict(SlotStatus.choices):
+            return Response({"detail": "Invalid status"}, status=400)
+        ids = data.get("ids")
+        if not isinstance(ids, list) or not ids:
+            return Response({"detail": "ids must be a non-empty list"}, status=400)
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return Response({"detail": "ids must be integers"}, status=400)
+        max_ids = int(getattr(settings, "SCHEDULE_BULK_STATUS_MAX", 1000))
+        if len(ids) > max_ids:
+            return Response({"detail": f"At most {max_ids} ids per request"}, status=400)
+
+        res = bulk_set_status(user=request.user, ids=ids, status=status_val)
+        if res.missing:
+            return Response({"detail": "Missing manage_slot permission", **res.to_dict()}, status=403)
+        if res.conflicts:
+            CONFLICTS_TOTAL.inc()
+            return Response({"detail": "Slot conflict", **res.to_dict()}, status=409)
+        return Response(res.to_dict())
+
+    @action(methods=["GET"], detail=False, url_path="artist-conflicts")
+    def artist_conflicts(self, request):
+        """
+        Double réservations d'artistes et transitions impossibles entre scènes.
+        `?edition=` (requis), `&artist=`, `&speed_kmh=`, `&base_minutes=`.
+        """
+        try:
+            edition = int(request.query_params.get("edition"))
+            artist = request.query_params.get("artist")
+            artist = int(artist) if artist else None
+            speed = request.query_params.get("speed_kmh")
+            speed = float(speed) if speed else None
+            base = request.query_params.get("base_minutes")
+            base = int(base) if base else None
+        except (TypeError, ValueError):
+            return Response({"detail": "edition is required; artist/speed_kmh/base_minutes must be numeric"}, status=400)
+        if (speed is not None and speed <= 0) or (base is not None and base < 0):
+            return Response({"detail": "speed_kmh must be > 0 and base_minutes >= 0"}, status=400)
+        conflicts = find_artist_conflicts(edition, artist_id=artist, speed_kmh=speed, base_minutes=base)
+        if conflicts:
+            CONFLICTS_TOTAL.inc()
+        return Response({"edition": edition, "conflicts": [c.to_dict() for c in conflicts]})
+
+    @action(methods=["GET"], detail=False, url_path="analysis")
+    def analysis(self, request):
+        """
+        Clashs de têtes d'affiche + courbes d'affluence projetée par scène (minute par minute).
+        `?edition=` (requis), `&day=`, `&audience=` (défaut : somme des capacités).
+        Mis en cache sous la version de planning de l'édition.
+        """
+        try:
+            edition = int(request.query_params.get("edition"))
+            day = request.query_params.get("day")
+            day = parse_date(day) if day else None
+            audience = request.query_params.get("audience")
+            audience = int(audience) if audience else None
+        except (TypeError, ValueError):
+            return Response({"detail": "edition is required; day/audience must be valid"}, status=400)
+        if audience is not None and audience < 0:
+            return Response({"detail": "audience must be >= 0"}, status=400)
+
+        key = versioned_cache_key("schedule:analysis", request.query_params, edition=str(edition))
+        data = cache.get(key)
+        if data is not None:
+            CACHE_REQUESTS_TOTAL.labels(cache="analysis", result="hit").inc()
+            return Response(data)
+        CACHE_REQUESTS_TOTAL.labels(cache="analysis", result="miss").inc()
+        data = analyse_edition(edition, day=day, audience=audience)
+        cache.set(key, data, int(getattr(settings, "SCHEDULE_ANALYSIS_CACHE_TTL", 600)))
+        return Response(data)
+
     @action(methods=["GET"], detail=False, url_path="validate")
     def validate(self, request):
+        """
+        Tous les chevauchements d'une édition.
+        `?mode=sql|python` (défaut : sql sur PostgreSQL, python sinon).
+        """
         try:
             edition = int(request.query_params.get("edition"))
         except Exception:
             return Response({"detail": "edition is required"}, status=400)
-        qs = Slot.objects.select_related("stage").filter(edition_id=edition).order_by("day", "stage_id", "start_time")
-        groups = defaultdict(list)
-        for s in qs:
-            groups[(s.stage_id, s.day)].append(s)
-
-        results = []
-        for (stage_id, day), slots in groups.items():
-            # sorted by start_time already
-            n = len(slots)
-            for i in range(n):
-                s1 = slots[i]
-                overlaps = []
-                for j in range(i + 1, n):
-                    s2 = slots[j]
-                    if s2.start_time >= s1.end_time:
-                        break
-                    if s1.start_time < s2.end_time and s1.end_time > s2.start_time:
-                        overlaps.append(s2.id)
-                if overlaps:
-                    results.append({
-                        "slot_id": s1.id,
-                        "stage": s1.stage.name,
-                        "day": str(s1.day),
-                        "range": [str(s1.start_time), str(s1.end_time)],
-                        "overlaps_with": overlaps,
-                    })
+        mode = request.query_params.get("mode") or None
+        try:
+            results = validate_edition(edition, mode=mode)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
         return Response({"edition": edition, "conflicts": results})
 
     @action(methods=["POST"], detail=False, url_path="template/copy")
@@ -183,11 +336,120 @@ class SlotViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewset
         except Exception as exc:
             return Response({"detail": str(exc)}, status=400)
 
+    @action(methods=["POST"], detail=False, url_path="import", permission_classes=[IsAdminUser])
+    def import_file(self, request):
+        """
+        multipart: file=<slots.csv|.json|.jsonl>, edition=<id>, status, dry_run, strict
+        -> {"total", "valid", "created", "dry_run", "errors": [{"row", "field", "message"}]}
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "file is required"}, status=400)
+        data = request.data
+        status_val = data.get("status") or SlotStatus.TENTATIVE
+        if status_val not in dict(SlotStatus.choices):
+            return Response({"detail": "Invalid status"}, status=400)
+        try:
+            edition = int(data["edition"]) if data.get("edition") else None
+            fmt = data.get("format") or importer.detect_format(upload.name or "")
+            res = importer.import_slots(
+                importer.read_rows(upload, fmt),
+                edition_id=edition,
+                status=status_val,
+                dry_run=_truthy(data.get("dry_run")),
+                strict=_truthy(data.get("strict")),
+                max_rows=int(getattr(settings, "SCHEDULE_IMPORT_MAX_ROWS", 5000)),
+            )
+        except (TypeError, ValueError, UnicodeDecodeError) as exc:
+            return Response({"detail": str(exc)}, status=400)
+        return Response(res.to_dict(), status=201 if res.created else 200)
+
+
+# ---------------------------------------------------------------------------
+# Snapshots de planning + diff
+# ---------------------------------------------------------------------------
+
+class ScheduleSnapshotViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ScheduleSnapshot.objects.defer("data")
+    serializer_class = ScheduleSnapshotSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["edition"]
+    ordering = ["-created_at", "-id"]
+
+    def create(self, request, *args, **kwargs):
+        """Body: {"edition": 1, "label": "v3", "publish": false} -> capture en une requête."""
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            edition = int(data.get("edition"))
+        except (TypeError, ValueError):
+            return Response({"detail": "edition is required"}, status=400)
+        snap = snapshots.create_snapshot(
+            edition, label=str(data.get("label") or "")[:120], user=request.user,
+            publish=_truthy(data.get("publish")),
+        )
+        return Response(self.get_serializer(snap).data, status=201)
+
+    @action(methods=["POST"], detail=True, url_path="publish")
+    def publish(self, request, pk=None):
+        snap = snapshots.publish(self.get_object())
+        return Response(self.get_serializer(snap).data)
+
+    @action(methods=["GET"], detail=False, url_path="diff")
+    def diff(self, request):
+        """
+        `?from=<id>&to=<id>` ; `from` par défaut : dernier snapshot publié de
+        `?edition=` (vide s'il n'y en a pas) ; `to` par défaut : planning courant.
+        """
+        params = request.query_params
+        try:
+            old = ScheduleSnapshot.objects.get(pk=int(params["from"])) if params.get("from") else None
+            new = ScheduleSnapshot.objects.get(pk=int(params["to"])) if params.get("to") else None
+            edition = int(params.get("edition") or (old or new).edition_id)
+        except ScheduleSnapshot.DoesNotExist:
+            return Response({"detail": "Snapshot not found"}, status=404)
+        except (AttributeError, TypeError, ValueError):
+            return Response({"detail": "edition (or from/to snapshot ids) required"}, status=400)
+        if old is None:
+            old = snapshots.last_published(edition)
+        if any(s is not None and s.edition_id != edition for s in (old, new)):
+            return Response({"detail": "snapshots must belong to the same edition"}, status=400)
+
+        result = snapshots.diff(
+            old.data if old else {},
+            new.data if new else snapshots.capture(edition),
+        )
+        return Response({
+            "edition": edition,
+            "from": old.pk if old else None,
+            "to": new.pk if new else "live",
+            **result,
+        })
+
 
 # ---------------------------------------------------------------------------
-# ICS export (cache)
+# ICS export (cache / streaming)
 # ---------------------------------------------------------------------------
 
+def _truthy(value) -> bool:
+    return str(value or "").lower() in {"1", "true", "yes", "on"}
+
+
+def _etag_matches(request, etag: str) -> bool:
+    inm = request.META.get("HTTP_IF_NONE_MATCH")
+    return bool(inm) and (inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")])
+
+
+def _etag_response(request, etag: str, body: bytes, content_type: str):
+    """Corps précalculé avec ETag fort ; `304` si `If-None-Match` correspond."""
+    if _etag_matches(request, etag):
+        resp = HttpResponseNotModified()
+    else:
+        resp = HttpResponse(body, content_type=content_type)
+    resp["ETag"] = etag
+    return resp
+
+
 def ics_export(request):
     qs = Slot.objects.select_related("edition", "stage", "artist").all()
 
@@ -208,15 +470,25 @@ def ics_export(request):
     if status_param:
         qs = qs.filter(status=status_param)
 
-    # cache ICS uniquement pour filtres (sinon flux énorme)
+    # flux stocké par édition (/scène) : ETag fort + 304
+    feed_params = set(request.GET.keys()) <= {"edition", "stage"}
+    if feed_params and str(edition or "").isdigit() and str(stage or "0").isdigit():
+        feed = ics.get_feed(int(edition), int(stage) if stage else None)
+        return _etag_response(request, feed.etag, feed.body, "text/calendar")
+
+    # cache ICS uniquement pour filtres (sinon flux énorme -> streaming)
     cacheable = any([edition, day, artist, stage, status_param])
+    if not cacheable or _truthy(request.GET.get("stream")):
+        rows = qs.values(*VEVENT_FIELDS).iterator(chunk_size=2000)
+        return StreamingHttpResponse(stream_calendar(rows), content_type="text/calendar")
+
     cache_ttl = int(getattr(settings, "SCHEDULE_ICS_CACHE_TTL", 120))
-    cache_key = None
-    if cacheable:
-        cache_key = f"schedule:ics:{hash(frozenset(request.GET.items()))}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return HttpResponse(cached, content_type="text/calendar")
+    cache_key = versioned_cache_key("schedule:ics", request.GET, edition=edition)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        CACHE_REQUESTS_TOTAL.labels(cache="ics", result="hit").inc()
+        return HttpResponse(cached, content_type="text/calendar")
+    CACHE_REQUESTS_TOTAL.labels(cache="ics", result="miss").inc()
 
     tz = ZoneInfo("Europe/Paris")
     cal = Calendar()
@@ -227,14 +499,188 @@ def ics_export(request):
         ev = Event()
         ev.add("uid", f"slot-{s.id}@festival")
         ev.add("summary", f"{s.artist.name} @ {s.stage.name}")
-        ev.add("dtstart", datetime.combine(s.day, s.start_time, tz))
-        ev.add("dtend", datetime.combine(s.day, s.end_time, tz))
+        starts_at, ends_at = slot_window(s.day, s.start_time, s.end_time)
+        ev.add("dtstart", starts_at.astimezone(tz))
+        ev.add("dtend", ends_at.astimezone(tz))
         ev.add("location", s.stage.name)
         ev.add("categories", ["Headliner"] if s.is_headliner else [])
         ev.add("description", (s.notes or "")[:1024])
         cal.add_component(ev)
 
     data = cal.to_ical()
-    if cacheable:
-        cache.set(cache_key, data, cache_ttl)
+    cache.set(cache_key, data, cache_ttl)
     return HttpResponse(data, content_type="text/calendar")
+
+
+# ---------------------------------------------------------------------------
+# Agenda personnel + flux ICS à jeton
+# ---------------------------------------------------------------------------
+
+def _int_list(value):
+    if not isinstance(value, list):
+        raise ValueError
+    return [int(i) for i in value]
+
+
+def _agenda_body(request, profile, **extra):
+    token = agenda.token_for(profile)
+    return {
+        "slots": agenda.selected_slots(profile),
+        **extra,
+        "ics_url": request.build_absolute_uri(reverse("schedule-agenda-ics", args=[token])),
+    }
+
+
+@api_view(["GET", "PUT", "PATCH"])
+@permission_classes([IsAuthenticated])
+def my_agenda(request):
+    """
+    GET : sélection + URL d'abonnement ICS.
+    PUT `{"slots": [1, 2]}` : remplace ; PATCH `{"add": [3], "remove": [1]}`.
+    Les ids inconnus sont ignorés et renvoyés dans `unknown`.
+    """
+    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    if request.method == "GET":
+        return Response(_agenda_body(request, profile))
+
+    data = request.data if isinstance(request.data, dict) else {}
+    try:
+        if request.method == "PUT":
+            slots = _int_list(data.get("slots"))
+        else:
+            remove = set(_int_list(data.get("remove", [])))
+            slots = [i for i in agenda.selected_slots(profile) + _int_list(data.get("add", [])) if i not in remove]
+    except (TypeError, ValueError):
+        return Response({"detail": "slots/add/remove must be lists of integers"}, status=400)
+    try:
+        _, unknown = agenda.set_slots(profile, slots)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+    return Response(_agenda_body(request, profile, unknown=unknown))
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def my_agenda_token(request):
+    """Régénère le jeton : l'ancienne URL ICS cesse de fonctionner."""
+    profile, _ = UserProfile.objects.get_or_create(user=request.user)
+    agenda.token_for(profile, rotate=True)
+    return Response(_agenda_body(request, profile))
+
+
+def agenda_ics(request, token: str):
+    """
+    GET /schedule/agenda/<token>.ics
+    `304` (sans lecture des slots) tant que ni la sélection ni le planning n'ont changé.
+    """
+    profile = agenda.profile_for_token(token)
+    if profile is None:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    feed = agenda.agenda_feed(profile)
+    if _etag_matches(request, feed.etag):
+        CACHE_REQUESTS_TOTAL.labels(cache="agenda", result="hit").inc()
+        resp = HttpResponseNotModified()
+    else:
+        CACHE_REQUESTS_TOTAL.labels(cache="agenda", result="miss").inc()
+        resp = HttpResponse(feed.body(), content_type="text/calendar")
+    resp["ETag"] = feed.etag
+    patch_cache_control(resp, private=True, no_cache=True)
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# En ce moment / ensuite (grille mémoire, sans requête SQL)
+# ---------------------------------------------------------------------------
+
+def now_playing(request):
+    """
+    GET /schedule/now/?edition=&at=
+    Slot en cours et suivant par scène. `edition` par défaut : édition active ;
+    `at` (ISO 8601, défaut : maintenant, heure locale du festival).
+    `Cache-Control: max-age` expire à la prochaine frontière de slot.
+    """
+    edition = request.GET.get("edition")
+    if edition is not None and not str(edition).isdigit():
+        return JsonResponse({"detail": "edition must be an integer"}, status=400)
+    edition_id = int(edition) if edition else active_edition_id()
+    if not edition_id:
+        return JsonResponse({"detail": "no active edition"}, status=404)
+
+    at = request.GET.get("at")
+    moment = now()
+    if at:
+        moment = parse_datetime(at)
+        if moment is None:
+            return JsonResponse({"detail": "at must be an ISO 8601 datetime"}, status=400)
+        if is_naive(moment):
+            moment = make_aware(moment)
+    moment = localtime(moment)
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+
+    tt = timetable.get_timetable(edition_id, version=current_schedule_version(edition_id))
+    data = tt.now_next(moment.date(), seconds)
+    boundary = data.pop("next_boundary")
+
+    cap = int(getattr(settings, "SCHEDULE_NOW_MAX_AGE", 60))
+    until = boundary if boundary is not None else 24 * 3600
+    resp = JsonResponse({
+        "edition": edition_id,
+        "day": moment.date().isoformat(),
+        "at": moment.strftime("%H:%M:%S"),
+        **data,
+    })
+    patch_cache_control(resp, public=True, max_age=max(0, min(cap, until - seconds)))
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# Grille colonnaire (page lineup)
+# ---------------------------------------------------------------------------
+
+def timetable_grid(request):
+    """
+    GET /schedule/grid/?edition=
+    Grille complète d'une édition au format colonnaire (voir grid.py),
+    précalculée par version de planning ; ETag fort + `304`.
+    """
+    edition = request.GET.get("edition")
+    if not str(edition or "").isdigit():
+        return JsonResponse({"detail": "edition is required"}, status=400)
+    edition_id = int(edition)
+    stored = grid.get_grid(edition_id, current_schedule_version(edition_id))
+    return _etag_response(request, stored.etag, stored.body, "application/json")
+
+
+# ---------------------------------------------------------------------------
+# Flux SSE des changements de slots (ASGI)
+# ---------------------------------------------------------------------------
+
+async def slot_events(request):
+    """
+    GET /schedule/events/?edition=
+    Server-Sent Events `schedule.slot.created|updated|canceled` (payloads des
+    webhooks). Reprise via l'en-tête `Last-Event-ID` (ou `?last_event_id=`) ;
+    `schedule.reset` si l'historique ne couvre plus ce curseur.
+    Flux infini : nécessite le serveur ASGI (`festival_backend.asgi`).
+    """
+    if not hasattr(request, "scope"):
+        # WSGI consommerait le générateur async en entier avant de répondre
+        return JsonResponse({"detail": "event stream requires the ASGI server"}, status=501)
+
+    edition = request.GET.get("edition")
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    if (edition is not None and not edition.isdigit()) or (last_id and not last_id.isdigit()):
+        return JsonResponse({"detail": "edition and Last-Event-ID must be integers"}, status=400)
+
+    resp = StreamingHttpResponse(
+        events.stream(
+            events.get_broker(),
+            int(last_id) if last_id else None,
+            edition=int(edition) if edition else None,
+            heartbeat=float(getattr(settings, "SCHEDULE_EVENTS_HEARTBEAT", 15)),
+        ),
+        content_type="text/event-stream",
+    )
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # pas de buffering nginx
+    return resp
@@ -1,7 +1,21 @@
 from __future__ import annotations
 
 from django.contrib import admin
-from .models import TicketType
+from .models import ReservationHold, TicketChannelCounter, TicketQuotaShard, TicketType
+
+
+class TicketChannelCounterInline(admin.TabularInline):
+    model = TicketChannelCounter
+    extra = 0
+    can_delete = False
+    readonly_fields = ("channel", "quota", "reserved")  # quota : via quota_by_channel
+
+
+class TicketQuotaShardInline(admin.TabularInline):
+    model = TicketQuotaShard
+    extra = 0
+    can_delete = False
+    readonly_fields = ("index", "quota", "reserved")  # via shard_count / tickets_reconcile_shards
 
 
 @admin.register(TicketType)
@@ -15,8 +29,18 @@ class TicketTypeAdmin(admin.ModelAdmin):
     search_fields = ("code", "name", "description")
     ordering = ("edition", "code")
     readonly_fields = ("created_at", "updated_at")
+    inlines = (TicketChannelCounterInline, TicketQuotaShardInline)
 
     def is_on_sale_admin(self, obj: TicketType) -> bool:
         return obj.is_on_sale()
     is_on_sale_admin.boolean = True
     is_on_sale_admin.short_description = "On sale?"
+
+
+@admin.register(ReservationHold)
+class ReservationHoldAdmin(admin.ModelAdmin):
+    list_display = ("ticket_type", "quantity", "channel", "status", "expires_at", "confirmed_at", "released_at")
+    list_filter = ("status", "ticket_type__edition")
+    search_fields = ("token", "ticket_type__code")
+    readonly_fields = ("token", "created_at", "updated_at")
+    raw_id_fields = ("ticket_type",)
@@ -12,6 +12,9 @@ class TicketsConfig(AppConfig):
         from .models import TicketType
         from .signals import (
             cache_version_bump,
+            channel_counters_sync,
+            quota_shards_sync,
+            waiting_room_config_reset,
             remember_old_sale_state,
             emit_sale_window_webhooks_and_recompute_metrics,
         )
@@ -20,4 +23,10 @@ class TicketsConfig(AppConfig):
         post_save.connect(emit_sale_window_webhooks_and_recompute_metrics, sender=TicketType,
                           dispatch_uid="tickets_post_save_emit")
         post_save.connect(cache_version_bump, sender=TicketType, dispatch_uid="tickets_post_save_cache_bump")
+        post_save.connect(channel_counters_sync, sender=TicketType,
+                          dispatch_uid="tickets_post_save_channel_counters")
+        post_save.connect(quota_shards_sync, sender=TicketType, dispatch_uid="tickets_post_save_shards")
         post_delete.connect(cache_version_bump, sender=TicketType, dispatch_uid="tickets_post_delete_cache_bump")
+        post_save.connect(waiting_room_config_reset, sender=TicketType, dispatch_uid="tickets_post_save_waiting_room")
+        post_delete.connect(waiting_room_config_reset, sender=TicketType,
+                            dispatch_uid="tickets_post_delete_waiting_room")
@@ -0,0 +1,114 @@
+# apps/tickets/holds.py
+"""
+Réservations temporaires (panier) : confirmation, libération, expiration.
+
+Une `ReservationHold` décompte ses places dès sa création (cf.
+`reservations.reserve(hold_seconds=...)`). Chaque transition est un UPDATE
+conditionnel sur `status = 'held'` : une réservation ne peut être confirmée,
+libérée ou expirée qu'une seule fois, même en concurrence avec le balayage.
+
+`expire_due` traite les réservations échues par lots ensemblistes :
+- sélection via l'index partiel `(expires_at) WHERE status = 'held'`, lignes
+  verrouillées en `SKIP LOCKED` (plusieurs balayeurs possibles) ;
+- un UPDATE pour passer le lot en `expired` ;
+- places rendues agrégées par type et canal : une écriture par ligne chaude
+  et par lot, dans une transaction courte.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .metrics import HOLDS_RELEASED_TOTAL
+from .models import HoldStatus, ReservationHold
+from .reservations import release_seats
+from .services import bump_cache_version
+
+
+def _finish(hold: ReservationHold, status: str, now) -> bool:
+    """Transition `held` -> `status` (+ libération des places sauf confirmation)."""
+    fields = {"status": status, "updated_at": now}
+    qs = ReservationHold.objects.filter(pk=hold.pk, status=HoldStatus.HELD)
+    if status == HoldStatus.CONFIRMED:
+        qs = qs.filter(expires_at__gt=now)
+        fields["confirmed_at"] = now
+    else:
+        fields["released_at"] = now
+    with transaction.atomic():
+        if not qs.update(**fields):
+            return False
+        if status != HoldStatus.CONFIRMED:
+            release_seats(hold.ticket_type_id, hold.quantity,
+                          {hold.channel: hold.quantity} if hold.channel else None)
+    if status != HoldStatus.CONFIRMED:
+        HOLDS_RELEASED_TOTAL.labels(reason=status).inc(hold.quantity)
+        bump_cache_version()  # le type peut revenir en vente
+    return True
+
+
+def confirm(hold: ReservationHold) -> bool:
+    """Confirme une réservation non échue ; une réservation échue est expirée sur-le-champ."""
+    now = timezone.now()
+    if _finish(hold, HoldStatus.CONFIRMED, now):
+        return True
+    if hold.expires_at <= now:
+        _finish(hold, HoldStatus.EXPIRED, now)
+    return False
+
+
+def release(hold: ReservationHold) -> bool:
+    """Abandon du panier : rend les places immédiatement."""
+    return _finish(hold, HoldStatus.RELEASED, timezone.now())
+
+
+def expire_due(batch_size: int = 1000, now=None) -> int:
+    """Expire un lot de réservations échues ; retourne le nombre de réservations traitées."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            ReservationHold.objects.select_for_update(skip_locked=True)
+            .filter(status=HoldStatus.HELD, expires_at__lte=now)
+            .order_by("expires_at")
+            .values_list("id", "ticket_type_id", "channel", "quantity")[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [r[0] for r in rows]
+        updated = ReservationHold.objects.filter(pk__in=ids, status=HoldStatus.HELD).update(
+            status=HoldStatus.EXPIRED, released_at=now, updated_at=now,
+        )
+        if updated != len(rows):
+            # sans verrou de ligne (SQLite) : ne rendre que les lignes passées en `expired` ici
+            rows = list(
+                ReservationHold.objects.filter(pk__in=ids, status=HoldStatus.EXPIRED, released_at=now)
+                .values_list("id", "ticket_type_id", "channel", "quantity")
+            )
+        by_type: Dict[int, int] = defaultdict(int)
+        by_channel: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for _, tt_id, channel, quantity in rows:
+            by_type[tt_id] += quantity
+            if channel:
+                by_channel[tt_id][channel] += quantity
+        for tt_id in sorted(by_type):  # ordre fixe entre balayeurs
+            release_seats(tt_id, by_type[tt_id], dict(by_channel.get(tt_id, {})))
+    HOLDS_RELEASED_TOTAL.labels(reason=HoldStatus.EXPIRED).inc(sum(by_type.values()))
+    bump_cache_version()
+    return len(rows)
+
+
+def sweep(batch_size: int = 1000, max_batches: Optional[int] = None) -> Tuple[int, int]:
+    """Enchaîne les lots jusqu'à épuisement des réservations échues. (réservations, lots)."""
+    now = timezone.now()
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        done = expire_due(batch_size, now=now)
+        if not done:
+            break
+        total += done
+        batches += 1
+        if done < batch_size:
+            break
+    return total, batches
@@ -0,0 +1,131 @@
+# apps/tickets/idempotency.py
+"""
+En-tête `Idempotency-Key` pour les écritures rejouées par les clients
+(ex. `POST /reserve` après un timeout mobile).
+
+- la clé est portée par (scope, utilisateur) — IP du client pour un appelant
+  anonyme : une même clé envoyée par deux clients ou sur deux types de billet
+  ne se télescope pas ;
+- la réponse est mémorisée dans le cache (TTL) et en base (`IdempotencyRecord`,
+  repli si le cache est vidé ou partagé entre workers) ; un rejeu la renvoie
+  telle quelle (`Idempotent-Replayed: true`) sans rien réécrire ;
+- une requête identique encore en cours est refusée (409) via un verrou
+  `cache.add`, pour que deux rejeux simultanés ne réservent pas deux fois ;
+- une clé réutilisée avec un autre corps est refusée (422) ;
+- seules les réponses 2xx sont mémorisées : un refus (quota, salle d'attente,
+  verrou, limite de débit, erreur serveur) peut être retenté avec la même clé.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.common.ratelimit import client_ip
+from .models import IdempotencyRecord
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+MAX_KEY_LENGTH = 255
+LOCK_SECONDS = 30
+
+
+@dataclass
+class IdempotentRequest:
+    key: str  # empreinte (scope, utilisateur, clé client)
+    fingerprint: str  # empreinte du corps
+
+    @property
+    def cache_key(self) -> str:
+        return f"tickets:idem:{self.key}"
+
+    @property
+    def lock_key(self) -> str:
+        return f"tickets:idem:lock:{self.key}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "TICKETS_IDEMPOTENCY_TTL_SECONDS", 86400))
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def from_request(request, scope: str) -> Optional[IdempotentRequest]:
+    """None sans en-tête ; ValueError si la clé est invalide."""
+    raw = (request.META.get(HEADER) or "").strip()
+    if not raw:
+        return None
+    if len(raw) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    user = getattr(request, "user", None)
+    owner = f"u{user.pk}" if getattr(user, "is_authenticated", False) else "ip:" + client_ip(request)
+    try:
+        body = json.dumps(request.data, sort_keys=True, default=str)
+    except Exception:
+        body = repr(request.data)
+    return IdempotentRequest(key=_digest(f"{scope}|{owner}|{raw}"), fingerprint=_digest(body))
+
+
+def lookup(idem: IdempotentRequest) -> Optional[Dict]:
+    """Réponse mémorisée ({"fingerprint", "status", "data"}) : cache puis base."""
+    stored = cache.get(idem.cache_key)
+    if stored is not None:
+        return stored
+    record = IdempotencyRecord.objects.filter(key=idem.key, expires_at__gt=timezone.now()).first()
+    if record is None:
+        return None
+    stored = {"fingerprint": record.fingerprint, "status": record.status_code, "data": record.response}
+    remaining = int((record.expires_at - timezone.now()).total_seconds())
+    if remaining > 0:
+        cache.set(idem.cache_key, stored, remaining)
+    return stored
+
+
+def acquire(idem: IdempotentRequest) -> bool:
+    return bool(cache.add(idem.lock_key, 1, LOCK_SECONDS))
+
+
+def release(idem: IdempotentRequest) -> None:
+    cache.delete(idem.lock_key)
+
+
+def store(idem: IdempotentRequest, status_code: int, data) -> None:
+    if not 200 <= status_code < 300:
+        return
+    ttl = _ttl()
+    stored = {"fingerprint": idem.fingerprint, "status": int(status_code), "data": data}
+    cache.set(idem.cache_key, stored, ttl)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyRecord.objects.filter(key=idem.key, expires_at__lte=now).delete()
+            IdempotencyRecord.objects.create(
+                key=idem.key, fingerprint=idem.fingerprint, status_code=int(status_code),
+                response=data, expires_at=now + timedelta(seconds=ttl),
+            )
+    except IntegrityError:
+        pass  # déjà mémorisée (course entre workers) : la première réponse fait foi
+
+
+def purge_expired(batch_size: int = 1000) -> int:
+    """Supprime les réponses expirées par lots (index sur `expires_at`)."""
+    now = timezone.now()
+    total = 0
+    while True:
+        ids = list(
+            IdempotencyRecord.objects.filter(expires_at__lte=now)
+            .order_by("expires_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        total += IdempotencyRecord.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return total
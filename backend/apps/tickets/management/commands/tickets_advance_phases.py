@@ -44,7 +44,7 @@ class Command(BaseCommand):
             except Exception as exc:
                 self.stderr.write(self.style.WARNING(f"Invalid --rules JSON, using defaults: {exc}"))
 
-        qs = TicketType.objects.all()
+        qs = TicketType.objects.prefetch_related("quota_shards")
         if edition:
             qs = qs.filter(edition_id=edition)
 
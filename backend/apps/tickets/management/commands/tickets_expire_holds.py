@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.tickets.holds import sweep
+from apps.tickets.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Release expired reservation holds in batches (set-based updates) and purge expired idempotency records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=None,
+                            help="Holds per batch (defaults to TICKETS_HOLD_SWEEP_BATCH)")
+        parser.add_argument("--max-batches", dest="max_batches", type=int, default=None,
+                            help="Stop after N batches per pass")
+        parser.add_argument("--loop", action="store_true", help="Run forever (every --interval seconds)")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between passes with --loop")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts.get("batch_size") or getattr(settings, "TICKETS_HOLD_SWEEP_BATCH", 1000)))
+        while True:
+            expired, batches = sweep(batch_size, max_batches=opts.get("max_batches"))
+            purged = purge_expired(batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"Expired {expired} holds in {batches} batches; purged {purged} idempotency records."
+            ))
+            if not opts.get("loop"):
+                break
+            time.sleep(max(0.1, float(opts.get("interval") or 5.0)))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from django.core.management.base import BaseCommand
+
+from apps.tickets.reservations import reconcile_all
+
+
+class Command(BaseCommand):
+    help = "Fold sharded quota counters back into quota_reserved and redistribute the remaining quota."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--edition", type=int, help="Filter by edition id", default=None)
+        parser.add_argument("--loop", action="store_true", help="Run forever (every --interval seconds)")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between passes with --loop")
+
+    def handle(self, *args, **opts):
+        edition: Optional[int] = opts.get("edition")
+        while True:
+            folded = reconcile_all(edition)
+            self.stdout.write(self.style.SUCCESS(
+                f"Reconciled {len(folded)} sharded ticket types ({sum(folded.values())} seats folded)."
+            ))
+            if not opts.get("loop"):
+                break
+            time.sleep(max(0.1, float(opts.get("interval") or 5.0)))
@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 try:
-    from prometheus_client import Gauge
+    from prometheus_client import Counter, Gauge
 except Exception:  # pragma: no cover
-    Gauge = None
+    Counter = Gauge = None
 
 if Gauge:
     ON_SALE_TOTAL_GAUGE = Gauge(
@@ -15,8 +15,21 @@ if Gauge:
         "tickets_quota_remaining_sum",
         "Somme des quotas restants sur les billets en vente",
     )
+    RESERVATIONS_TOTAL = Counter(
+        "tickets_reserved_total",
+        "Places réservées via /reserve",
+    )
+    HOLDS_RELEASED_TOTAL = Counter(
+        "tickets_holds_released_total",
+        "Places rendues par les réservations temporaires",
+        ["reason"],  # released | expired
+    )
 else:
     class _Noop:
         def set(self, *args, **kwargs): return None
+        def inc(self, *args, **kwargs): return None
+        def labels(self, *args, **kwargs): return self
     ON_SALE_TOTAL_GAUGE = _Noop()
     QUOTA_REMAINING_SUM_GAUGE = _Noop()
+    RESERVATIONS_TOTAL = _Noop()
+    HOLDS_RELEASED_TOTAL = _Noop()
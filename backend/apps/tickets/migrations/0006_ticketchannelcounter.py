@@ -0,0 +1,61 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards(apps, schema_editor):
+    """Recopie quota_by_channel / reserved_by_channel (JSON) dans les compteurs."""
+    TicketType = apps.get_model("tickets", "TicketType")
+    Counter = apps.get_model("tickets", "TicketChannelCounter")
+    rows = []
+    for pk, quotas, reserved in TicketType.objects.values_list("id", "quota_by_channel", "reserved_by_channel").iterator():
+        quotas, reserved = quotas or {}, reserved or {}
+        for channel in sorted(set(quotas) | set(reserved)):
+            quota = quotas.get(channel)
+            rows.append(Counter(
+                ticket_type_id=pk, channel=str(channel)[:32],
+                quota=int(quota or 0) if channel in quotas else None,
+                reserved=int(reserved.get(channel) or 0),
+            ))
+    Counter.objects.bulk_create(rows, batch_size=1000)
+
+
+def backwards(apps, schema_editor):
+    TicketType = apps.get_model("tickets", "TicketType")
+    Counter = apps.get_model("tickets", "TicketChannelCounter")
+    reserved = {}
+    for tt_id, channel, count in Counter.objects.values_list("ticket_type_id", "channel", "reserved"):
+        reserved.setdefault(tt_id, {})[channel] = count
+    for tt_id, data in reserved.items():
+        TicketType.objects.filter(pk=tt_id).update(reserved_by_channel=data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0005_add_object_permissions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketChannelCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("channel", models.CharField(max_length=32)),
+                ("quota", models.PositiveIntegerField(blank=True, null=True)),
+                ("reserved", models.PositiveIntegerField(default=0)),
+                ("ticket_type", models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name="channel_counters",
+                    to="tickets.tickettype",
+                )),
+            ],
+            options={
+                "ordering": ["channel"],
+                "unique_together": {("ticket_type", "channel")},
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+        migrations.RemoveField(
+            model_name="tickettype",
+            name="reserved_by_channel",
+        ),
+    ]
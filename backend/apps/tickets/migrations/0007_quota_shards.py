@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:37
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticketchannelcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tickettype',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0, validators=[django.core.validators.MaxValueValidator(64)]),
+        ),
+        migrations.CreateModel(
+            name='TicketQuotaShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('quota', models.PositiveIntegerField(default=0)),
+                ('reserved', models.PositiveIntegerField(default=0)),
+                ('ticket_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quota_shards', to='tickets.tickettype')),
+            ],
+            options={
+                'ordering': ['index'],
+                'unique_together': {('ticket_type', 'index')},
+            },
+        ),
+    ]
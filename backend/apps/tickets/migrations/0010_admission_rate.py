@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_idempotency_records'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tickettype',
+            name='admission_rate_per_min',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,10 +1,12 @@
 # backend/apps/tickets/models.py
 from __future__ import annotations
 
+import uuid
 from decimal import Decimal
 from typing import Dict
 
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
 from django.db import models
 from django.utils import timezone
 
@@ -44,7 +46,11 @@ class TicketType(TimeStampedModel):
     quota_total = models.PositiveIntegerField(default=0)
     quota_reserved = models.PositiveIntegerField(default=0)
     quota_by_channel = models.JSONField(default=dict, blank=True, help_text='{"online": 0, "partner": 0} (≤ quota_total)')
-    reserved_by_channel = models.JSONField(default=dict, blank=True, help_text='{"online": 0, "partner": 0} (≤ quota_by_channel)')
+    # réservations par canal : compteurs `TicketChannelCounter` (cf. `reserved_by_channel`)
+    # mode compteurs éclatés : 0 = désactivé, sinon nb de `TicketQuotaShard` (cf. reservations.py)
+    shard_count = models.PositiveSmallIntegerField(default=0, validators=[MaxValueValidator(64)])
+    # salle d'attente à l'ouverture : admissions / minute (0 = désactivée, cf. waiting_room.py)
+    admission_rate_per_min = models.PositiveIntegerField(default=0)
 
     # Fenêtres de vente
     sale_start = models.DateTimeField(null=True, blank=True)
@@ -78,21 +84,32 @@ class TicketType(TimeStampedModel):
             if s > int(self.quota_total):
                 raise ValidationError({"quota_by_channel": "Somme des quotas par canal > quota_total"})
 
-        # réservations par canal: somme ≤ quota_reserved et ≤ quota_by_channel/canal
-        if self.reserved_by_channel:
-            s = int(sum(int(v or 0) for v in self.reserved_by_channel.values()))
-            if s > int(self.quota_reserved):
-                raise ValidationError({"reserved_by_channel": "Somme réservée par canal > quota_reserved"})
-            for ch, cnt in self.reserved_by_channel.items():
-                ch_quota = int((self.quota_by_channel or {}).get(ch, self.quota_total))
-                if int(cnt or 0) > ch_quota:
-                    raise ValidationError({"reserved_by_channel": f"Canal '{ch}' dépasse son quota ({cnt}>{ch_quota})"})
+        # quotas par canal: pas en dessous de ce qui est déjà réservé
+        if self.pk and self.quota_by_channel:
+            reserved = self.reserved_by_channel
+            for ch, quota in self.quota_by_channel.items():
+                if int(quota or 0) < reserved.get(ch, 0):
+                    raise ValidationError({"quota_by_channel": f"Canal '{ch}' : quota < réservé ({quota}<{reserved[ch]})"})
 
     # ---- Propriétés/Helpers ------------------------------------------------
 
+    @property
+    def reserved_by_channel(self) -> Dict[str, int]:
+        """{canal: réservé} lu depuis les compteurs (utilise un `prefetch_related` éventuel)."""
+        if not self.pk:
+            return {}
+        return {c.channel: int(c.reserved) for c in self.channel_counters.all()}
+
+    @property
+    def quota_reserved_total(self) -> int:
+        """`quota_reserved` + réservations encore dans les shards (non réconciliées)."""
+        if not self.shard_count or not self.pk:
+            return int(self.quota_reserved)
+        return int(self.quota_reserved) + sum(int(s.reserved) for s in self.quota_shards.all())
+
     @property
     def quota_remaining(self) -> int:
-        return max(0, int(self.quota_total) - int(self.quota_reserved))
+        return max(0, int(self.quota_total) - self.quota_reserved_total)
 
     def is_on_sale(self) -> bool:
         now = timezone.now()
@@ -122,3 +139,94 @@ class TicketType(TimeStampedModel):
             return PHASE_ORDER[i + 1]
         except Exception:
             return None
+
+
+class TicketChannelCounter(models.Model):
+    """
+    Compteur de réservations d'un canal, incrémenté par UPDATE conditionnel
+    (`reservations.reserve`) : une ligne par (type, canal) plutôt qu'un JSON
+    réécrit sous verrou. `quota` recopie `TicketType.quota_by_channel` ;
+    NULL = pas de quota dédié (seul `quota_total` s'applique).
+    """
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="channel_counters")
+    channel = models.CharField(max_length=32)
+    quota = models.PositiveIntegerField(null=True, blank=True)
+    reserved = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("ticket_type", "channel")]
+        ordering = ["channel"]
+
+    def __str__(self):
+        return f"{self.ticket_type_id}/{self.channel}: {self.reserved}/{self.quota if self.quota is not None else '-'}"
+
+
+class TicketQuotaShard(models.Model):
+    """
+    Fraction du quota restant d'un type en mode éclaté (`shard_count` > 0) :
+    les réservations incrémentent un shard tiré au hasard au lieu de la ligne
+    `TicketType`. `reservations.reconcile_shards` reverse périodiquement
+    `reserved` dans `quota_reserved` et redistribue le restant.
+    """
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="quota_shards")
+    index = models.PositiveSmallIntegerField()
+    quota = models.PositiveIntegerField(default=0)
+    reserved = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [("ticket_type", "index")]
+        ordering = ["index"]
+
+    def __str__(self):
+        return f"{self.ticket_type_id}#{self.index}: {self.reserved}/{self.quota}"
+
+
+class HoldStatus(models.TextChoices):
+    HELD = "held", "Held"
+    CONFIRMED = "confirmed", "Confirmed"
+    RELEASED = "released", "Released"
+    EXPIRED = "expired", "Expired"
+
+
+class ReservationHold(TimeStampedModel):
+    """
+    Réservation temporaire (panier) : les places sont décomptées à la création
+    et rendues si la réservation n'est pas confirmée avant `expires_at`
+    (commande `tickets_expire_holds`). `token` sert de capacité pour
+    confirmer / libérer sans authentification.
+    """
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name="holds")
+    quantity = models.PositiveIntegerField()
+    channel = models.CharField(max_length=32, blank=True)
+    status = models.CharField(max_length=16, choices=HoldStatus.choices, default=HoldStatus.HELD)
+    expires_at = models.DateTimeField()
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # balayage des réservations échues : seules les lignes `held` sont indexées
+            models.Index(fields=["expires_at"], condition=models.Q(status="held"), name="tickets_hold_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_type_id} x{self.quantity} [{self.status}] -> {self.expires_at:%Y-%m-%d %H:%M}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Réponse mémorisée d'une requête portant un `Idempotency-Key` (repli
+    durable du cache, cf. idempotency.py). `key` : empreinte de la portée,
+    de l'utilisateur et de la clé client.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    fingerprint = models.CharField(max_length=64)  # empreinte du corps de la requête
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]}… -> {self.status_code}"
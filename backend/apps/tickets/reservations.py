@@ -0,0 +1,304 @@
+# apps/tickets/reservations.py
+"""
+Réservation de quota sans verrou applicatif.
+
+Chaque réservation est un UPDATE conditionnel :
+
+    UPDATE tickets_tickettype
+       SET quota_reserved = quota_reserved + q
+     WHERE id = %s AND quota_reserved <= quota_total - q AND <en vente>
+
+Le nombre de lignes affectées décide du succès : pas de `select_for_update`,
+pas de `full_clean()`, pas de réécriture du JSON par canal. La base ne
+sérialise que l'UPDATE lui-même (verrou de ligne tenu jusqu'au commit, qui
+suit immédiatement) ; la survente est impossible puisque la condition est
+évaluée sur la valeur courante de la ligne.
+
+Quotas par canal : une ligne `TicketChannelCounter` par (type, canal),
+incrémentée de la même façon *avant* le type (ordre de verrouillage fixe :
+canal puis type, pas d'interblocage). Si le type échoue, la transaction
+annule l'incrément du canal.
+
+Mode éclaté (`TicketType.shard_count` = K > 0) pour les types très demandés :
+le restant est réparti sur K lignes `TicketQuotaShard` ; une réservation
+incrémente un shard tiré au hasard, la ligne `TicketType` n'est plus écrite.
+Si ce shard est plein, la quantité est prise sur les shards qui ont encore de
+la place (par index croissant, même transaction). `reconcile_shards`
+(commande `tickets_reconcile_shards`, périodique) reverse les shards dans
+`quota_reserved` et redistribue le restant.
+
+Réservations temporaires (`hold_seconds`) : une `ReservationHold` est créée
+dans la même transaction que l'incrément ; `release_seats` rend les places
+(cf. holds.py pour la confirmation et l'expiration).
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ReservationHold, TicketChannelCounter, TicketQuotaShard, TicketType
+
+
+@dataclass
+class ReservationResult:
+    ok: bool
+    ticket_type_id: int
+    quantity: int
+    channel: Optional[str] = None
+    reason: str = ""  # not_found | not_on_sale | quota | channel_quota
+    quota_remaining: Optional[int] = None
+    reserved_by_channel: Dict[str, int] = field(default_factory=dict)
+    dry_run: bool = False
+    hold: Optional[ReservationHold] = None
+
+
+def on_sale_q(now=None, prefix: str = "") -> Q:
+    """Équivalent SQL de `TicketType.is_on_sale()` (hors quota) ; `prefix` : ex. "ticket_type__"."""
+    now = now or timezone.now()
+    return (
+        Q(**{f"{prefix}is_active": True})
+        & (Q(**{f"{prefix}sale_start__isnull": True}) | Q(**{f"{prefix}sale_start__lte": now}))
+        & (Q(**{f"{prefix}sale_end__isnull": True}) | Q(**{f"{prefix}sale_end__gte": now}))
+    )
+
+
+# ---------------------------------------------------------------------------
+# Compteurs par canal
+# ---------------------------------------------------------------------------
+
+def channel_counters_for(tt: TicketType) -> List[TicketChannelCounter]:
+    """Compteurs (non sauvegardés) des canaux déclarés dans `quota_by_channel`."""
+    return [
+        TicketChannelCounter(ticket_type_id=tt.pk, channel=str(ch)[:32], quota=int(quota or 0))
+        for ch, quota in sorted((tt.quota_by_channel or {}).items())
+    ]
+
+
+def sync_channel_counters(tt: TicketType) -> None:
+    """Aligne `TicketChannelCounter.quota` sur `quota_by_channel` (réservés conservés)."""
+    wanted = {c.channel: c.quota for c in channel_counters_for(tt)}
+    existing = {c.channel: c for c in TicketChannelCounter.objects.filter(ticket_type_id=tt.pk)}
+    TicketChannelCounter.objects.bulk_create(
+        [TicketChannelCounter(ticket_type_id=tt.pk, channel=ch, quota=q) for ch, q in wanted.items() if ch not in existing],
+        ignore_conflicts=True,
+    )
+    stale = [c for ch, c in existing.items() if c.quota != wanted.get(ch)]
+    for c in stale:
+        c.quota = wanted.get(c.channel)
+    if stale:
+        TicketChannelCounter.objects.bulk_update(stale, ["quota"])
+
+
+def _take_channel(ticket_type_id: int, channel: str, q: int) -> bool:
+    qs = TicketChannelCounter.objects.filter(ticket_type_id=ticket_type_id, channel=channel)
+    fits = Q(quota__isnull=True) | Q(reserved__lte=F("quota") - q)
+    if qs.filter(fits).update(reserved=F("reserved") + q):
+        return True
+    if qs.exists():
+        return False
+    # canal sans quota dédié : compteur créé à la première réservation
+    TicketChannelCounter.objects.bulk_create(
+        [TicketChannelCounter(ticket_type_id=ticket_type_id, channel=channel)], ignore_conflicts=True,
+    )
+    return bool(qs.filter(fits).update(reserved=F("reserved") + q))
+
+
+# ---------------------------------------------------------------------------
+# Compteurs éclatés (shards)
+# ---------------------------------------------------------------------------
+
+def _take_shard(ticket_type_id: int, shard_count: int, q: int, now) -> bool:
+    # fenêtre de vente vérifiée à part : les UPDATE de shard ne filtrent que sur
+    # leurs propres colonnes (un filtre joint devient `id IN (SELECT ...)`, et la
+    # condition de capacité n'est alors plus réévaluée sur la ligne verrouillée)
+    if not TicketType.objects.filter(on_sale_q(now), pk=ticket_type_id).exists():
+        return False
+    shards = TicketQuotaShard.objects.filter(ticket_type_id=ticket_type_id)
+    fits = Q(reserved__lte=F("quota") - q)
+    first = random.randrange(shard_count)
+    if shards.filter(fits, index=first).update(reserved=F("reserved") + q):
+        return True
+    # repli : répartition sur les shards qui ont de la place, par index
+    # croissant (ordre de verrouillage fixe) ; échec = annulation par l'appelant
+    left = q
+    rooms = shards.filter(reserved__lt=F("quota")).values_list("index", "quota", "reserved")
+    for index, quota, reserved in rooms:
+        take = min(left, int(quota) - int(reserved))
+        if take > 0 and shards.filter(Q(reserved__lte=F("quota") - take), index=index).update(
+            reserved=F("reserved") + take
+        ):
+            left -= take
+        if not left:
+            return True
+    return False
+
+
+def _split(remaining: int, k: int) -> List[int]:
+    return [remaining // k + (1 if i < remaining % k else 0) for i in range(k)]
+
+
+def reconcile_shards(ticket_type_id: int, released: int = 0) -> int:
+    """
+    Reverse les shards dans `quota_reserved` (moins `released` places rendues)
+    puis redistribue le restant sur `shard_count` shards (supprimés si 0).
+    Verrouille brièvement les shards du type (pas les réservations des autres
+    types). Retourne le nombre de places reversées.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        shards = list(
+            TicketQuotaShard.objects.select_for_update().filter(ticket_type_id=ticket_type_id).order_by("index")
+        )
+        folded = sum(int(s.reserved) for s in shards)
+        if folded or released:
+            TicketType.objects.filter(pk=ticket_type_id).update(
+                quota_reserved=Greatest(F("quota_reserved") + folded - released, 0), updated_at=now,
+            )
+        row = TicketType.objects.filter(pk=ticket_type_id).values_list(
+            "quota_total", "quota_reserved", "shard_count",
+        ).first()
+        if row is None:
+            return 0
+        total, reserved, k = row
+        by_index = {s.index: s for s in shards}
+        TicketQuotaShard.objects.filter(ticket_type_id=ticket_type_id, index__gte=k).delete()
+        if k:
+            quotas = _split(max(0, int(total) - int(reserved)), k)
+            kept = [by_index[i] for i in range(k) if i in by_index]
+            for s in kept:
+                s.quota, s.reserved = quotas[s.index], 0
+            TicketQuotaShard.objects.bulk_update(kept, ["quota", "reserved"])
+            TicketQuotaShard.objects.bulk_create([
+                TicketQuotaShard(ticket_type_id=ticket_type_id, index=i, quota=quotas[i])
+                for i in range(k) if i not in by_index
+            ])
+    return folded
+
+
+def sync_shards(tt: TicketType) -> None:
+    """Redistribue si `shard_count` ou `quota_total` ne correspondent plus aux shards existants."""
+    agg = TicketQuotaShard.objects.filter(ticket_type_id=tt.pk).aggregate(n=Count("id"), quota=Sum("quota"))
+    k = int(tt.shard_count or 0)
+    if agg["n"] != k or (k and int(tt.quota_reserved) + int(agg["quota"] or 0) != int(tt.quota_total)):
+        reconcile_shards(tt.pk)
+
+
+def reconcile_all(edition_id: Optional[int] = None) -> Dict[int, int]:
+    """Réconcilie les types éclatés (et ceux qui ont encore des shards). {id: places reversées}."""
+    qs = TicketType.objects.filter(Q(shard_count__gt=0) | Q(quota_shards__isnull=False)).distinct()
+    if edition_id:
+        qs = qs.filter(edition_id=edition_id)
+    return {pk: reconcile_shards(pk) for pk in qs.values_list("id", flat=True)}
+
+
+# ---------------------------------------------------------------------------
+# Libération
+# ---------------------------------------------------------------------------
+
+def release_seats(ticket_type_id: int, quantity: int, by_channel: Optional[Dict[str, int]] = None) -> None:
+    """
+    Rend `quantity` places au type (et `by_channel` aux compteurs de canal),
+    dans l'ordre de verrouillage de `reserve` : canaux puis type. En mode
+    éclaté, les places sont rendues via `reconcile_shards` pour redevenir
+    réservables sur les shards.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        for channel, q in sorted((by_channel or {}).items()):
+            TicketChannelCounter.objects.filter(ticket_type_id=ticket_type_id, channel=channel).update(
+                reserved=Greatest(F("reserved") - q, 0),
+            )
+        if TicketQuotaShard.objects.filter(ticket_type_id=ticket_type_id).exists():
+            reconcile_shards(ticket_type_id, released=quantity)
+        else:
+            TicketType.objects.filter(pk=ticket_type_id).update(
+                quota_reserved=Greatest(F("quota_reserved") - quantity, 0), updated_at=now,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Réservation
+# ---------------------------------------------------------------------------
+
+def _state(result: ReservationResult) -> Optional[TicketType]:
+    """Lecture sans verrou de l'état courant (diagnostic / réponse)."""
+    tt = (
+        TicketType.objects.filter(pk=result.ticket_type_id)
+        .prefetch_related("channel_counters", "quota_shards").first()
+    )
+    if tt is not None:
+        result.quota_remaining = tt.quota_remaining
+        result.reserved_by_channel = tt.reserved_by_channel
+    return tt
+
+
+def _check(result: ReservationResult, tt: Optional[TicketType]) -> ReservationResult:
+    """Motif d'échec (ou succès simulé en dry-run) à partir d'une lecture."""
+    q, channel = result.quantity, result.channel
+    if tt is None:
+        result.reason = "not_found"
+    elif not tt.is_on_sale():
+        result.reason = "not_on_sale"
+    elif tt.quota_remaining < q:
+        result.reason = "quota"
+    elif channel:
+        counter = next((c for c in tt.channel_counters.all() if c.channel == channel), None)
+        if counter is not None and counter.quota is not None and counter.reserved + q > counter.quota:
+            result.reason = "channel_quota"
+    result.ok = not result.reason
+    return result
+
+
+def reserve(ticket_type_id: int, quantity: int, *, channel: Optional[str] = None,
+            dry_run: bool = False, hold_seconds: Optional[int] = None) -> ReservationResult:
+    """
+    Réserve `quantity` places ; `ok=False` + `reason` si refusé (rien n'est
+    écrit). Avec `hold_seconds`, la réservation est temporaire (`result.hold`).
+    """
+    result = ReservationResult(
+        ok=False, ticket_type_id=int(ticket_type_id), quantity=int(quantity),
+        channel=channel or None, dry_run=dry_run,
+    )
+    if dry_run:
+        return _check(result, _state(result))
+
+    shard_count = TicketType.objects.filter(pk=result.ticket_type_id).values_list("shard_count", flat=True).first()
+    if shard_count is None:
+        result.reason = "not_found"
+        return result
+
+    now = timezone.now()
+    with transaction.atomic():
+        taken = not channel or _take_channel(result.ticket_type_id, channel, result.quantity)
+        if taken and shard_count:
+            taken = _take_shard(result.ticket_type_id, shard_count, result.quantity, now)
+        elif taken:
+            taken = bool(
+                TicketType.objects.filter(
+                    on_sale_q(now), pk=result.ticket_type_id,
+                    quota_reserved__lte=F("quota_total") - result.quantity,
+                ).update(quota_reserved=F("quota_reserved") + result.quantity, updated_at=now)
+            )
+        if not taken:
+            transaction.set_rollback(True)
+        elif hold_seconds:
+            result.hold = ReservationHold.objects.create(
+                ticket_type_id=result.ticket_type_id, quantity=result.quantity, channel=channel or "",
+                expires_at=now + timedelta(seconds=int(hold_seconds)),
+            )
+
+    tt = _state(result)
+    if taken:
+        result.ok = True
+        return result
+    _check(result, tt)
+    result.ok = False
+    result.reason = result.reason or "quota"  # état changé entre-temps
+    return result
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from rest_framework import serializers
-from .models import TicketType
+from .models import ReservationHold, TicketType
 
 
 class TicketTypeSerializer(serializers.ModelSerializer):
     edition_year = serializers.IntegerField(source="edition.year", read_only=True)
     quota_remaining = serializers.ReadOnlyField()
+    quota_reserved_total = serializers.ReadOnlyField()
     is_on_sale = serializers.SerializerMethodField()
     price_net = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
     price_vat_amount = serializers.DecimalField(max_digits=8, decimal_places=2, read_only=True)
@@ -17,6 +18,7 @@ class TicketTypeSerializer(serializers.ModelSerializer):
             "id", "edition", "edition_year", "code", "name", "description",
             "day", "phase", "price", "price_net", "price_vat_amount",
             "currency", "vat_rate", "quota_total", "quota_reserved",
+            "quota_reserved_total", "shard_count", "admission_rate_per_min",
             "quota_by_channel", "reserved_by_channel", "quota_remaining",
             "sale_start", "sale_end", "is_active", "is_on_sale",
             "created_at", "updated_at"
@@ -24,3 +26,13 @@ class TicketTypeSerializer(serializers.ModelSerializer):
 
     def get_is_on_sale(self, obj: TicketType) -> bool:
         return obj.is_on_sale()
+
+
+class ReservationHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReservationHold
+        fields = (
+            "token", "ticket_type", "quantity", "channel", "status",
+            "expires_at", "confirmed_at", "released_at", "created_at",
+        )
+        read_only_fields = fields
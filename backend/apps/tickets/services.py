@@ -46,7 +46,7 @@ def current_cache_version() -> int:
 # --- Metrics recompute ------------------------------------------------------
 
 def recompute_metrics():
-    qs = TicketType.objects.all()
+    qs = TicketType.objects.prefetch_related("quota_shards")
     on_sale = [t for t in qs if t.is_on_sale()]
     ON_SALE_TOTAL_GAUGE.set(len(on_sale))
     QUOTA_REMAINING_SUM_GAUGE.set(sum(int(t.quota_remaining) for t in on_sale))
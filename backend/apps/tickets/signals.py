@@ -7,12 +7,14 @@ from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 from .models import TicketType
+from .reservations import sync_channel_counters, sync_shards
 from .services import bump_cache_version, dispatch_webhook, recompute_metrics
+from .waiting_room import forget as forget_waiting_room_config
 
 _PRE: Dict[int, bool] = {}  # pk -> was_on_sale ?
 
 
-@receiver(pre_save, sender=TicketType)
+@receiver(pre_save, sender=TicketType, dispatch_uid="tickets_pre_save_remember")
 def remember_old_sale_state(sender, instance: TicketType, **kwargs):
     if instance.pk:
         try:
@@ -22,7 +24,7 @@ def remember_old_sale_state(sender, instance: TicketType, **kwargs):
             _PRE.pop(instance.pk, None)
 
 
-@receiver(post_save, sender=TicketType)
+@receiver(post_save, sender=TicketType, dispatch_uid="tickets_post_save_emit")
 def emit_sale_window_webhooks_and_recompute_metrics(sender, instance: TicketType, created: bool, **kwargs):
     try:
         old = _PRE.pop(instance.pk, None)
@@ -46,7 +48,23 @@ def emit_sale_window_webhooks_and_recompute_metrics(sender, instance: TicketType
         recompute_metrics()
 
 
-@receiver(post_save, sender=TicketType)
-@receiver(post_delete, sender=TicketType)
+@receiver(post_save, sender=TicketType, dispatch_uid="tickets_post_save_cache_bump")
+@receiver(post_delete, sender=TicketType, dispatch_uid="tickets_post_delete_cache_bump")
 def cache_version_bump(sender, **kwargs):
     bump_cache_version()
+
+
+@receiver(post_save, sender=TicketType, dispatch_uid="tickets_post_save_channel_counters")
+def channel_counters_sync(sender, instance: TicketType, **kwargs):
+    sync_channel_counters(instance)
+
+
+@receiver(post_save, sender=TicketType, dispatch_uid="tickets_post_save_shards")
+def quota_shards_sync(sender, instance: TicketType, **kwargs):
+    sync_shards(instance)
+
+
+@receiver(post_save, sender=TicketType, dispatch_uid="tickets_post_save_waiting_room")
+@receiver(post_delete, sender=TicketType, dispatch_uid="tickets_post_delete_waiting_room")
+def waiting_room_config_reset(sender, instance: TicketType, **kwargs):
+    forget_waiting_room_config(instance.pk)
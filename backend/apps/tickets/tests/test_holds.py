@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition
+from apps.tickets import holds, reservations
+from apps.tickets.models import HoldStatus, ReservationHold, TicketChannelCounter, TicketType
+
+
+class ReservationHoldTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ed = FestivalEdition.objects.create(
+            name="Holds", year=2050, start_date=now.date(), end_date=now.date() + timedelta(days=2)
+        )
+        self.tt = TicketType.objects.create(
+            edition=self.ed, code="CART", name="Cart", price="40.00", quota_total=10,
+            sale_start=now - timedelta(hours=1), quota_by_channel={"online": 8},
+        )
+
+    def remaining(self, tt=None):
+        tt = TicketType.objects.get(pk=(tt or self.tt).pk)
+        return tt.quota_remaining
+
+    def hold(self, q, channel=None, seconds=600, tt=None):
+        res = reservations.reserve((tt or self.tt).id, q, channel=channel, hold_seconds=seconds)
+        self.assertTrue(res.ok)
+        return res.hold
+
+    def test_hold_counts_until_released(self):
+        h = self.hold(3, channel="online")
+        self.assertEqual((h.status, self.remaining()), (HoldStatus.HELD, 7))
+        self.assertTrue(holds.release(h))
+        self.assertFalse(holds.release(h))  # une seule fois
+        self.assertEqual(self.remaining(), 10)
+        self.assertEqual(TicketChannelCounter.objects.get(ticket_type=self.tt, channel="online").reserved, 0)
+
+    def test_confirm_keeps_seats_and_rejects_expired(self):
+        h = self.hold(2)
+        self.assertTrue(holds.confirm(h))
+        self.assertFalse(holds.release(h))
+        self.assertEqual(self.remaining(), 8)
+        late = self.hold(3, seconds=-1)
+        self.assertFalse(holds.confirm(late))
+        late.refresh_from_db()
+        self.assertEqual(late.status, HoldStatus.EXPIRED)
+        self.assertEqual(self.remaining(), 8)
+
+    def test_sweep_is_batched_and_set_based(self):
+        other = TicketType.objects.create(
+            edition=self.ed, code="CART2", name="Cart 2", price="40.00", quota_total=50,
+            sale_start=timezone.now() - timedelta(hours=1),
+        )
+        for _ in range(4):
+            self.hold(1, channel="online", seconds=-5)
+        for _ in range(5):
+            self.hold(2, seconds=-5, tt=other)
+        keep = self.hold(1, seconds=600)
+        with CaptureQueriesContext(connection) as ctx:
+            done = holds.expire_due(batch_size=100)
+        self.assertEqual(done, 9)
+        updates = [q for q in ctx.captured_queries if q["sql"].upper().startswith("UPDATE")]
+        self.assertEqual(len(updates), 4)  # lot + compteur canal + 2 types
+        self.assertEqual((self.remaining(), self.remaining(other)), (9, 50))
+        self.assertEqual(ReservationHold.objects.filter(status=HoldStatus.EXPIRED).count(), 9)
+        keep.refresh_from_db()
+        self.assertEqual(keep.status, HoldStatus.HELD)
+
+        for _ in range(5):
+            self.hold(1, seconds=-5)
+        self.assertEqual(holds.sweep(batch_size=2), (5, 3))
+        self.assertEqual(self.remaining(), 9)
+
+    def test_sharded_release_returns_seats_to_shards(self):
+        self.tt.shard_count = 2
+        self.tt.save()
+        h = self.hold(10)
+        self.assertFalse(reservations.reserve(self.tt.id, 1).ok)
+        self.assertTrue(holds.release(h))
+        self.assertEqual(self.remaining(), 10)
+        self.assertTrue(reservations.reserve(self.tt.id, 10).ok)
+
+    def test_command(self):
+        self.hold(2, seconds=-5)
+        out = StringIO()
+        call_command("tickets_expire_holds", "--batch-size", "10", stdout=out)
+        self.assertIn("Expired 1 holds", out.getvalue())
+        self.assertEqual(self.remaining(), 10)
+
+    def test_endpoints(self):
+        client = APIClient()
+        res = client.post(reverse("tickets-types-reserve", args=[self.tt.id]), {"quantity": 2, "hold": True}, format="json")
+        self.assertEqual((res.status_code, res.data["quota_remaining"]), (200, 8))
+        token = res.data["hold"]["token"]
+        self.assertEqual(res.data["hold"]["status"], "held")
+
+        confirm = reverse("tickets-holds-confirm", args=[token])
+        self.assertEqual(client.post(confirm).status_code, 403)
+        staff = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+        client.force_authenticate(staff)
+        self.assertEqual(client.post(confirm).data["status"], "confirmed")
+        self.assertEqual(client.post(confirm).status_code, 200)  # idempotent
+        res = client.post(reverse("tickets-holds-release", args=[token]))
+        self.assertEqual((res.status_code, res.data["status"]), (409, "confirmed"))
+
+        h = self.hold(1)
+        client.force_authenticate(None)
+        res = client.post(reverse("tickets-holds-release", args=[h.token]))
+        self.assertEqual((res.status_code, res.data["status"]), (200, "released"))
+        self.assertEqual(client.get(reverse("tickets-holds-detail", args=["not-a-token"])).status_code, 404)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition
+from apps.tickets import idempotency
+from apps.tickets.models import IdempotencyRecord, TicketType
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.ed = FestivalEdition.objects.create(
+            name="Idem", year=2051, start_date=now.date(), end_date=now.date() + timedelta(days=2)
+        )
+        self.tt = TicketType.objects.create(
+            edition=self.ed, code="IDEM", name="Idem", price="30.00", quota_total=10,
+            sale_start=now - timedelta(hours=1),
+        )
+        self.client = APIClient()
+        self.url = reverse("tickets-types-reserve", args=[self.tt.id])
+
+    def post(self, body, key="k-1"):
+        return self.client.post(self.url, body, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def reserved(self):
+        return TicketType.objects.values_list("quota_reserved", flat=True).get(pk=self.tt.pk)
+
+    def test_replay_returns_stored_response_without_reserving(self):
+        first = self.post({"quantity": 2})
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):  # servi par le cache
+            again = self.post({"quantity": 2})
+        self.assertEqual((again.status_code, again.data), (200, first.data))
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(self.reserved(), 2)
+        # autre clé : nouvelle réservation
+        self.assertEqual(self.post({"quantity": 2}, key="k-2").data["quota_remaining"], 6)
+
+    def test_db_fallback_when_cache_is_lost(self):
+        self.post({"quantity": 3})
+        cache.clear()
+        again = self.post({"quantity": 3})
+        self.assertEqual((again.status_code, again.data["quota_remaining"]), (200, 7))
+        self.assertEqual(self.reserved(), 3)
+
+    def test_expired_record_is_not_replayed(self):
+        self.post({"quantity": 1})
+        cache.clear()
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertNotIn("Idempotent-Replayed", self.post({"quantity": 1}))
+        self.assertEqual(self.reserved(), 2)
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(idempotency.purge_expired(), 1)
+
+    def test_conflicts(self):
+        self.post({"quantity": 1})
+        self.assertEqual(self.post({"quantity": 4}).status_code, 422)
+        self.assertEqual(self.post({"quantity": 1}, key="x" * 300).status_code, 400)
+        # même clé en cours de traitement (autre worker)
+        other = "k-busy"
+        scoped = idempotency.from_request(
+            SimpleNamespace(META={idempotency.HEADER: other, "REMOTE_ADDR": "127.0.0.1"}, user=None, data={"quantity": 1}),
+            scope=f"reserve:{self.tt.id}",
+        )
+        self.assertTrue(idempotency.acquire(scoped))
+        self.assertEqual(self.post({"quantity": 1}, key=other).status_code, 409)
+        self.assertEqual(self.reserved(), 1)
+
+    def test_anonymous_callers_are_scoped_by_ip(self):
+        self.post({"quantity": 2})
+        other = self.client.post(
+            self.url, {"quantity": 2}, format="json", HTTP_IDEMPOTENCY_KEY="k-1", REMOTE_ADDR="10.0.0.2"
+        )
+        self.assertNotIn("Idempotent-Replayed", other)
+        self.assertEqual(other.data["quota_remaining"], 6)
+
+    def test_only_successes_are_stored(self):
+        res = self.post({"quantity": 11})
+        self.assertEqual(res.status_code, 400)
+        self.assertNotIn("Idempotent-Replayed", self.post({"quantity": 11}))
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        with self.settings(TICKETS_RESERVE_RATE_LIMIT_PER_MIN=0):
+            self.assertEqual(self.post({"quantity": 1}, key="k-rl").status_code, 429)
+        self.assertEqual(self.post({"quantity": 1}, key="k-rl").status_code, 200)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition
+from apps.tickets import reservations
+from apps.tickets.models import TicketChannelCounter, TicketType
+
+
+class AtomicReservationTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ed = FestivalEdition.objects.create(
+            name="Res", year=2048, start_date=now.date(), end_date=now.date() + timedelta(days=2)
+        )
+        self.tt = TicketType.objects.create(
+            edition=self.ed, code="PASS", name="Pass", price="50.00", quota_total=10,
+            sale_start=now - timedelta(hours=1), quota_by_channel={"online": 6, "partner": 4},
+        )
+
+    def test_counters_follow_quota_by_channel(self):
+        self.assertEqual(
+            dict(self.tt.channel_counters.values_list("channel", "quota")), {"online": 6, "partner": 4}
+        )
+        self.tt.quota_by_channel = {"online": 8}
+        self.tt.save()
+        self.assertEqual(
+            dict(self.tt.channel_counters.values_list("channel", "quota")), {"online": 8, "partner": None}
+        )
+
+    def test_single_conditional_update_without_row_lock(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = reservations.reserve(self.tt.id, 2, channel="online")
+        self.assertTrue(res.ok)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries).upper()
+        self.assertNotIn("FOR UPDATE", sql)
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].upper().startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)  # compteur canal + type
+        self.assertEqual((res.quota_remaining, res.reserved_by_channel), (8, {"online": 2, "partner": 0}))
+
+    def test_no_oversell(self):
+        results = [reservations.reserve(self.tt.id, 3).ok for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        self.tt.refresh_from_db()
+        self.assertEqual(self.tt.quota_reserved, 9)
+        self.assertEqual(reservations.reserve(self.tt.id, 2).reason, "quota")
+        self.assertTrue(reservations.reserve(self.tt.id, 1).ok)
+
+    def test_channel_quota_and_rollback(self):
+        self.assertEqual(reservations.reserve(self.tt.id, 7, channel="online").reason, "channel_quota")
+        self.assertTrue(reservations.reserve(self.tt.id, 6, channel="online").ok)
+        # canal libre mais quota global insuffisant : l'incrément du canal est annulé
+        self.assertEqual(reservations.reserve(self.tt.id, 5, channel="partner").reason, "quota")
+        counters = dict(TicketChannelCounter.objects.filter(ticket_type=self.tt).values_list("channel", "reserved"))
+        self.assertEqual(counters, {"online": 6, "partner": 0})
+        # canal sans quota dédié : compteur créé à la volée
+        self.assertTrue(reservations.reserve(self.tt.id, 1, channel="box-office").ok)
+        self.tt.refresh_from_db()
+        self.assertEqual(self.tt.reserved_by_channel["box-office"], 1)
+        self.assertEqual(self.tt.quota_reserved, 7)
+
+    def test_refusals(self):
+        self.assertEqual(reservations.reserve(999999, 1).reason, "not_found")
+        TicketType.objects.filter(pk=self.tt.id).update(sale_end=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(reservations.reserve(self.tt.id, 1).reason, "not_on_sale")
+        self.tt.refresh_from_db()
+        self.assertEqual(self.tt.quota_reserved, 0)
+
+    def test_quota_by_channel_cannot_drop_below_reserved(self):
+        reservations.reserve(self.tt.id, 5, channel="online")
+        self.tt.refresh_from_db()
+        self.tt.quota_by_channel = {"online": 4}
+        with self.assertRaises(ValidationError):
+            self.tt.full_clean()
+
+    def test_endpoint(self):
+        client = APIClient()
+        url = reverse("tickets-types-reserve", args=[self.tt.id])
+        res = client.post(url, {"quantity": 2, "channel": "partner", "dry_run": True}, format="json")
+        self.assertEqual(res.data, {"ok": True, "dry_run": True, "remaining_if_ok": 8})
+        res = client.post(url, {"quantity": 11}, format="json")
+        self.assertEqual((res.status_code, res.data["remaining"]), (400, 10))
+        res = client.post(reverse("tickets-types-reserve", args=[999999]), {"quantity": 1}, format="json")
+        self.assertEqual(res.status_code, 404)
+        res = client.post(url, {"quantity": 10}, format="json")
+        self.assertEqual((res.status_code, res.data["quota_remaining"]), (200, 0))
+        on_sale = client.get(reverse("tickets-types-on-sale"), {"edition": self.ed.id})
+        self.assertEqual(on_sale.data, [])
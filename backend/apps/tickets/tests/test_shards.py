@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.core.models import FestivalEdition
+from apps.tickets import reservations
+from apps.tickets.models import TicketQuotaShard, TicketType
+from apps.tickets.serializers import TicketTypeSerializer
+
+
+class ShardedQuotaTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ed = FestivalEdition.objects.create(
+            name="Shards", year=2049, start_date=now.date(), end_date=now.date() + timedelta(days=2)
+        )
+        self.tt = TicketType.objects.create(
+            edition=self.ed, code="HOT", name="Hot", price="80.00", quota_total=10,
+            sale_start=now - timedelta(hours=1), shard_count=4,
+        )
+
+    def shards(self):
+        return list(TicketQuotaShard.objects.filter(ticket_type=self.tt).values_list("quota", "reserved"))
+
+    def test_shards_created_on_save(self):
+        self.assertEqual(self.shards(), [(3, 0), (3, 0), (2, 0), (2, 0)])
+
+    def test_reserve_does_not_write_ticket_type_row(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = reservations.reserve(self.tt.id, 2)
+        self.assertTrue(res.ok)
+        updates = [q["sql"] for q in ctx.captured_queries if q["sql"].upper().startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("tickets_ticketquotashard", updates[0])
+        self.assertEqual(res.quota_remaining, 8)
+        self.tt.refresh_from_db()
+        self.assertEqual((self.tt.quota_reserved, self.tt.quota_reserved_total), (0, 2))
+        data = TicketTypeSerializer(self.tt).data
+        self.assertEqual((data["quota_reserved_total"], data["quota_remaining"]), (2, 8))
+
+    def test_capacity_check_stays_on_the_updated_row(self):
+        # remplis 2, 2, 1, 1 : la réservation de 4 passe par le tirage puis le repli
+        TicketQuotaShard.objects.filter(ticket_type=self.tt).update(reserved=1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(reservations.reserve(self.tt.id, 4).ok)
+        updates = [q["sql"].upper() for q in ctx.captured_queries if q["sql"].upper().startswith("UPDATE")]
+        self.assertTrue(updates)
+        for sql in updates:
+            self.assertNotIn("JOIN", sql)
+            self.assertNotIn("IN (SELECT", sql)
+
+    def test_no_oversell_and_fallback_to_other_shards(self):
+        results = [reservations.reserve(self.tt.id, 1).ok for _ in range(12)]
+        self.assertEqual(results.count(True), 10)
+        self.assertFalse(reservations.reserve(self.tt.id, 1).ok)  # épuisé : plus en vente
+        self.assertEqual(sum(r for _, r in self.shards()), 10)
+
+    def test_quantity_split_across_shards(self):
+        # restants 2, 2, 1, 1 : aucun shard ne peut servir 4 seul
+        TicketQuotaShard.objects.filter(ticket_type=self.tt).update(reserved=1)
+        self.assertTrue(reservations.reserve(self.tt.id, 4).ok)
+        self.assertEqual(sum(r for _, r in self.shards()), 8)
+        self.assertEqual(reservations.reserve(self.tt.id, 3).reason, "quota")
+        self.assertEqual(sum(r for _, r in self.shards()), 8)  # échec partiel annulé
+
+    def test_not_on_sale(self):
+        TicketType.objects.filter(pk=self.tt.pk).update(is_active=False)
+        self.assertEqual(reservations.reserve(self.tt.id, 1).reason, "not_on_sale")
+
+    def test_reconcile_folds_and_redistributes(self):
+        for _ in range(3):
+            self.assertTrue(reservations.reserve(self.tt.id, 1).ok)
+        self.assertEqual(reservations.reconcile_shards(self.tt.id), 3)
+        self.tt.refresh_from_db()
+        self.assertEqual(self.tt.quota_reserved, 3)
+        self.assertEqual(self.shards(), [(2, 0), (2, 0), (2, 0), (1, 0)])
+        self.assertEqual(self.tt.quota_remaining, 7)
+
+    def test_quota_change_redistributes(self):
+        self.assertTrue(reservations.reserve(self.tt.id, 2).ok)
+        self.tt.refresh_from_db()
+        self.tt.quota_total = 14
+        self.tt.save()
+        self.tt.refresh_from_db()
+        self.assertEqual(self.tt.quota_reserved, 2)
+        self.assertEqual(sum(q for q, _ in self.shards()), 12)
+
+    def test_disable_sharding_folds_back(self):
+        self.assertTrue(reservations.reserve(self.tt.id, 5).ok)
+        self.tt.refresh_from_db()
+        self.tt.shard_count = 0
+        self.tt.save()
+        self.tt.refresh_from_db()
+        self.assertEqual(self.shards(), [])
+        self.assertEqual((self.tt.quota_reserved, self.tt.quota_remaining), (5, 5))
+        self.assertEqual(reservations.reserve(self.tt.id, 6).reason, "quota")
+        self.assertTrue(reservations.reserve(self.tt.id, 5).ok)
+
+    def test_command(self):
+        reservations.reserve(self.tt.id, 1)
+        out = StringIO()
+        call_command("tickets_reconcile_shards", "--edition", str(self.ed.id), stdout=out)
+        self.assertIn("1 seats folded", out.getvalue())
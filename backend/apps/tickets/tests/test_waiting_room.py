@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import FestivalEdition
+from apps.tickets import waiting_room
+from apps.tickets.models import TicketType
+
+
+@override_settings(TICKETS_WAITING_ROOM_BURST=2, TICKETS_WAITING_ROOM_MAX_USES=1)
+class WaitingRoomTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.ed = FestivalEdition.objects.create(
+            name="Queue", year=2052, start_date=now.date(), end_date=now.date() + timedelta(days=2)
+        )
+        self.opened = now - timedelta(seconds=10)
+        self.tt = TicketType.objects.create(
+            edition=self.ed, code="RUSH", name="Rush", price="60.00", quota_total=100,
+            sale_start=self.opened, admission_rate_per_min=60,
+        )
+        self.t0 = self.opened.timestamp()
+
+    def test_admission_front_advances_at_rate(self):
+        cfg = waiting_room.config(self.tt.id)
+        self.assertEqual(waiting_room.admitted_upto(self.tt.id, cfg, self.t0 - 5), 0)
+        self.assertEqual(waiting_room.admitted_upto(self.tt.id, cfg, self.t0), 2)  # burst
+        self.assertEqual(waiting_room.admitted_upto(self.tt.id, cfg, self.t0 + 30), 32)
+
+    def test_join_assigns_positions_without_db(self):
+        waiting_room.config(self.tt.id)  # configuration en cache
+        with self.assertNumQueries(0):
+            statuses = [waiting_room.join(self.tt.id, now=self.t0) for _ in range(4)]
+        self.assertEqual([s.position for s in statuses], [1, 2, 3, 4])
+        self.assertEqual([s.admitted for s in statuses], [True, True, False, False])
+        self.assertEqual((statuses[3].ahead, statuses[3].eta_seconds), (2, 2))
+        later = waiting_room.status_for(self.tt.id, statuses[3].token, now=self.t0 + 2)
+        self.assertTrue(later.admitted)
+
+    def test_tokens_are_signed_scoped_and_expire(self):
+        st = waiting_room.join(self.tt.id)
+        self.assertEqual(waiting_room.parse_token(st.token, self.tt.id), 1)
+        tt, _, issued, sig = st.token.split(".")
+        forged = ".".join([tt, "0", issued, sig])  # position modifiée
+        self.assertIsNone(waiting_room.parse_token(forged, self.tt.id))
+        self.assertIsNone(waiting_room.parse_token(st.token, self.tt.id + 1))
+        self.assertIsNone(waiting_room.parse_token(st.token, self.tt.id, now=time.time() + 10 ** 6))
+        self.assertIsNone(waiting_room.parse_token("garbage", self.tt.id))
+
+    def test_reserve_requires_admitted_token(self):
+        client = APIClient()
+        url = reverse("tickets-types-reserve", args=[self.tt.id])
+        res = client.post(url, {"quantity": 1}, format="json")
+        self.assertEqual((res.status_code, res.data["reason"]), (403, "token_required"))
+
+        queue = reverse("tickets-types-queue", args=[self.tt.id])
+        cache.set("tickets:wr:tail:%d" % self.tt.id, 1000)  # file déjà longue
+        joined = client.post(queue).data
+        self.assertEqual((joined["position"], joined["admitted"]), (1001, False))
+        with self.assertNumQueries(0):  # refus servi sans la base
+            res = client.post(url, {"quantity": 1}, format="json", HTTP_X_QUEUE_TOKEN=joined["token"])
+        self.assertEqual(res.status_code, 429)
+        self.assertTrue(int(res["Retry-After"]) > 900)
+
+        cache.set("tickets:wr:tail:%d" % self.tt.id, 0)
+        token = client.post(queue).data["token"]
+        res = client.post(url, {"quantity": 2, "queue_token": token}, format="json")
+        self.assertEqual((res.status_code, res.data["quota_remaining"]), (200, 98))
+        res = client.post(url, {"quantity": 1, "queue_token": token}, format="json")
+        self.assertEqual((res.status_code, res.data["reason"]), (403, "used"))
+
+        res = client.get(queue, {"token": token})
+        self.assertEqual((res.data["position"], res.data["admitted"]), (1, True))
+        self.assertEqual(client.get(queue, {"token": "nope"}).status_code, 403)
+
+    def test_dry_run_and_refused_reservation_keep_token_use(self):
+        client = APIClient()
+        url = reverse("tickets-types-reserve", args=[self.tt.id])
+        token = client.post(reverse("tickets-types-queue", args=[self.tt.id])).data["token"]
+        res = client.post(url, {"quantity": 1, "dry_run": True, "queue_token": token}, format="json")
+        self.assertEqual((res.status_code, res.data["dry_run"]), (200, True))
+        res = client.post(url, {"quantity": 1000, "queue_token": token}, format="json")
+        self.assertEqual(res.status_code, 400)  # quota insuffisant : utilisation rendue
+        res = client.post(url, {"quantity": 1, "queue_token": token}, format="json")
+        self.assertEqual((res.status_code, res.data["reserved"]), (200, 1))
+        res = client.post(url, {"quantity": 1, "dry_run": True, "queue_token": token}, format="json")
+        self.assertEqual((res.status_code, res.data["reason"]), (403, "used"))
+
+    def test_disabled_room_and_config_invalidation(self):
+        self.tt.admission_rate_per_min = 0
+        self.tt.save()
+        client = APIClient()
+        self.assertEqual(client.post(reverse("tickets-types-queue", args=[self.tt.id])).data, {"enabled": False})
+        res = client.post(reverse("tickets-types-reserve", args=[self.tt.id]), {"quantity": 1}, format="json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(client.post(reverse("tickets-types-queue", args=[999999])).status_code, 404)
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TicketTypeViewSet
+from .views import ReservationHoldViewSet, TicketTypeViewSet
 
 router = DefaultRouter()
 router.register(r'types', TicketTypeViewSet, basename="tickets-types")
+router.register(r'holds', ReservationHoldViewSet, basename="tickets-holds")
 
 urlpatterns = [
     path('', include(router.urls)),
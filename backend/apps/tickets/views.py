@@ -8,22 +8,28 @@ from django.http import HttpResponse
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
-from .models import TicketType, PricePhase, PHASE_ORDER
-from .serializers import TicketTypeSerializer
-from .services import current_cache_version
+from . import holds, idempotency, reservations, waiting_room
+from .metrics import RESERVATIONS_TOTAL
+from .models import HoldStatus, ReservationHold, TicketType, PricePhase, PHASE_ORDER
+from .serializers import ReservationHoldSerializer, TicketTypeSerializer
+from .services import bump_cache_version, current_cache_version
+from apps.common.ratelimit import ratelimit
 from apps.common.rbac import ObjectPermissionsMixin, AssignCreatorObjectPermsMixin
 
 
+def _reserve_rate() -> str:
+    return f"{int(getattr(settings, 'TICKETS_RESERVE_RATE_LIMIT_PER_MIN', 30))}/min"
+
+
 class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, viewsets.ModelViewSet):
-    queryset = TicketType.objects.select_related("edition").all()
+    queryset = TicketType.objects.select_related("edition").prefetch_related("channel_counters", "quota_shards").all()
     serializer_class = TicketTypeSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ["edition", "currency", "is_active", "day", "phase"]
@@ -42,7 +48,7 @@ class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, v
         if cached is not None:
             return Response(cached)
 
-        qs = TicketType.objects.select_related("edition").all()
+        qs = TicketType.objects.select_related("edition").prefetch_related("channel_counters", "quota_shards").all()
         if edition:
             qs = qs.filter(edition_id=edition)
         data = [TicketTypeSerializer(t).data for t in qs if t.is_on_sale()]
@@ -84,7 +90,7 @@ class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, v
                 t.currency,
                 float(t.vat_rate),
                 int(t.quota_total),
-                int(t.quota_reserved),
+                int(t.quota_reserved_total),
                 int(t.quota_remaining),
                 t.sale_start.isoformat() if t.sale_start else "",
                 t.sale_end.isoformat() if t.sale_end else "",
@@ -105,57 +111,132 @@ class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, v
         {
           "quantity": 2,
           "channel": "online",       # optionnel
-          "dry_run": false           # si true: vérifie sans écrire
+          "dry_run": false,          # si true: vérifie sans écrire
+          "hold": false,             # si true: réservation temporaire (TICKETS_HOLD_TTL_SECONDS),
+                                     # à confirmer via /holds/{token}/confirm
+          "queue_token": "..."       # salle d'attente active : jeton admis (ou en-tête X-Queue-Token)
         }
+        En-tête optionnel `Idempotency-Key` : un rejeu renvoie la réponse
+        mémorisée sans réserver à nouveau (cf. idempotency.py).
         """
+        try:
+            idem = idempotency.from_request(request, scope=f"reserve:{pk}")
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=400)
+        if idem is None:
+            return self._reserve(request, pk)
+
+        stored = idempotency.lookup(idem)
+        if stored is not None:
+            if stored["fingerprint"] != idem.fingerprint:
+                return Response({"detail": "Idempotency-Key reused with a different request"}, status=422)
+            resp = Response(stored["data"], status=stored["status"])
+            resp["Idempotent-Replayed"] = "true"
+            return resp
+        if not idempotency.acquire(idem):
+            return Response({"detail": "A request with this Idempotency-Key is in progress"}, status=409)
+        try:
+            resp = self._reserve(request, pk)
+            idempotency.store(idem, resp.status_code, getattr(resp, "data", None))
+        finally:
+            idempotency.release(idem)
+        return resp
+
+    # rate limit per IP (fenêtre glissante partagée, cf. apps.common.ratelimit) ;
+    # après la relecture Idempotency-Key : un rejeu ne consomme pas de quota
+    @ratelimit("tickets_reserve", rate=_reserve_rate, key="ip")
+    def _reserve(self, request, pk):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=404)
         q = int((request.data or {}).get("quantity") or 1)
         if q < 1:
             return Response({"detail": "quantity must be >= 1"}, status=400)
 
-        # rate limit per IP
-        limit = int(getattr(settings, "TICKETS_RESERVE_RATE_LIMIT_PER_MIN", 30))
-        ip = request.META.get("REMOTE_ADDR", "anon")
-        rl_key = f"tickets:rl:{ip}"
-        count = cache.get(rl_key, 0)
-        if count >= limit:
-            return Response({"detail": "Too many requests"}, status=429)
-        cache.set(rl_key, count + 1, 60)
+        # salle d'attente : seul le trafic admis atteint la base
+        token = request.META.get("HTTP_X_QUEUE_TOKEN") or (request.data or {}).get("queue_token")
+        admission = waiting_room.admit(pk, token)
+        if not admission.ok:
+            return self._queue_refusal(admission)
 
         channel = (request.data or {}).get("channel")
         dry = bool((request.data or {}).get("dry_run", False))
+        hold = str((request.data or {}).get("hold", "")).lower() in {"1", "true", "yes", "on"}
+        hold_seconds = int(getattr(settings, "TICKETS_HOLD_TTL_SECONDS", 900)) if hold else None
 
-        with transaction.atomic():
-            tt = TicketType.objects.select_for_update().get(pk=pk)
-            if not tt.is_on_sale():
+        # une utilisation du jeton n'est décomptée que pour une réservation effective
+        if not dry and not waiting_room.consume(pk, admission):
+            return self._queue_refusal(waiting_room.Admission(ok=False, reason="used", status=admission.status))
+
+        # UPDATE conditionnel, sans verrou applicatif (cf. reservations.py)
+        try:
+            res = reservations.reserve(pk, q, channel=channel, dry_run=dry, hold_seconds=hold_seconds)
+        except Exception:
+            if not dry:
+                waiting_room.refund(pk, admission)
+            raise
+        if not res.ok:
+            if not dry:
+                waiting_room.refund(pk, admission)
+            if res.reason == "not_found":
+                return Response({"detail": "Not found."}, status=404)
+            if res.reason == "not_on_sale":
                 return Response({"detail": "Ticket not on sale"}, status=400)
-            if tt.quota_remaining < q:
-                return Response({"detail": "Insufficient quota", "remaining": tt.quota_remaining}, status=400)
-
-            # quotas canal (si définis)
-            if channel:
-                ch_quota = int((tt.quota_by_channel or {}).get(channel, tt.quota_total))
-                already = int((tt.reserved_by_channel or {}).get(channel, 0))
-                if already + q > ch_quota:
-                    return Response({"detail": f"Channel '{channel}' quota exceeded"}, status=400)
-
-            if dry:
-                return Response({"ok": True, "dry_run": True, "remaining_if_ok": tt.quota_remaining - q})
-
-            # commit
-            tt.quota_reserved = int(tt.quota_reserved) + q
-            rbc = dict(tt.reserved_by_channel or {})
-            if channel:
-                rbc[channel] = int(rbc.get(channel, 0)) + q
-            tt.reserved_by_channel = rbc
-            tt.full_clean()
-            tt.save(update_fields=["quota_reserved", "reserved_by_channel", "updated_at"])
-            return Response({
-                "ok": True,
-                "id": tt.id,
-                "reserved": q,
-                "quota_remaining": tt.quota_remaining,
-                "reserved_by_channel": tt.reserved_by_channel,
-            })
+            if res.reason == "channel_quota":
+                return Response({"detail": f"Channel '{channel}' quota exceeded"}, status=400)
+            return Response({"detail": "Insufficient quota", "remaining": res.quota_remaining}, status=400)
+        if dry:
+            return Response({"ok": True, "dry_run": True, "remaining_if_ok": res.quota_remaining - q})
+
+        RESERVATIONS_TOTAL.inc(q)
+        if res.quota_remaining == 0:
+            bump_cache_version()  # épuisé : sort du listing on-sale
+        data = {
+            "ok": True,
+            "id": res.ticket_type_id,
+            "reserved": q,
+            "quota_remaining": res.quota_remaining,
+            "reserved_by_channel": res.reserved_by_channel,
+        }
+        if res.hold is not None:
+            data["hold"] = ReservationHoldSerializer(res.hold).data
+        return Response(data)
+
+    # -------- Waiting room (cache seulement, cf. waiting_room.py) --------
+    @action(methods=["GET", "POST"], detail=True, url_path="queue", permission_classes=[])
+    def queue(self, request, pk=None):
+        """
+        POST → entrée dans la file : {token, position, admitted_upto, ahead, eta_seconds, admitted}.
+        GET ?token= → position courante du jeton.
+        """
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=404)
+        if waiting_room.config(pk) is None:
+            return Response({"detail": "Not found."}, status=404)
+        if not waiting_room.is_enabled(pk):
+            return Response({"enabled": False})
+        if request.method == "POST":
+            st = waiting_room.join(pk)
+        else:
+            st = waiting_room.status_for(pk, request.query_params.get("token") or "")
+            if st is None:
+                return Response({"detail": "Invalid or expired queue token"}, status=403)
+        return Response({"enabled": True, **st.to_dict()})
+
+    def _queue_refusal(self, admission: waiting_room.Admission) -> Response:
+        if admission.reason == "waiting":
+            resp = Response({"detail": "Waiting room: not admitted yet", **admission.status.to_dict()}, status=429)
+            resp["Retry-After"] = str(admission.status.eta_seconds)
+            return resp
+        detail = {
+            "token_required": "Waiting room active: queue token required",
+            "invalid_token": "Invalid or expired queue token",
+            "used": "Queue token already used",
+        }[admission.reason]
+        return Response({"detail": detail, "reason": admission.reason}, status=403)
 
     # -------- Phase advance --------
     @action(methods=["POST"], detail=True, url_path="phase/advance")
@@ -193,13 +274,13 @@ class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, v
         total_rev = Decimal("0.00")
         for t in qs:
             res["quota_total"] += int(t.quota_total)
-            res["quota_reserved"] += int(t.quota_reserved)
+            res["quota_reserved"] += int(t.quota_reserved_total)
             res["quota_remaining"] += int(t.quota_remaining)
             res["by_phase"][t.phase]["count"] += 1
             if t.is_on_sale():
                 res["on_sale"] += 1
                 res["by_phase"][t.phase]["on_sale"] += 1
-            total_rev += (t.price * Decimal(max(0, int(t.quota_total) - int(t.quota_reserved))))
+            total_rev += (t.price * Decimal(int(t.quota_remaining)))
         res["total_revenue_potential_ttc"] = f"{total_rev:.2f}"
         return Response(res)
 
@@ -212,3 +293,34 @@ class TicketTypeViewSet(AssignCreatorObjectPermsMixin, ObjectPermissionsMixin, v
                 from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied("Missing manage_pricing permission")
         return super().perform_update(serializer)
+
+
+class ReservationHoldViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Réservations temporaires, adressées par leur jeton (capacité) :
+    - GET  /holds/{token}/          → état ;
+    - POST /holds/{token}/release   → abandon du panier (places rendues) ;
+    - POST /holds/{token}/confirm   → paiement validé (staff / back-office).
+    """
+    queryset = ReservationHold.objects.all()
+    serializer_class = ReservationHoldSerializer
+    permission_classes = [AllowAny]
+    lookup_field = "token"
+
+    @action(methods=["POST"], detail=True, url_path="confirm", permission_classes=[IsAdminUser])
+    def confirm(self, request, token=None):
+        hold = self.get_object()
+        done = holds.confirm(hold)
+        hold.refresh_from_db()
+        if not done and hold.status != HoldStatus.CONFIRMED:  # déjà dans l'état voulu : idempotent
+            return Response({"detail": f"Hold is {hold.status}", "status": hold.status}, status=409)
+        return Response(ReservationHoldSerializer(hold).data)
+
+    @action(methods=["POST"], detail=True, url_path="release")
+    def release(self, request, token=None):
+        hold = self.get_object()
+        done = holds.release(hold)
+        hold.refresh_from_db()
+        if not done and hold.status not in (HoldStatus.RELEASED, HoldStatus.EXPIRED):  # déjà dans l'état voulu : idempotent
+            return Response({"detail": f"Hold is {hold.status}", "status": hold.status}, status=409)
+        return Response(ReservationHoldSerializer(hold).data)
@@ -0,0 +1,236 @@
+# apps/tickets/waiting_room.py
+"""
+Salle d'attente virtuelle à l'ouverture des ventes.
+
+Activée par type de billet (`TicketType.admission_rate_per_min` > 0) ; tout
+l'état vit dans le cache (compteurs atomiques), la base ne voit que le trafic
+admis :
+- `join` : position = `cache.incr` du compteur de file du type, rendue dans
+  un jeton signé `"<type>.<position>.<émis>.<signature>"` (HMAC SECRET_KEY) ;
+- admission : le front avance au débit configuré depuis l'ouverture
+  (`sale_start`, sinon première arrivée) :
+      admis = TICKETS_WAITING_ROOM_BURST + ⌊(maintenant − ouverture) × débit / 60⌋
+  une position est admise dès que `position <= admis` — pas de tâche de fond ;
+- `reserve` n'accepte qu'un jeton admis, valable `TICKETS_WAITING_ROOM_TOKEN_TTL`
+  et au plus `TICKETS_WAITING_ROOM_MAX_USES` réservations (compteur par jeton) ;
+  `admit` ne fait que contrôler, `consume` prend une utilisation juste avant
+  l'écriture et `refund` la rend si la réservation échoue : un `dry_run` ou un
+  refus (quota, canal) ne coûte rien au jeton.
+
+La configuration du type (débit, ouverture) est mise en cache et effacée à
+chaque save/delete du type.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import math
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import TicketType
+
+CONFIG_TTL = 60
+
+
+@dataclass
+class QueueStatus:
+    ticket_type: int
+    position: int
+    admitted_upto: int
+    ahead: int
+    eta_seconds: int
+    admitted: bool
+    token: str = ""
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        if not self.token:
+            data.pop("token")
+        return data
+
+
+@dataclass
+class Admission:
+    ok: bool
+    reason: str = ""  # token_required | invalid_token | waiting | used
+    status: Optional[QueueStatus] = None
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+# ---------------------------------------------------------------------------
+# Configuration (cache)
+# ---------------------------------------------------------------------------
+
+def _config_key(ticket_type_id: int) -> str:
+    return f"tickets:wr:cfg:{ticket_type_id}"
+
+
+def config(ticket_type_id: int) -> Optional[Dict]:
+    """{"rate": admissions/min, "open": timestamp | None} ; None si le type n'existe pas."""
+    key = _config_key(ticket_type_id)
+    cfg = cache.get(key)
+    if cfg is None:
+        row = TicketType.objects.filter(pk=ticket_type_id).values_list("admission_rate_per_min", "sale_start").first()
+        cfg = {"missing": True} if row is None else {
+            "rate": int(row[0] or 0), "open": row[1].timestamp() if row[1] else None,
+        }
+        cache.set(key, cfg, CONFIG_TTL)
+    return None if cfg.get("missing") else cfg
+
+
+def forget(ticket_type_id: int) -> None:
+    cache.delete(_config_key(ticket_type_id))
+
+
+def is_enabled(ticket_type_id: int) -> bool:
+    cfg = config(ticket_type_id)
+    return bool(cfg and cfg["rate"] > 0)
+
+
+def _opened_at(ticket_type_id: int, cfg: Dict, now: float) -> float:
+    if cfg.get("open") is not None:
+        return float(cfg["open"])
+    key = f"tickets:wr:open:{ticket_type_id}"
+    cache.add(key, now, None)  # sans `sale_start` : ouverture à la première arrivée
+    return float(cache.get(key) or now)
+
+
+def admitted_upto(ticket_type_id: int, cfg: Dict, now: float) -> int:
+    opened = _opened_at(ticket_type_id, cfg, now)
+    if now < opened:
+        return 0
+    return _setting("TICKETS_WAITING_ROOM_BURST", 0) + int((now - opened) * cfg["rate"] / 60)
+
+
+def _status(ticket_type_id: int, cfg: Dict, position: int, now: float) -> QueueStatus:
+    upto = admitted_upto(ticket_type_id, cfg, now)
+    ahead = max(0, position - upto)
+    wait = 0
+    if ahead:
+        opened = _opened_at(ticket_type_id, cfg, now)
+        # instant où le front atteint `position`
+        due = opened + max(0, position - _setting("TICKETS_WAITING_ROOM_BURST", 0)) * 60 / cfg["rate"]
+        wait = max(1, math.ceil(due - now))
+    return QueueStatus(
+        ticket_type=ticket_type_id, position=position, admitted_upto=upto,
+        ahead=ahead, eta_seconds=wait, admitted=ahead == 0,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Jetons
+# ---------------------------------------------------------------------------
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode("utf-8"), f"wr.{payload}".encode("ascii"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:18]).decode("ascii")
+
+
+def make_token(ticket_type_id: int, position: int, issued: int) -> str:
+    payload = f"{ticket_type_id}.{position}.{issued}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def parse_token(token: str, ticket_type_id: int, now: Optional[float] = None) -> Optional[int]:
+    """Position portée par un jeton valide pour ce type (signature, durée de vie), sinon None."""
+    try:
+        tt, position, issued, sig = str(token).split(".")
+        tt, position, issued = int(tt), int(position), int(issued)
+    except (TypeError, ValueError):
+        return None
+    if tt != int(ticket_type_id) or not hmac.compare_digest(sig, _sign(f"{tt}.{position}.{issued}")):
+        return None
+    now = time.time() if now is None else now
+    if issued + _setting("TICKETS_WAITING_ROOM_TOKEN_TTL", 7200) < now:
+        return None
+    return position
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+def join(ticket_type_id: int, now: Optional[float] = None) -> Optional[QueueStatus]:
+    """Entrée dans la file (None si la salle d'attente est désactivée ou le type absent)."""
+    cfg = config(ticket_type_id)
+    if not cfg or cfg["rate"] <= 0:
+        return None
+    now = time.time() if now is None else now
+    key = f"tickets:wr:tail:{ticket_type_id}"
+    try:
+        position = cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        position = cache.incr(key)
+    status = _status(ticket_type_id, cfg, position, now)
+    status.token = make_token(ticket_type_id, position, int(now))
+    return status
+
+
+def status_for(ticket_type_id: int, token: str, now: Optional[float] = None) -> Optional[QueueStatus]:
+    cfg = config(ticket_type_id)
+    if not cfg or cfg["rate"] <= 0:
+        return None
+    now = time.time() if now is None else now
+    position = parse_token(token, ticket_type_id, now)
+    return None if position is None else _status(ticket_type_id, cfg, position, now)
+
+
+def _used_key(ticket_type_id: int, position: int) -> str:
+    return f"tickets:wr:used:{ticket_type_id}:{position}"
+
+
+def admit(ticket_type_id: int, token: Optional[str], now: Optional[float] = None) -> Admission:
+    """
+    Contrôle d'accès de `reserve`, sans consommer d'utilisation : toujours admis
+    si la salle d'attente est désactivée.
+    """
+    cfg = config(ticket_type_id)
+    if not cfg or cfg["rate"] <= 0:
+        return Admission(ok=True)
+    if not token:
+        return Admission(ok=False, reason="token_required")
+    now = time.time() if now is None else now
+    position = parse_token(token, ticket_type_id, now)
+    if position is None:
+        return Admission(ok=False, reason="invalid_token")
+    status = _status(ticket_type_id, cfg, position, now)
+    if not status.admitted:
+        return Admission(ok=False, reason="waiting", status=status)
+    if int(cache.get(_used_key(ticket_type_id, position)) or 0) >= _setting("TICKETS_WAITING_ROOM_MAX_USES", 3):
+        return Admission(ok=False, reason="used", status=status)
+    return Admission(ok=True, status=status)
+
+
+def consume(ticket_type_id: int, admission: Admission) -> bool:
+    """
+    Prend une utilisation du jeton admis (incr atomique, avant l'écriture) ;
+    False si le plafond est atteint entre-temps (requêtes concurrentes).
+    """
+    if admission.status is None:
+        return True  # salle d'attente désactivée
+    key = _used_key(ticket_type_id, admission.status.position)
+    cache.add(key, 0, _setting("TICKETS_WAITING_ROOM_TOKEN_TTL", 7200))
+    if cache.incr(key) > _setting("TICKETS_WAITING_ROOM_MAX_USES", 3):
+        refund(ticket_type_id, admission)
+        return False
+    return True
+
+
+def refund(ticket_type_id: int, admission: Admission) -> None:
+    """Rend l'utilisation prise par `consume` (réservation refusée)."""
+    if admission.status is None:
+        return
+    try:
+        cache.decr(_used_key(ticket_type_id, admission.status.position))
+    except ValueError:
+        pass  # compteur expiré
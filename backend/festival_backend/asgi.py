@@ -13,4 +13,5 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'festival_backend.settings')
 
+# Vues async natives (ex. flux SSE /api/v1/schedule/events/) : servir via uvicorn/daphne.
 application = get_asgi_application()
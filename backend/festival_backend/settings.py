@@ -165,10 +165,11 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": int(os.getenv("DRF_PAGE_SIZE", "50")),
-    # throttles génériques (les réservations tickets ont déjà un RL interne)
+    # throttles génériques, fenêtre glissante atomique (apps.common.ratelimit) ;
+    # /tickets/.../reserve a en plus sa limite par IP (TICKETS_RESERVE_RATE_LIMIT_PER_MIN)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "apps.common.ratelimit.AnonSlidingWindowThrottle",
+        "apps.common.ratelimit.UserSlidingWindowThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": os.getenv("DRF_THROTTLE_ANON", "200/min"),
@@ -207,9 +208,34 @@ CSRF_TRUSTED_ORIGINS = [
 # ---------------------------------------------------------------------
 SCHEDULE_LIST_DAY_CACHE_TTL = int(os.getenv("SCHEDULE_LIST_DAY_CACHE_TTL", "120"))
 SCHEDULE_ICS_CACHE_TTL = int(os.getenv("SCHEDULE_ICS_CACHE_TTL", "120"))
+SCHEDULE_ICS_FEED_TTL = int(os.getenv("SCHEDULE_ICS_FEED_TTL", "3600"))  # flux précalculés ?edition=
+SCHEDULE_INDEX_MAX_ENTRIES = int(os.getenv("SCHEDULE_INDEX_MAX_ENTRIES", "2048"))
+SCHEDULE_NOW_MAX_AGE = int(os.getenv("SCHEDULE_NOW_MAX_AGE", "60"))
+SCHEDULE_GRID_CACHE_TTL = int(os.getenv("SCHEDULE_GRID_CACHE_TTL", "86400"))
+SCHEDULE_BULK_STATUS_MAX = int(os.getenv("SCHEDULE_BULK_STATUS_MAX", "1000"))
+SCHEDULE_IMPORT_MAX_ROWS = int(os.getenv("SCHEDULE_IMPORT_MAX_ROWS", "5000"))  # upload /slots/import/
+SCHEDULE_TRAVEL_SPEED_KMH = float(os.getenv("SCHEDULE_TRAVEL_SPEED_KMH", "30"))
+SCHEDULE_TRAVEL_BASE_MINUTES = int(os.getenv("SCHEDULE_TRAVEL_BASE_MINUTES", "10"))
+SCHEDULE_ANALYSIS_CACHE_TTL = int(os.getenv("SCHEDULE_ANALYSIS_CACHE_TTL", "600"))
+# SSE : LocalBroker (1 worker) ou apps.schedule.events.CacheBroker (multi-workers, Redis)
+SCHEDULE_EVENTS_BROKER = os.getenv("SCHEDULE_EVENTS_BROKER", "apps.schedule.events.LocalBroker")
+SCHEDULE_EVENTS_BACKLOG = int(os.getenv("SCHEDULE_EVENTS_BACKLOG", "1000"))
+SCHEDULE_EVENTS_TTL = int(os.getenv("SCHEDULE_EVENTS_TTL", "3600"))
+SCHEDULE_EVENTS_HEARTBEAT = float(os.getenv("SCHEDULE_EVENTS_HEARTBEAT", "15"))
+SCHEDULE_EVENTS_POLL_INTERVAL = float(os.getenv("SCHEDULE_EVENTS_POLL_INTERVAL", "1"))
+SCHEDULE_SLOT_MAX_HOURS = int(os.getenv("SCHEDULE_SLOT_MAX_HOURS", "12"))  # durée max d'un slot, borne des ?from=&to=
+SCHEDULE_AGENDA_MAX_SLOTS = int(os.getenv("SCHEDULE_AGENDA_MAX_SLOTS", "500"))
+SCHEDULE_ICS_FRAGMENT_TTL = int(os.getenv("SCHEDULE_ICS_FRAGMENT_TTL", "86400"))
 SPONSORS_PUBLIC_CACHE_TTL = int(os.getenv("SPONSORS_PUBLIC_CACHE_TTL", "300"))
 TICKETS_ON_SALE_CACHE_TTL = int(os.getenv("TICKETS_ON_SALE_CACHE_TTL", "120"))
 TICKETS_RESERVE_RATE_LIMIT_PER_MIN = int(os.getenv("TICKETS_RESERVE_RATE_LIMIT_PER_MIN", "30"))
+TICKETS_HOLD_TTL_SECONDS = int(os.getenv("TICKETS_HOLD_TTL_SECONDS", "900"))  # reserve {"hold": true}
+TICKETS_HOLD_SWEEP_BATCH = int(os.getenv("TICKETS_HOLD_SWEEP_BATCH", "1000"))
+TICKETS_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("TICKETS_IDEMPOTENCY_TTL_SECONDS", "86400"))  # Idempotency-Key
+# salle d'attente (TicketType.admission_rate_per_min > 0)
+TICKETS_WAITING_ROOM_BURST = int(os.getenv("TICKETS_WAITING_ROOM_BURST", "0"))  # admis dès l'ouverture
+TICKETS_WAITING_ROOM_TOKEN_TTL = int(os.getenv("TICKETS_WAITING_ROOM_TOKEN_TTL", "7200"))
+TICKETS_WAITING_ROOM_MAX_USES = int(os.getenv("TICKETS_WAITING_ROOM_MAX_USES", "3"))  # réservations par jeton admis
 COMMON_WEBHOOK_TIMEOUT = int(os.getenv("COMMON_WEBHOOK_TIMEOUT", "5"))
 
 # S3 pour sponsors (facultatif)